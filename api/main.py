@@ -4,13 +4,21 @@ Versión 2.6 - Compatible con todos los tests
 """
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
-from typing import Optional
-import joblib
+from typing import List, Optional
+from collections import OrderedDict, namedtuple
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from datetime import datetime
+import os
+import sys
+import threading
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # === CONFIGURACIÓN DE RUTAS ABSOLUTAS ===
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -18,37 +26,68 @@ DATA_DIR = BASE_DIR / "data"
 MODELS_DIR = DATA_DIR / "models"
 
 MODEL_PATH = MODELS_DIR / "random_forest_model.pkl"
-TEAM_ENCODER_PATH = MODELS_DIR / "team_encoder.pkl"
-WINNER_ENCODER_PATH = MODELS_DIR / "winner_encoder.pkl"
+# Pipeline a servir: p. ej. match_pipeline_compressed.pkl (salida de src/compress_model.py)
+PIPELINE_PATH = MODELS_DIR / os.getenv("RL_PIPELINE_FILE", "match_pipeline.pkl")
+
+sys.path.insert(0, str(BASE_DIR / "src"))
+from artifacts import FLAT_FOREST_PATH, load_artifact
+from features import competitive_flag
+from flat_forest import FlatForest
+from lookup_table import LookupTable, TABLE_PATH as LOOKUP_TABLE_PATH, META_PATH as LOOKUP_META_PATH
+from model_backends import DEFAULT_BACKEND, trained_backend
+from model_pipeline import load_pipeline, model_matrix, normalize_team_color, normalize_winner
+from prediction_stats import PredictionStatsCache
+from storage import find_table
+
+# === CONFIGURACIÓN DE INFERENCIA ===
+# Backend: "sklearn" (predict_proba de scikit-learn) o "flat" (bosque compilado)
+INFERENCE_BACKEND = os.getenv("RL_INFERENCE_BACKEND", "sklearn").lower()
+# Con el backend "flat", los lotes mayores a este tamaño usan el recorrido en C
+# de scikit-learn (mismo resultado, más rápido en lotes grandes)
+FLAT_MAX_BATCH_ROWS = int(os.getenv("RL_FLAT_MAX_BATCH_ROWS", "1000"))
+# Tamaño del caché LRU de predicciones de /predict (0 lo desactiva)
+PREDICTION_CACHE_SIZE = int(os.getenv("RL_PREDICTION_CACHE_SIZE", "4096"))
+# Responder /predict desde la tabla precalculada (src/lookup_table.py) si existe
+USE_LOOKUP_TABLE = os.getenv("RL_USE_LOOKUP_TABLE", "0").lower() in ("1", "true", "yes")
+# Abrir los arrays de los artefactos con memory-map (páginas compartidas entre workers)
+MODEL_MMAP = os.getenv("RL_MODEL_MMAP", "1").lower() in ("1", "true", "yes")
+
+# === CONFIGURACIÓN DE SERVICIO ===
+# "inline": la inferencia corre en el proceso del servidor (modo de desarrollo)
+# "process": la inferencia corre en un pool de procesos creado después de cargar
+# el modelo (fork), así los workers comparten su memoria por copy-on-write
+SERVING_MODE = os.getenv("RL_SERVING_MODE", "inline").lower()
+INFERENCE_WORKERS = int(os.getenv("RL_INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+# Hilos para el trabajo bloqueante de los endpoints, fuera del event loop:
+# "inference" atiende /predict y /predict_batch; "io" atiende /generate_synthetic
+# y /stats, para que un lote sintético grande no haga esperar a /predict
+INFERENCE_THREADS = int(os.getenv("RL_INFERENCE_THREADS", "4"))
+IO_THREADS = int(os.getenv("RL_IO_THREADS", "2"))
+# Micro-batching de /predict: agrupa peticiones concurrentes hasta
+# RL_MICROBATCH_MAX_SIZE partidas o RL_MICROBATCH_MAX_WAIT_MS milisegundos
+# y las puntúa en una sola llamada al modelo
+MICROBATCH = os.getenv("RL_MICROBATCH", "0").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_SIZE = int(os.getenv("RL_MICROBATCH_MAX_SIZE", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("RL_MICROBATCH_MAX_WAIT_MS", "2"))
 
 print("=== INICIANDO API v2.6 (COMPATIBLE CON TESTS) ===")
 print(f"Directorio base: {BASE_DIR}")
-print(f"Cargando modelo desde: {MODEL_PATH}")
-
-# === CARGA DE MODELOS ===
-try:
-    model = joblib.load(MODEL_PATH)
-    team_encoder = joblib.load(TEAM_ENCODER_PATH)
-    winner_encoder = joblib.load(WINNER_ENCODER_PATH)
-    
-    if hasattr(model, 'feature_names_in_'):
-        print(f"✅ Modelos cargados. Features esperadas ({len(model.feature_names_in_)}):")
-        for i, name in enumerate(model.feature_names_in_):
-            print(f"  {i}: {name}")
-    else:
-        print(f"✅ Modelos cargados. N features: {model.n_features_in_}")
-        
-except Exception as e:
-    print(f"❌ ERROR AL CARGAR ARCHIVOS: {e}")
-    import traceback
-    traceback.print_exc()
-    raise
 
 # === INICIALIZAR APP ===
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Carga los modelos en segundo plano al arrancar; /ready indica cuándo terminó"""
+    loading = asyncio.create_task(asyncio.to_thread(warm_up))
+    yield
+    if not loading.done():
+        loading.cancel()
+    stop_inference_pool()
+
 app = FastAPI(
     title="Rocket League Winner Prediction API",
     description="API para predecir el ganador de partidas de Rocket League",
-    version="2.6"
+    version="2.6",
+    lifespan=lifespan
 )
 
 # === MODELOS PYDANTIC ===
@@ -58,7 +97,7 @@ class MatchInput(BaseModel):
     goal_difference: int
     match_duration: int
     overtime: bool
-    is_competitive: Optional[int] = 0  # Opcional con default 0
+    is_competitive: Optional[int] = None  # Si falta se deriva de goal_difference
     
     class Config:
         json_schema_extra = {
@@ -72,9 +111,37 @@ class MatchInput(BaseModel):
             }
         }
 
+class BatchMatchInput(BaseModel):
+    matches: List[MatchInput]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "matches": [
+                    {
+                        "team_color": "Blue",
+                        "game_mode": "Standard",
+                        "goal_difference": 3,
+                        "match_duration": 300,
+                        "overtime": False,
+                        "is_competitive": 1
+                    },
+                    {
+                        "team_color": "Orange",
+                        "game_mode": "Duel",
+                        "goal_difference": -1,
+                        "match_duration": 340,
+                        "overtime": True,
+                        "is_competitive": 1
+                    }
+                ]
+            }
+        }
+
 class SyntheticRequest(BaseModel):
     n_matches: int = 100
     game_mode: Optional[str] = None
+    seed: Optional[int] = None  # Semilla opcional para resultados reproducibles
     
     class Config:
         json_schema_extra = {
@@ -84,77 +151,635 @@ class SyntheticRequest(BaseModel):
             }
         }
 
-# === FUNCIONES AUXILIARES ===
-def normalize_team_color(color: str) -> str:
-    """Normaliza color del equipo - retorna capitalizado"""
-    color_map = {
-        "blue": "Blue", "azul": "Blue", "b": "Blue",
-        "orange": "Orange", "naranja": "Orange", "o": "Orange"
-    }
-    return color_map.get(color.lower(), color.capitalize())
-
-def normalize_winner(winner: str) -> str:
-    """Normaliza ganador - retorna capitalizado"""
-    winner_map = {
-        "blue": "Blue", "azul": "Blue", "b": "Blue",
-        "orange": "Orange", "naranja": "Orange", "o": "Orange",
-        "draw": "Draw", "empate": "Draw", "tie": "Draw"
-    }
-    return winner_map.get(winner.lower(), winner.capitalize())
-
-def prepare_features(match: MatchInput) -> pd.DataFrame:
-    """Prepara features en el formato correcto para el modelo"""
-    
-    # Normalizar entradas
-    team_color = normalize_team_color(match.team_color)
-    
-    # Codificar team_color
-    team_color_encoded = team_encoder.transform([team_color])[0]
-    
-    # Crear one-hot encoding para game_mode
-    mode_duel = 1 if match.game_mode.lower() == "duel" else 0
-    mode_doubles = 1 if match.game_mode.lower() == "doubles" else 0
-    mode_standard = 1 if match.game_mode.lower() == "standard" else 0
-    
-    # Crear DataFrame con todas las features
-    features_dict = {
-        'team_color_encoded': team_color_encoded,
-        'goal_difference': match.goal_difference,
-        'match_duration': match.match_duration,
-        'mode_Duel': mode_duel,
-        'mode_Doubles': mode_doubles,
-        'mode_Standard': mode_standard,
-        'is_competitive': match.is_competitive if match.is_competitive is not None else 0,
-        'overtime': int(match.overtime)
-    }
+# Límite de partidas por petición en /predict_batch
+MAX_BATCH_SIZE = 100_000
+
+# Valores posibles en la generación sintética
+SYNTHETIC_GAME_MODES = ["Duel", "Doubles", "Standard"]
+SYNTHETIC_TEAM_COLORS = ["Blue", "Orange"]
+
+# === CARGA DE MODELOS ===
+def watched_model_path():
+    """
+    Artefacto cuyo cambio en disco dispara la recarga: match_pipeline.pkl, o
+    el modelo suelto del último entrenamiento si no existe (lee
+    model_metadata.pkl, por eso se resuelve solo al cargar)
+    """
+    if PIPELINE_PATH.exists():
+        return PIPELINE_PATH
+    return trained_backend(MODELS_DIR).model_path(MODELS_DIR)
+
+def model_file_stamp():
+    """
+    Huella (mtime, tamaño) del artefacto vigilado, resuelto en la última
+    carga, o None si no es accesible
+    """
+    try:
+        stat = (watched_path or watched_model_path()).stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def load_lookup_table(model_sha256):
+    """Abre la tabla precalculada si existe y corresponde al modelo actual"""
+    if not (LOOKUP_TABLE_PATH.exists() and LOOKUP_META_PATH.exists()):
+        print(f"⚠️  No existe la tabla precalculada ({LOOKUP_TABLE_PATH}), se usará el modelo")
+        return None
+    
+    table = LookupTable.load(LOOKUP_TABLE_PATH, LOOKUP_META_PATH)
+    if table.meta.get('model_sha256') != model_sha256:
+        print("⚠️  La tabla precalculada es de otro modelo, se usará el modelo")
+        return None
+    
+    print(f"📇 Tabla precalculada cargada: {table.table.shape[:-1]}")
+    return table
+
+def load_flat_forest(model, model_sha256):
+    """
+    Abre el bosque compilado guardado por train_model.py, o lo compila si no
+    corresponde. None si el modelo no es un bosque (se usa predict_proba).
+    """
+    if not hasattr(model, 'estimators_'):
+        print(f"⚠️  El backend 'flat' requiere un bosque; {type(model).__name__} usa predict_proba")
+        return None
+    if FLAT_FOREST_PATH.exists():
+        flat = load_artifact(FLAT_FOREST_PATH, mmap=MODEL_MMAP)
+        if getattr(flat, 'model_sha256', None) == model_sha256:
+            return flat
+        print("⚠️  flat_forest.pkl es de otro modelo, se compila desde el modelo cargado")
+    return FlatForest.from_sklearn(model, model_sha256=model_sha256)
+
+def load_artifacts():
+    """
+    Carga (o recarga) el pipeline (codificación + modelo) y reconstruye todo
+    lo que depende de él: etiquetas de ganador, backend de inferencia y
+    caché de predicciones.
+    """
+    global pipeline, model, team_encoder, winner_encoder, flat_forest, lookup_table
+    global FEATURE_LAYOUT, WINNER_LABELS, loaded_model_stamp, cache_invalidations, load_seconds
+    global watched_path
+    
+    if INFERENCE_BACKEND not in ("sklearn", "flat"):
+        raise ValueError(f"RL_INFERENCE_BACKEND inválido: '{INFERENCE_BACKEND}' (usar 'sklearn' o 'flat')")
+    if SERVING_MODE not in ("inline", "process"):
+        raise ValueError(f"RL_SERVING_MODE inválido: '{SERVING_MODE}' (usar 'inline' o 'process')")
+    
+    start = time.perf_counter()
+    watched_path = watched_model_path()
+    stamp = model_file_stamp()
+    new_pipeline = load_pipeline(MODELS_DIR, mmap=MODEL_MMAP, name=PIPELINE_PATH.name)
     
-    df = pd.DataFrame([features_dict])
+    # Hash del archivo del modelo con el que se armó el pipeline: valida los artefactos derivados
+    model_sha256 = new_pipeline.metadata['model_sha256']
+    new_flat_forest = (load_flat_forest(new_pipeline.model, model_sha256)
+                       if INFERENCE_BACKEND == "flat" else None)
+    new_lookup_table = load_lookup_table(model_sha256) if USE_LOOKUP_TABLE else None
     
-    # Reordenar columnas según el modelo
-    if hasattr(model, 'feature_names_in_'):
-        df = df[model.feature_names_in_]
+    pipeline, model = new_pipeline, new_pipeline.model
+    team_encoder = pipeline.encoder.team_encoder
+    winner_encoder = pipeline.encoder.winner_encoder
+    flat_forest = new_flat_forest
+    lookup_table = new_lookup_table
+    # La codificación del pipeline escribe cada partida directo en la fila float32
+    FEATURE_LAYOUT = pipeline.encoder
+    feature_names = FEATURE_LAYOUT.feature_names
+    # Etiquetas de ganador alineadas con las columnas de predict_proba
+    WINNER_LABELS = [normalize_winner(w) for w in pipeline.winner_labels]
     
-    return df
+    # Las predicciones memorizadas pertenecen al modelo anterior
+    if loaded_model_stamp is not None:
+        cached_probabilities.cache_clear()
+        cache_invalidations += 1
+    reloaded = loaded_model_stamp is not None
+    loaded_model_stamp = stamp
+    load_seconds = time.perf_counter() - start
+    
+    print(f"✅ Pipeline {pipeline.version[:12]} cargado en {load_seconds:.2f}s "
+          f"(backend: {INFERENCE_BACKEND}, mmap: {MODEL_MMAP}, "
+          f"{len(feature_names)} features: {', '.join(feature_names)})")
+    
+    # Los workers heredaron el modelo anterior: se crean de nuevo
+    if reloaded and inference_pool is not None:
+        start_inference_pool(inference_pool_size)
+
+_reload_lock = threading.Lock()
+loaded_model_stamp = None
+watched_path = None
+cache_invalidations = 0
+load_error = None
+load_seconds = None
+
+def ensure_artifacts():
+    """
+    Carga los artefactos la primera vez que se necesitan (carga diferida) y
+    los recarga si el archivo del modelo cambió en disco.
+    """
+    if loaded_model_stamp is not None:
+        stamp = model_file_stamp()
+        if stamp is None or stamp == loaded_model_stamp:
+            return
+    
+    with _reload_lock:
+        if loaded_model_stamp is None:
+            print(f"Cargando modelo desde: {watched_model_path()}")
+            load_artifacts()
+            return
+        
+        if model_file_stamp() == loaded_model_stamp:
+            return
+        print(f"🔄 El modelo cambió en disco, recargando: {watched_path}")
+        try:
+            load_artifacts()
+        except Exception as e:
+            # Puede estar a medio escribir: se sigue con el modelo actual y se reintenta luego
+            print(f"⚠️  No se pudo recargar el modelo: {e}")
+
+def warm_up():
+    """Carga inicial lanzada desde el arranque de la app"""
+    global load_error
+    try:
+        ensure_artifacts()
+        if SERVING_MODE == "process":
+            start_inference_pool(INFERENCE_WORKERS)
+        load_error = None
+    except Exception as e:
+        load_error = str(e)
+        print(f"❌ ERROR AL CARGAR ARCHIVOS: {e}")
+        import traceback
+        traceback.print_exc()
+
+# === POOL DE PROCESOS DE INFERENCIA ===
+# Los workers nacen del forkserver, un proceso aparte y sin hilos que ya
+# importó esta API: nunca de un fork del servidor con hilos vivos, que podría
+# dejarles _reload_lock (o un lock interno de numpy) tomado para siempre.
+# Donde no existe forkserver (Windows) se usa spawn.
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+inference_pool = None
+inference_pool_size = 0
+
+def _init_inference_worker():
+    """Inicializa un worker del pool (corre dentro del proceso hijo)"""
+    # Carga propia; con RL_MODEL_MMAP los arrays del modelo se comparten por el page cache
+    ensure_artifacts()
+    # Un hilo por worker: el paralelismo lo dan los procesos
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+
+def _warm_worker(_):
+    """Tarea vacía para forzar el arranque de los workers"""
+    return os.getpid()
+
+def start_inference_pool(n_workers: int):
+    """
+    Crea (o recrea) el pool de procesos de inferencia. Cada worker carga los
+    artefactos al iniciar (mapeados en memoria si RL_MODEL_MMAP está activo),
+    así que es seguro llamarla con los hilos del servidor ya corriendo, como
+    al recargar el modelo.
+    """
+    global inference_pool, inference_pool_size
+    
+    context = multiprocessing.get_context(POOL_START_METHOD)
+    if POOL_START_METHOD == "forkserver":
+        # El forkserver importa la API (numpy, sklearn, FastAPI) una sola vez
+        context.set_forkserver_preload([__name__])
+    new_pool = ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=context,
+        initializer=_init_inference_worker
+    )
+    # Se lanzan todos los workers ahora, no en la primera petición
+    list(new_pool.map(_warm_worker, range(n_workers)))
+    
+    old_pool, inference_pool, inference_pool_size = inference_pool, new_pool, n_workers
+    if old_pool is not None:
+        old_pool.shutdown(wait=False)
+    
+    print(f"⚙️  Pool de inferencia listo: {n_workers} procesos ({context.get_start_method()})")
+    return inference_pool
+
+def stop_inference_pool():
+    """Detiene el pool de inferencia si está activo"""
+    global inference_pool, inference_pool_size
+    if inference_pool is not None:
+        inference_pool.shutdown(wait=True)
+    inference_pool, inference_pool_size = None, 0
+
+# === EJECUTORES DE TRABAJO BLOQUEANTE ===
+class BoundedExecutor:
+    """
+    Pool de hilos acotado para el trabajo bloqueante de los endpoints
+    (modelo, pandas, archivos). Lleva la cuenta de tareas en cola y en curso
+    para exponerla en /metrics.
+    """
+    
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"rl-{name}")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+    
+    async def run(self, fn, *args):
+        """Ejecuta fn(*args) en el pool y espera el resultado sin bloquear el event loop"""
+        submitted = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        
+        def task():
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_wait_seconds += time.perf_counter() - submitted
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+        
+        future = self._executor.submit(task)
+        # Si la petición se cancela antes de empezar, la tarea sale de la cola
+        future.add_done_callback(self._discard_if_cancelled)
+        return await asyncio.wrap_future(future)
+    
+    def _discard_if_cancelled(self, future):
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "max_queue_depth": self.max_queue_depth,
+                "avg_wait_ms": self.total_wait_seconds / self.completed * 1000 if self.completed else 0.0
+            }
+
+inference_executor = BoundedExecutor("inference", INFERENCE_THREADS)
+io_executor = BoundedExecutor("io", IO_THREADS)
+
+class MicroBatcher:
+    """
+    Agrupa peticiones concurrentes en lotes: cada llamada a submit() espera
+    hasta que el lote llega a max_size elementos o pasan max_wait_ms desde el
+    primero, y el lote completo se procesa con una sola llamada a
+    score_batch(items) -> resultados (en el mismo orden) dentro del ejecutor.
+    """
+    
+    def __init__(self, score_batch, executor: BoundedExecutor, max_size: int, max_wait_ms: float):
+        if max_size < 1:
+            raise ValueError(f"max_size debe ser >= 1 (recibido: {max_size})")
+        self.score_batch = score_batch
+        self.executor = executor
+        self.max_size = max_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending = []
+        self._timer = None
+        # Referencias a los lotes en curso (el loop solo guarda referencias débiles)
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+        # Histograma de tamaños de lote en potencias de 2: "1", "2", "4", ... max_size
+        self._bounds = []
+        bound = 1
+        while bound < max_size:
+            self._bounds.append(bound)
+            bound *= 2
+        self._bounds.append(max_size)
+        self.histogram = {str(b): 0 for b in self._bounds}
+    
+    async def submit(self, item):
+        """Encola item y espera su resultado"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        """Cierra el lote en curso y lo lanza al ejecutor"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        self.batches += 1
+        self.items += len(batch)
+        bound = next(b for b in self._bounds if len(batch) <= b)
+        self.histogram[str(bound)] += 1
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = await self.executor.run(self.score_batch, items)
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], error=e)
+                return
+            # Una entrada inválida no debe arrastrar al resto: se reintenta una a una
+            self.fallbacks += 1
+            await asyncio.gather(*(self._run([entry]) for entry in batch))
+            return
+        
+        for (_, future), result in zip(batch, results):
+            self._resolve(future, result=result)
+    
+    @staticmethod
+    def _resolve(future, result=None, error=None):
+        # El cliente pudo cancelar la petición mientras esperaba
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "max_size": self.max_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "requests": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "batch_size_histogram": dict(self.histogram),
+            "fallbacks": self.fallbacks
+        }
+
+def match_is_competitive(match: MatchInput) -> int:
+    """is_competitive enviado, o derivado de goal_difference si no vino"""
+    if match.is_competitive is not None:
+        return match.is_competitive
+    return int(competitive_flag(match.goal_difference))
+
+def prepare_features(match: MatchInput) -> np.ndarray:
+    """Prepara features en el formato correcto para el modelo (fila float32)"""
+    return FEATURE_LAYOUT.row(match)
+
+def prepare_features_batch(matches: List[MatchInput]) -> np.ndarray:
+    """Construye una única matriz NumPy (n_partidas x n_features) para el modelo"""
+    return FEATURE_LAYOUT.rows(matches)
+
+def generate_synthetic_matches(n_matches: int, selected_mode: Optional[str] = None,
+                               rng: Optional[np.random.Generator] = None):
+    """
+    Motor vectorizado de partidas sintéticas.
+    Sortea todas las columnas con operaciones de arrays y retorna
+    (DataFrame con las partidas, matriz de features lista para el modelo).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    
+    # Modo de juego: fijo si se pidió uno válido, aleatorio en otro caso
+    if selected_mode and selected_mode in SYNTHETIC_GAME_MODES:
+        mode_idx = np.full(n_matches, SYNTHETIC_GAME_MODES.index(selected_mode))
+    else:
+        mode_idx = rng.integers(0, len(SYNTHETIC_GAME_MODES), n_matches)
+    
+    # Diferencia de goles ~ N(0, 3) truncada a entero y limitada a [-10, 10]
+    goal_diff = np.clip(rng.normal(0, 3, n_matches).astype(np.int64), -10, 10)
+    
+    # Duración ~ N(300, 60) limitada a [180, 600], con 30-120s extra si hubo overtime
+    duration = np.clip(rng.normal(300, 60, n_matches).astype(np.int64), 180, 600)
+    overtime = rng.random(n_matches) < 0.2
+    duration += np.where(overtime, rng.uniform(30, 120, n_matches).astype(np.int64), 0)
+    
+    # Mismo criterio que en el entrenamiento (features.competitive_flag)
+    is_comp = competitive_flag(goal_diff)
+    color_idx = rng.integers(0, len(SYNTHETIC_TEAM_COLORS), n_matches)
+    
+    # Codificación en bloque: se codifica cada categoría una vez y se indexa
+    color_codes = np.array([FEATURE_LAYOUT.team_code(c) for c in SYNTHETIC_TEAM_COLORS])
+    mode_names = np.array(SYNTHETIC_GAME_MODES)
+    
+    X = FEATURE_LAYOUT.matrix(
+        team_color_encoded=color_codes[color_idx],
+        game_mode=np.char.lower(mode_names)[mode_idx],
+        goal_difference=goal_diff,
+        match_duration=duration,
+        is_competitive=is_comp,
+        overtime=overtime
+    )
+    
+    df = pd.DataFrame({
+        'team_color': np.array(SYNTHETIC_TEAM_COLORS)[color_idx],
+        'game_mode': mode_names[mode_idx],
+        'goal_difference': goal_diff,
+        'match_duration': duration,
+        'overtime': overtime,
+        'is_competitive': is_comp
+    })
+    
+    return df, X
+
+def predict_proba(X: np.ndarray) -> np.ndarray:
+    """Probabilidades por clase; con el pool activo se calculan en un worker"""
+    if inference_pool is not None:
+        return inference_pool.submit(local_predict_proba, X).result()
+    return local_predict_proba(X)
+
+def local_predict_proba(X: np.ndarray) -> np.ndarray:
+    """Probabilidades por clase con el backend de inferencia activo, en este proceso"""
+    if flat_forest is not None and len(X) <= FLAT_MAX_BATCH_ROWS:
+        return flat_forest.predict_proba(X)
+    return model.predict_proba(model_matrix(model, X))
+
+def _score_features(features: tuple) -> tuple:
+    """Probabilidades para un vector de features ya normalizado"""
+    X = np.array([features], dtype=np.float32)
+    return tuple(predict_proba(X)[0].tolist())
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+class PredictionCache:
+    """
+    Caché LRU de probabilidades con la interfaz de functools.lru_cache
+    (llamada, cache_info, cache_clear), más get/put por separado para que el
+    micro-batcher consulte cada fila y puntúe solo las que faltan.
+    """
+    
+    def __init__(self, score, maxsize: int):
+        self.score = score
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def __call__(self, features: tuple) -> tuple:
+        probabilities = self.get(features)
+        if probabilities is None:
+            probabilities = self.score(features)
+            self.put(features, probabilities)
+        return probabilities
+    
+    def get(self, features: tuple):
+        """Probabilidades memorizadas o None; cuenta el acierto o el fallo"""
+        with self._lock:
+            probabilities = self._entries.get(features)
+            if probabilities is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(features)
+            return probabilities
+    
+    def put(self, features: tuple, probabilities: tuple):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[features] = probabilities
+            self._entries.move_to_end(features)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+    
+    def cache_clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+# Caché LRU de /predict: clave = tupla de features normalizada
+cached_probabilities = PredictionCache(_score_features, PREDICTION_CACHE_SIZE)
+
+def score_features(features: tuple):
+    """
+    Probabilidades de una partida: índice directo en la tabla precalculada
+    si está activa y la entrada cae en su rango; si no, caché LRU + modelo.
+    """
+    global lookup_hits, lookup_fallbacks
+    
+    if lookup_table is not None:
+        probabilities = lookup_table.lookup(features)
+        if probabilities is not None:
+            lookup_hits += 1
+            return probabilities
+        lookup_fallbacks += 1
+    
+    return cached_probabilities(features)
+
+lookup_hits = 0
+lookup_fallbacks = 0
+
+def build_prediction(match: MatchInput, probabilities: np.ndarray) -> dict:
+    """Arma la respuesta de una predicción a partir de sus probabilidades"""
+    
+    # La clase predicha es la de mayor probabilidad (equivalente a model.predict)
+    best = int(np.argmax(probabilities))
+    predicted_winner = WINNER_LABELS[best]
+    prob_dict = {WINNER_LABELS[i]: float(probabilities[i]) for i in range(len(WINNER_LABELS))}
+    
+    return {
+        "winner_prediction": predicted_winner,  # Nombre esperado por tests
+        "predicted_winner": predicted_winner,   # Mantener compatibilidad
+        "confidence": float(probabilities[best]),
+        "probabilities": prob_dict,
+        "input_data": {
+            "team_color": match.team_color,
+            "game_mode": match.game_mode,
+            "goal_difference": match.goal_difference,
+            "match_duration": match.match_duration,
+            "overtime": match.overtime,
+            "is_competitive": match_is_competitive(match)
+        }
+    }
 
 # === ENDPOINTS ===
 @app.get("/")
 async def root():
     """Root endpoint - compatible con tests"""
+    # La primera carga (o una recarga) lee los artefactos del disco: fuera del event loop
+    await io_executor.run(ensure_artifacts)
+    
     return {
         "status": "active",
         "message": "Rocket League Winner Prediction API v2.6",
         "endpoints": {
             "predict": "/predict",
+            "predict_batch": "/predict_batch",
             "generate_synthetic": "/generate_synthetic",
             "stats": "/stats",
+            "metrics": "/metrics",
+            "ready": "/ready",
             "docs": "/docs"
         },
+        "inference_backend": INFERENCE_BACKEND,
+        "pipeline_version": pipeline.version,
         "encoders": {
             "team_color_classes": team_encoder.classes_.tolist(),
             "winner_classes": winner_encoder.classes_.tolist()
         }
     }
 
+def predict_match(match: MatchInput) -> dict:
+    """Trabajo bloqueante de /predict"""
+    ensure_artifacts()
+    
+    # Preparar features
+    X = prepare_features(match)
+    
+    # Realizar predicción (tabla precalculada, acierto de caché o una pasada por el bosque)
+    probabilities = score_features(tuple(X[0].tolist()))
+    
+    return build_prediction(match, probabilities)
+
+def predict_matches(matches: List[MatchInput]) -> list:
+    """Trabajo bloqueante de /predict_batch"""
+    ensure_artifacts()
+    X = prepare_features_batch(matches)
+    probabilities = predict_proba(X)
+    return [build_prediction(match, probs) for match, probs in zip(matches, probabilities)]
+
+def predict_coalesced(matches: List[MatchInput]) -> list:
+    """Trabajo bloqueante de un lote del micro-batcher de /predict"""
+    ensure_artifacts()
+    if lookup_table is not None:
+        # La tabla ya responde cada partida en O(1): agrupar no aporta
+        return [predict_match(match) for match in matches]
+    
+    # Cada fila pasa primero por el caché; solo los fallos van al modelo, en una llamada
+    X = prepare_features_batch(matches)
+    keys = [tuple(row) for row in X.tolist()]
+    probabilities = [cached_probabilities.get(key) for key in keys]
+    misses = [i for i, probs in enumerate(probabilities) if probs is None]
+    if misses:
+        for i, probs in zip(misses, predict_proba(X[misses])):
+            probabilities[i] = tuple(probs.tolist())
+            cached_probabilities.put(keys[i], probabilities[i])
+    return [build_prediction(match, probs) for match, probs in zip(matches, probabilities)]
+
+def create_predict_batcher():
+    """Micro-batcher de /predict según la configuración, o None si está desactivado"""
+    if not MICROBATCH:
+        return None
+    return MicroBatcher(predict_coalesced, inference_executor,
+                        max_size=MICROBATCH_MAX_SIZE, max_wait_ms=MICROBATCH_MAX_WAIT_MS)
+
+predict_batcher = create_predict_batcher()
+
 @app.post("/predict")
 async def predict_winner(match: MatchInput):
     """
@@ -162,169 +787,176 @@ async def predict_winner(match: MatchInput):
     Retorna formato compatible con tests
     """
     try:
-        # Preparar features
-        X = prepare_features(match)
-        
-        # Realizar predicción
-        prediction = model.predict(X)[0]
-        probabilities = model.predict_proba(X)[0]
-        
-        # Decodificar predicción
-        predicted_winner = winner_encoder.inverse_transform([prediction])[0]
-        predicted_winner = normalize_winner(predicted_winner)
-        
-        # Obtener probabilidades por clase
-        winner_classes = [normalize_winner(w) for w in winner_encoder.classes_]
-        prob_dict = {winner_classes[i]: float(probabilities[i]) for i in range(len(winner_classes))}
+        if predict_batcher is not None:
+            return await predict_batcher.submit(match)
+        return await inference_executor.run(predict_match, match)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error en predicción: {str(e)}")
+
+@app.post("/predict_batch")
+async def predict_batch(request: BatchMatchInput):
+    """
+    Predice el ganador de muchas partidas en una sola llamada al modelo
+    Cada elemento de la respuesta tiene el mismo formato que /predict
+    """
+    n_matches = len(request.matches)
+    if n_matches > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Máximo {MAX_BATCH_SIZE} partidas por lote (recibidas: {n_matches})"
+        )
+    
+    try:
+        if n_matches == 0:
+            return {"total_matches": 0, "predictions": []}
         
         return {
-            "winner_prediction": predicted_winner,  # Nombre esperado por tests
-            "predicted_winner": predicted_winner,   # Mantener compatibilidad
-            "confidence": float(max(probabilities)),
-            "probabilities": prob_dict,
-            "input_data": {
-                "team_color": match.team_color,
-                "game_mode": match.game_mode,
-                "goal_difference": match.goal_difference,
-                "match_duration": match.match_duration,
-                "overtime": match.overtime,
-                "is_competitive": match.is_competitive
-            }
+            "total_matches": n_matches,
+            "predictions": await inference_executor.run(predict_matches, request.matches)
         }
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error en predicción: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error en predicción batch: {str(e)}")
+
+def run_synthetic(request: SyntheticRequest) -> dict:
+    """Trabajo bloqueante de /generate_synthetic: generar, puntuar y guardar"""
+    n_matches = request.n_matches
+    selected_mode = request.game_mode
+    
+    print(f"\n🔮 Generando {n_matches} partidas sintéticas...")
+    if selected_mode:
+        print(f"   Modo seleccionado: {selected_mode}")
+    
+    ensure_artifacts()
+    
+    # Generar y puntuar todas las partidas de una sola vez
+    rng = np.random.default_rng(request.seed)
+    df, X = generate_synthetic_matches(n_matches, selected_mode, rng)
+    
+    probabilities = predict_proba(X)
+    best = probabilities.argmax(axis=1)
+    winner_labels = np.array([w.lower() for w in WINNER_LABELS])
+    df['predicted_winner'] = winner_labels[best]
+    df['prediction_confidence'] = probabilities[np.arange(n_matches), best]
+    
+    # Guardar
+    output_path = DATA_DIR / "processed" / "synthetic_predictions.csv"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(output_path, index=False)
+    
+    # Calcular estadísticas
+    winner_counts = df['predicted_winner'].value_counts().to_dict()
+    avg_confidence = df['prediction_confidence'].mean()
+    
+    print(f"   ✅ {n_matches} predicciones generadas")
+    print(f"   📊 Distribución: {winner_counts}")
+    print(f"   🎯 Confianza promedio: {avg_confidence:.2%}")
+    
+    return {
+        "status": "success",
+        "file_path": str(output_path),
+        "summary": {
+            "total_matches": n_matches,
+            "predictions": winner_counts,
+            "avg_confidence": float(avg_confidence),
+            "game_mode_filter": selected_mode
+        }
+    }
 
 @app.post("/generate_synthetic")
 async def generate_synthetic(request: SyntheticRequest):
     """Genera predicciones sintéticas"""
     try:
-        n_matches = request.n_matches
-        selected_mode = request.game_mode
-        
-        print(f"\n🔮 Generando {n_matches} partidas sintéticas...")
-        if selected_mode:
-            print(f"   Modo seleccionado: {selected_mode}")
-        
-        # Generar datos sintéticos
-        np.random.seed(int(datetime.now().timestamp()))
-        
-        game_modes = ["Duel", "Doubles", "Standard"]
-        team_colors = ["Blue", "Orange"]
-        
-        if selected_mode and selected_mode in game_modes:
-            modes = [selected_mode] * n_matches
-        else:
-            modes = np.random.choice(game_modes, n_matches)
-        
-        # Generar features sintéticas
-        synthetic_data = []
-        for i in range(n_matches):
-            goal_diff = int(np.random.normal(0, 3))
-            goal_diff = max(-10, min(10, goal_diff))
-            
-            duration = int(np.random.normal(300, 60))
-            duration = max(180, min(600, duration))
-            
-            overtime = np.random.random() < 0.2
-            if overtime:
-                duration += int(np.random.uniform(30, 120))
-            
-            is_comp = 1 if np.random.random() < 0.7 else 0
-            team_color = np.random.choice(team_colors)
-            
-            match_data = MatchInput(
-                team_color=team_color,
-                game_mode=modes[i],
-                goal_difference=goal_diff,
-                match_duration=duration,
-                overtime=overtime,
-                is_competitive=is_comp
-            )
-            
-            # Predecir
-            X = prepare_features(match_data)
-            prediction = model.predict(X)[0]
-            probabilities = model.predict_proba(X)[0]
-            predicted_winner = winner_encoder.inverse_transform([prediction])[0]
-            
-            synthetic_data.append({
-                'team_color': team_color,
-                'game_mode': modes[i],
-                'goal_difference': goal_diff,
-                'match_duration': duration,
-                'overtime': overtime,
-                'is_competitive': is_comp,
-                'predicted_winner': normalize_winner(predicted_winner).lower(),
-                'prediction_confidence': float(max(probabilities))
-            })
-        
-        # Crear DataFrame y guardar
-        df = pd.DataFrame(synthetic_data)
-        output_path = DATA_DIR / "processed" / "synthetic_predictions.csv"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(output_path, index=False)
-        
-        # Calcular estadísticas
-        winner_counts = df['predicted_winner'].value_counts().to_dict()
-        avg_confidence = df['prediction_confidence'].mean()
-        
-        print(f"   ✅ {n_matches} predicciones generadas")
-        print(f"   📊 Distribución: {winner_counts}")
-        print(f"   🎯 Confianza promedio: {avg_confidence:.2%}")
-        
-        return {
-            "status": "success",
-            "file_path": str(output_path),
-            "summary": {
-                "total_matches": n_matches,
-                "predictions": winner_counts,
-                "avg_confidence": float(avg_confidence),
-                "game_mode_filter": selected_mode
-            }
-        }
-        
+        return await io_executor.run(run_synthetic, request)
     except Exception as e:
         print(f"   ❌ Error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error al generar datos sintéticos: {str(e)}")
 
+# Agregados de model_predictions (Parquet, Feather o CSV): se recalculan solo si el archivo cambia
+prediction_stats = PredictionStatsCache(lambda: find_table("model_predictions", DATA_DIR / "processed"))
+
+def compute_stats() -> dict:
+    """Trabajo bloqueante de /stats: agregados en memoria, releídos solo si el archivo cambió"""
+    return prediction_stats.get()
+
 @app.get("/stats")
 async def get_stats():
     """Obtiene estadísticas del modelo y datos"""
     try:
-        predictions_path = DATA_DIR / "processed" / "model_predictions.csv"
-        
-        if predictions_path.exists():
-            df = pd.read_csv(predictions_path)
-            
-            stats = {
-                "total_matches": len(df),
-                "game_modes": df['game_mode'].value_counts().to_dict(),
-                "predicted_winner_distribution": df['predicted_winner'].value_counts().to_dict(),
-                "avg_match_duration": float(df['match_duration'].mean()),
-                "overtime_percentage": float((df['overtime'].sum() / len(df)) * 100),
-                "goal_difference_stats": {
-                    "mean": float(df['goal_difference'].mean()),
-                    "std": float(df['goal_difference'].std()),
-                    "min": int(df['goal_difference'].min()),
-                    "max": int(df['goal_difference'].max())
-                }
-            }
-            
-            return stats
-        else:
-            return {
-                "message": "No hay predicciones guardadas aún",
-                "total_matches": 0
-            }
-            
+        return await io_executor.run(compute_stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas: {str(e)}")
 
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 cuando los modelos están cargados, 503 mientras tanto"""
+    if loaded_model_stamp is None or (SERVING_MODE == "process" and inference_pool is None):
+        return JSONResponse(status_code=503, content={"ready": False, "error": load_error})
+    
+    return {
+        "ready": True,
+        "load_seconds": load_seconds,
+        "pipeline_version": pipeline.version,
+        "model_backend": pipeline.metadata.get('backend', DEFAULT_BACKEND),
+        "inference_backend": INFERENCE_BACKEND,
+        "model_mmap": MODEL_MMAP,
+        "serving_mode": SERVING_MODE,
+        "inference_workers": inference_pool_size
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """Métricas internas de la API (caché, tabla precalculada, colas de ejecución y micro-batching)"""
+    info = cached_probabilities.cache_info()
+    lookups = info.hits + info.misses
+    
+    return {
+        "prediction_cache": {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+            "invalidations": cache_invalidations
+        },
+        "lookup_table": {
+            "enabled": lookup_table is not None,
+            "hits": lookup_hits,
+            "fallbacks": lookup_fallbacks
+        },
+        "executors": {
+            "inference": inference_executor.stats(),
+            "io": io_executor.stats()
+        },
+        "microbatch": predict_batcher.stats() if predict_batcher is not None else {"enabled": False}
+    }
+
 
 if __name__ == "__main__":
+    import argparse
     import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Servidor de la API de predicción")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--serving-mode", choices=["inline", "process"], default=SERVING_MODE,
+                        help="inline: inferencia en el proceso del servidor; "
+                             "process: pool de procesos con el modelo compartido")
+    parser.add_argument("--workers", type=int, default=INFERENCE_WORKERS,
+                        help="Procesos de inferencia en modo process")
+    parser.add_argument("--microbatch", action="store_true", default=MICROBATCH,
+                        help="Agrupar peticiones concurrentes de /predict en lotes")
+    args = parser.parse_args()
+    SERVING_MODE = args.serving_mode
+    INFERENCE_WORKERS = args.workers
+    MICROBATCH = args.microbatch
+    predict_batcher = create_predict_batcher()
+    
     print("\n=== INICIANDO SERVIDOR ===")
-    print("Accede a: http://localhost:8000")
-    print("Documentación: http://localhost:8000/docs")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    print(f"Modo de servicio: {SERVING_MODE}"
+          + (f" ({INFERENCE_WORKERS} workers)" if SERVING_MODE == "process" else ""))
+    if MICROBATCH:
+        print(f"Micro-batching: hasta {MICROBATCH_MAX_SIZE} partidas o {MICROBATCH_MAX_WAIT_MS} ms")
+    print(f"Accede a: http://localhost:{args.port}")
+    print(f"Documentación: http://localhost:{args.port}/docs")
+    uvicorn.run(app, host=args.host, port=args.port)
\ No newline at end of file
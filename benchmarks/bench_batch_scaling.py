@@ -0,0 +1,74 @@
+"""
+Benchmark de escalado de la puntuación batch en paralelo
+Puntúa una matriz de features aleatoria con ParallelScorer usando de 1 a N
+procesos y reporta filas/s y aceleración respecto a puntuar en el propio
+proceso. El tiempo de arranque del pool (cargar el modelo en cada worker) se
+mide aparte.
+
+Uso:
+    python benchmarks/bench_batch_scaling.py [--rows 1000000] [--max-workers 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "src"))
+
+from artifacts import MODEL_PATH, load_artifact
+from parallel_scoring import ParallelScorer
+
+
+def random_features(model, n_rows, seed=0):
+    """Partidas aleatorias dentro de los rangos reales de cada feature"""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.integers(0, 2, (n_rows, len(model.feature_names_in_))),
+                     columns=model.feature_names_in_)
+    X['goal_difference'] = rng.integers(-10, 11, n_rows)
+    X['match_duration'] = rng.integers(150, 800, n_rows)
+    return X
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalado de la puntuación batch de 1 a N procesos")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Filas a puntuar")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    model = load_artifact(MODEL_PATH, mmap=True)
+    model.n_jobs = 1
+    X = random_features(model, args.rows)
+
+    start = time.perf_counter()
+    expected = model.predict_proba(X)
+    baseline = time.perf_counter() - start
+    print(f"CPUs disponibles: {os.cpu_count()}")
+    print(f"{'Procesos':<10} {'arranque (s)':>13} {'puntuar (s)':>12} {'filas/s':>12} {'aceleración':>12}")
+    print(f"{'en proceso':<10} {'-':>13} {baseline:>12.2f} {args.rows / baseline:>12,.0f} {1.0:>11.2f}x")
+
+    workers = 1
+    while workers <= args.max_workers:
+        start = time.perf_counter()
+        with ParallelScorer(workers) as scorer:
+            # Una llamada mínima para que todos los workers carguen el modelo
+            scorer.predict_proba(X.iloc[:workers * scorer.shards_per_worker])
+            startup = time.perf_counter() - start
+
+            start = time.perf_counter()
+            probabilities = scorer.predict_proba(X)
+            elapsed = time.perf_counter() - start
+
+        assert np.array_equal(probabilities, expected)
+        print(f"{workers:<10} {startup:>13.2f} {elapsed:>12.2f} {args.rows / elapsed:>12,.0f} "
+              f"{baseline / elapsed:>11.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark de arranque en frío de la API
+Mide, en un proceso Python nuevo por configuración, el tiempo de importar
+api/main.py y el tiempo desde la importación hasta la primera respuesta de
+/predict (que incluye la carga diferida de los modelos).
+
+Uso:
+    python benchmarks/bench_cold_start.py [--repeats 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Código que se ejecuta en cada proceso hijo
+CHILD_CODE = """
+import json, sys, time, io, contextlib
+t0 = time.perf_counter()
+sys.path.insert(0, {api_dir!r})
+with contextlib.redirect_stdout(io.StringIO()):
+    import main
+    t_import = time.perf_counter()
+    from fastapi.testclient import TestClient
+    client = TestClient(main.app)
+    response = client.post("/predict", json={{
+        "team_color": "Blue", "game_mode": "Duel", "goal_difference": 2,
+        "match_duration": 320, "overtime": False
+    }})
+    t_first = time.perf_counter()
+assert response.status_code == 200, response.text
+print(json.dumps({{"import": t_import - t0, "first_response": t_first - t0}}))
+"""
+
+CONFIGS = [
+    ("sklearn, sin mmap", {"RL_INFERENCE_BACKEND": "sklearn", "RL_MODEL_MMAP": "0"}),
+    ("sklearn, mmap", {"RL_INFERENCE_BACKEND": "sklearn", "RL_MODEL_MMAP": "1"}),
+    ("flat, sin mmap", {"RL_INFERENCE_BACKEND": "flat", "RL_MODEL_MMAP": "0"}),
+    ("flat, mmap", {"RL_INFERENCE_BACKEND": "flat", "RL_MODEL_MMAP": "1"}),
+]
+
+
+def run_once(env_overrides):
+    env = dict(os.environ, **env_overrides)
+    code = CHILD_CODE.format(api_dir=str(BASE_DIR / "api"))
+    result = subprocess.run([sys.executable, "-c", code], env=env, cwd=BASE_DIR,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío de la API")
+    parser.add_argument("--repeats", type=int, default=5, help="Procesos por configuración")
+    args = parser.parse_args()
+
+    print(f"{'Configuración':<20} {'import (ms)':>12} {'1ª respuesta (ms)':>18}")
+    for name, env_overrides in CONFIGS:
+        runs = [run_once(env_overrides) for _ in range(args.repeats)]
+        import_ms = statistics.median(r["import"] for r in runs) * 1000
+        first_ms = statistics.median(r["first_response"] for r in runs) * 1000
+        print(f"{name:<20} {import_ms:>12.0f} {first_ms:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark de memoria por etapa: tipos anteriores (object/int64) vs esquema compacto
+Genera partidas crudas como las que entrega read_excel y arma cada tabla del
+pipeline de dos formas: con los tipos que se usaban antes (textos object,
+enteros int64) y con el esquema central de src/schema.py. Reporta la memoria
+de cada tabla (memory_usage(deep=True)) y la reducción.
+
+Uso:
+    python benchmarks/bench_dtype_memory.py [--rows 1000000]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "src"))
+
+from cleaning import clean_data
+from features import create_features
+from schema import ENCODED_SCHEMA, PREDICTION_SCHEMA, apply_schema, memory_mb
+
+
+def raw_matches(n_rows, seed=0):
+    """Partidas con los tipos con que read_excel lee rocket_league_matches.xlsx"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'match_id': np.arange(n_rows),
+        'match_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24 * 3600, n_rows), unit='s'),
+        'team_color': np.array(['Blue', 'Orange'], dtype=object)[rng.integers(0, 2, n_rows)],
+        'game_mode': np.array(['Duel', 'Doubles', 'Standard'], dtype=object)[rng.integers(0, 3, n_rows)],
+        'goal_difference': rng.integers(-6, 7, n_rows),
+        'match_duration': rng.integers(180, 700, n_rows),
+        'overtime': rng.random(n_rows) < 0.2,
+        'winner': np.array(['Blue', 'Orange'], dtype=object)[rng.integers(0, 2, n_rows)],
+    })
+
+
+def legacy_tables(raw):
+    """Las tablas con los tipos de antes del esquema compacto"""
+    matches = raw.copy()
+    for col in ['team_color', 'game_mode', 'winner']:
+        matches[col] = matches[col].astype(str)
+
+    features = create_features(matches.copy())
+    features['is_competitive'] = features['is_competitive'].astype('int64')
+    features['team_mode'] = features['team_color'] + '_' + features['game_mode']
+
+    encoded = features.copy()
+    encoded['team_color_encoded'] = (encoded['team_color'] == 'Orange').astype('int64')
+    encoded = pd.get_dummies(encoded, columns=['game_mode'], prefix='mode')
+    encoded['winner_encoded'] = (encoded['winner'] == 'Orange').astype('int64')
+
+    predictions = features[['team_color', 'game_mode', 'goal_difference', 'match_duration',
+                            'overtime', 'is_competitive', 'winner']].copy()
+    predictions['winner'] = predictions['winner'].str.lower()
+    predictions['predicted_winner'] = predictions['winner']
+    predictions['prediction_confidence'] = 0.9
+    return matches, features, encoded, predictions
+
+
+def compact_tables(raw):
+    """Las mismas tablas con el esquema de src/schema.py"""
+    matches = clean_data(raw.copy())
+    features = create_features(matches.copy())
+
+    encoded = features.copy()
+    encoded['team_color_encoded'] = encoded['team_color'].cat.codes
+    encoded = pd.get_dummies(encoded, columns=['game_mode'], prefix='mode')
+    encoded['winner_encoded'] = encoded['winner'].cat.codes
+    encoded = apply_schema(encoded, ENCODED_SCHEMA)
+
+    predictions = features[['team_color', 'game_mode', 'goal_difference', 'match_duration',
+                            'overtime', 'is_competitive', 'winner']].copy()
+    predictions['winner'] = predictions['winner'].str.lower()
+    predictions['predicted_winner'] = predictions['winner']
+    predictions['prediction_confidence'] = 0.9
+    return matches, features, encoded, apply_schema(predictions, PREDICTION_SCHEMA)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria por etapa con y sin esquema compacto")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Filas de la tabla")
+    args = parser.parse_args()
+
+    print(f"Generando {args.rows:,} partidas...")
+    raw = raw_matches(args.rows)
+    names = ['processed_matches', 'processed_features', 'processed_encoded', 'model_predictions']
+
+    print(f"{'Tabla':<20} {'antes (MB)':>11} {'compacto (MB)':>14} {'reducción':>10}")
+    for name, legacy, compact in zip(names, legacy_tables(raw), compact_tables(raw)):
+        before, after = memory_mb(legacy), memory_mb(compact)
+        print(f"{name:<20} {before:>11.1f} {after:>14.1f} {before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark de la reconstrucción de game_mode desde las columnas one-hot
+Compara el df.apply(axis=1) fila a fila que usaban los scripts de predicción
+con features.decode_game_mode (argmax vectorizado) y verifica que ambos den
+el mismo resultado.
+
+Uso:
+    python benchmarks/bench_game_mode_decode.py [--rows 1000000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "src"))
+
+from features import GAME_MODES, decode_game_mode
+
+
+def reconstruct_game_mode(row):
+    """Versión fila a fila anterior (referencia)"""
+    if row.get('mode_Duel', 0) == 1:
+        return 'Duel'
+    elif row.get('mode_Doubles', 0) == 1:
+        return 'Doubles'
+    elif row.get('mode_Standard', 0) == 1:
+        return 'Standard'
+    return 'Unknown'
+
+
+def encoded_modes(n_rows, seed=0):
+    """Columnas one-hot como las de processed_encoded (~1% sin modo)"""
+    rng = np.random.default_rng(seed)
+    mode_idx = rng.integers(0, len(GAME_MODES), n_rows)
+    unknown = rng.random(n_rows) < 0.01
+    return pd.DataFrame({
+        f'mode_{mode}': (mode_idx == i) & ~unknown
+        for i, mode in enumerate(GAME_MODES)
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="df.apply vs decodificación vectorizada de game_mode")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = encoded_modes(args.rows)
+
+    start = time.perf_counter()
+    expected = df.apply(reconstruct_game_mode, axis=1)
+    apply_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = decode_game_mode(df)
+    vectorized_s = time.perf_counter() - start
+
+    assert (np.asarray(decoded, dtype=object) == expected.to_numpy()).all()
+    print(f"{'Método':<22} {'tiempo (s)':>11} {'filas/s':>14}")
+    print(f"{'df.apply (antes)':<22} {apply_s:>11.3f} {args.rows / apply_s:>14,.0f}")
+    print(f"{'decode_game_mode':<22} {vectorized_s:>11.3f} {args.rows / vectorized_s:>14,.0f}")
+    print(f"Aceleración: {apply_s / vectorized_s:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
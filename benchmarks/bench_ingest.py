@@ -0,0 +1,63 @@
+"""
+Benchmark de la ingesta del Excel crudo: pd.read_excel vs copia columnar
+Genera un Excel con las columnas de rocket_league_matches.xlsx y mide el
+parseo con cada motor disponible, la conversión inicial de src/ingest.py y
+las lecturas siguientes desde la copia.
+
+Uso:
+    python benchmarks/bench_ingest.py [--rows 200000] [--repeats 3]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "src"))
+sys.path.insert(0, str(BASE_DIR / "benchmarks"))
+
+from bench_storage import synthetic_matches
+from ingest import HAS_CALAMINE, ingest_raw, load_raw_matches
+from storage import MATCH_SCHEMA
+
+
+def timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempos de lectura del Excel crudo")
+    parser.add_argument("--rows", type=int, default=200_000, help="Filas del Excel")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    print(f"Generando Excel de {args.rows:,} filas...")
+    df = synthetic_matches(args.rows)[list(MATCH_SCHEMA)]
+    engines = ["openpyxl"] + (["calamine"] if HAS_CALAMINE else [])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx_path = Path(tmp) / "matches.xlsx"
+        df.to_excel(xlsx_path, index=False)
+
+        print(f"{'Lectura':<32} {'tiempo (s)':>11}")
+        for engine in engines:
+            seconds = timed(lambda: pd.read_excel(xlsx_path, engine=engine), 1)
+            print(f"{'read_excel (' + engine + ')':<32} {seconds:>11.2f}")
+        seconds = timed(lambda: ingest_raw(xlsx_path, force=True), 1)
+        print(f"{'ingest_raw (conversión)':<32} {seconds:>11.2f}")
+        seconds = timed(lambda: load_raw_matches(xlsx_path), args.repeats)
+        print(f"{'load_raw_matches (copia)':<32} {seconds:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
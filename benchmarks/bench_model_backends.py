@@ -0,0 +1,75 @@
+"""
+Benchmark de los backends de modelo (src/model_backends.py)
+Entrena cada backend con sus parámetros por defecto sobre la misma partición
+de processed_encoded que train_model.py y reporta tiempo de entrenamiento,
+F1 macro en prueba, tamaño del artefacto, filas/s puntuando un lote grande y
+predicciones/s de una fila (como llega una petición a /predict).
+
+Uso (después de encode_and_pipeline.py):
+    python benchmarks/bench_model_backends.py [--rows 1000000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "src"))
+
+from artifacts import load_artifact, save_artifact
+from model_backends import BACKENDS, evaluate
+from model_pipeline import ENCODER_PATH
+from storage import read_table
+from tuning import single_row_latency_ms, split_train_test
+
+
+def random_features(feature_names, n_rows, seed=0):
+    """Partidas aleatorias dentro de los rangos reales de cada feature"""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.integers(0, 2, (n_rows, len(feature_names))), columns=feature_names)
+    X['goal_difference'] = rng.integers(-10, 11, n_rows)
+    X['match_duration'] = rng.integers(150, 800, n_rows)
+    return X.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los backends de modelo")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Filas del lote a puntuar")
+    args = parser.parse_args()
+
+    features = load_artifact(ENCODER_PATH, mmap=False).feature_names
+    df = read_table('processed_encoded')
+    X_train, X_test, y_train, y_test = split_train_test(df[features], df['winner_encoded'])
+    X_batch = random_features(features, args.rows)
+
+    print(f"Entrenamiento: {len(X_train):,} filas, lote: {args.rows:,} filas")
+    print(f"{'Backend':<24} {'entrenar (s)':>13} {'F1 macro':>9} {'tamaño (MB)':>12} "
+          f"{'lote filas/s':>13} {'1 fila pred/s':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in BACKENDS.values():
+            start = time.perf_counter()
+            model = backend.build(n_jobs=-1).fit(X_train, y_train)
+            train_seconds = time.perf_counter() - start
+
+            f1 = evaluate(model, X_test, y_test)['f1_macro']
+            size_mb = save_artifact(model, Path(tmp) / backend.model_file).stat().st_size / 1e6
+
+            # Puntuación en un hilo, como en cada worker de la puntuación batch
+            if hasattr(model, 'n_jobs'):
+                model.n_jobs = 1
+            start = time.perf_counter()
+            model.predict_proba(X_batch)
+            batch_seconds = time.perf_counter() - start
+            single_row_per_second = 1000 / single_row_latency_ms(model, X_test)
+
+            print(f"{backend.name:<24} {train_seconds:>13.2f} {f1:>9.4f} {size_mb:>12.2f} "
+                  f"{args.rows / batch_seconds:>13,.0f} {single_row_per_second:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark de throughput de la API según el modo de servicio
+Levanta un servidor uvicorn real por configuración (inline y pool de procesos),
+lo satura con clientes concurrentes y mide:
+  - peticiones/segundo y latencia p50/p95 de /predict (sin caché, entradas variadas)
+  - peticiones/segundo de /predict_batch con lotes de --batch-rows partidas
+  - latencia p95 de /ready mientras tanto (cuánto se bloquea el event loop)
+
+Uso:
+    python benchmarks/bench_serving.py [--workers 4] [--clients 8] [--seconds 10]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def random_match(rng):
+    return {
+        "team_color": rng.choice(["Blue", "Orange"]),
+        "game_mode": rng.choice(["Duel", "Doubles", "Standard"]),
+        "goal_difference": rng.randint(-10, 10),
+        "match_duration": rng.randint(180, 720),
+        "overtime": rng.random() < 0.2,
+        "is_competitive": rng.randint(0, 1)
+    }
+
+
+def start_server(port, serving_mode, workers):
+    env = dict(os.environ, RL_PREDICTION_CACHE_SIZE="0")
+    server = subprocess.Popen(
+        [sys.executable, str(BASE_DIR / "api" / "main.py"), "--port", str(port),
+         "--host", "127.0.0.1", "--serving-mode", serving_mode, "--workers", str(workers)],
+        env=env, cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/ready").status_code == 200:
+                return server, url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"El servidor ({serving_mode}) no quedó listo a tiempo")
+
+
+def load_test(url, path, make_body, clients, seconds):
+    """Clientes concurrentes durante `seconds`; retorna (req/s, latencias) y p95 de /ready"""
+    latencies = []
+    ready_latencies = []
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def client_loop(seed):
+        rng = random.Random(seed)
+        with httpx.Client(base_url=url, timeout=60) as http:
+            while time.monotonic() < stop:
+                body = make_body(rng)
+                t0 = time.perf_counter()
+                http.post(path, json=body).raise_for_status()
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    latencies.append(elapsed)
+
+    def ready_probe():
+        with httpx.Client(base_url=url, timeout=60) as http:
+            while time.monotonic() < stop:
+                t0 = time.perf_counter()
+                http.get("/ready")
+                ready_latencies.append(time.perf_counter() - t0)
+                time.sleep(0.05)
+
+    threads = [threading.Thread(target=client_loop, args=(i,)) for i in range(clients)]
+    threads.append(threading.Thread(target=ready_probe))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return len(latencies) / seconds, latencies, ready_latencies
+
+
+def p95(values):
+    return statistics.quantiles(values, n=20)[-1] if len(values) > 1 else values[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de throughput por modo de servicio")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Procesos de inferencia en modo process")
+    parser.add_argument("--clients", type=int, default=8, help="Clientes concurrentes")
+    parser.add_argument("--seconds", type=float, default=10, help="Duración de cada prueba")
+    parser.add_argument("--batch-rows", type=int, default=1000, help="Partidas por /predict_batch")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()} | clientes: {args.clients} | {args.seconds:.0f}s por prueba\n")
+    print(f"{'Modo':<22} {'Endpoint':<15} {'req/s':>8} {'p50 (ms)':>9} "
+          f"{'p95 (ms)':>9} {'/ready p95 (ms)':>16}")
+
+    for serving_mode in ("inline", "process"):
+        server, url = start_server(args.port, serving_mode, args.workers)
+        label = serving_mode if serving_mode == "inline" else f"process ({args.workers} workers)"
+        try:
+            tests = [
+                ("/predict", "/predict", random_match),
+                ("/predict_batch", "/predict_batch",
+                 lambda rng: {"matches": [random_match(rng) for _ in range(args.batch_rows)]}),
+            ]
+            for name, path, make_body in tests:
+                rps, latencies, ready_latencies = load_test(url, path, make_body,
+                                                            args.clients, args.seconds)
+                print(f"{label:<22} {name:<15} {rps:>8.1f} "
+                      f"{statistics.median(latencies) * 1000:>9.1f} {p95(latencies) * 1000:>9.1f} "
+                      f"{p95(ready_latencies) * 1000:>16.1f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
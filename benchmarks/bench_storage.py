@@ -0,0 +1,85 @@
+"""
+Benchmark de almacenamiento de las tablas del pipeline: CSV vs Parquet vs Feather
+Genera una tabla con el esquema de processed_features (incluye las categorías
+de pd.cut), la guarda en cada formato con src/storage.py y mide el tiempo de
+escritura, de lectura completa y de lectura de solo dos columnas, además del
+tamaño en disco.
+
+Uso:
+    python benchmarks/bench_storage.py [--rows 10000000] [--repeats 3]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR / "src"))
+
+from features import create_features
+from storage import FEATURE_SCHEMA, HAS_PYARROW, apply_schema, read_frame, table_path, write_frame
+
+PROJECTED_COLUMNS = ['goal_difference', 'duration_bucket']
+
+
+def synthetic_matches(n_rows, seed=0):
+    """Partidas aleatorias con las columnas de processed_matches"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'match_id': np.arange(n_rows),
+        'match_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24 * 3600, n_rows), unit='s'),
+        'team_color': np.array(['Blue', 'Orange'])[rng.integers(0, 2, n_rows)],
+        'game_mode': np.array(['Duel', 'Doubles', 'Standard'])[rng.integers(0, 3, n_rows)],
+        'goal_difference': rng.integers(-6, 7, n_rows),
+        'match_duration': rng.integers(180, 700, n_rows),
+        'overtime': rng.random(n_rows) < 0.2,
+        'winner': np.array(['Blue', 'Orange', 'Draw'])[rng.integers(0, 3, n_rows)],
+    })
+    return create_features(df)
+
+
+def timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempos de carga por formato de almacenamiento")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Filas de la tabla")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    formats = ["csv", "parquet", "feather"] if HAS_PYARROW else ["csv"]
+    print(f"Generando {args.rows:,} filas...")
+    df = synthetic_matches(args.rows)
+    # Tipos con los que write_frame guarda la tabla (esquema compacto)
+    stored_dtypes = apply_schema(df, FEATURE_SCHEMA).dtypes
+
+    print(f"{'Formato':<9} {'MB':>8} {'escritura (s)':>14} {'lectura (s)':>12} "
+          f"{'2 columnas (s)':>15} {'tipos ok':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in formats:
+            path = table_path("processed_features", fmt, tmp)
+            write_s = timed(lambda: write_frame(df, path, FEATURE_SCHEMA), 1)
+            read_s = timed(lambda: read_frame(path, schema=FEATURE_SCHEMA), args.repeats)
+            projected_s = timed(lambda: read_frame(path, columns=PROJECTED_COLUMNS, schema=FEATURE_SCHEMA),
+                                args.repeats)
+            # Sin esquema, ¿vuelven las categorías y las fechas tal como se guardaron?
+            types_ok = read_frame(path).dtypes.equals(stored_dtypes)
+            size_mb = path.stat().st_size / 1e6
+            print(f"{fmt:<9} {size_mb:>8.1f} {write_s:>14.2f} {read_s:>12.2f} "
+                  f"{projected_s:>15.2f} {'sí' if types_ok else 'no':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark de latencia de cola de /predict con generación sintética en paralelo
+Mide p50/p95/p99 de /predict con --clients clientes, primero solos y luego
+mientras otro cliente pide /generate_synthetic de --synthetic-rows partidas
+sin pausa.
+
+Uso:
+    python benchmarks/bench_tail_latency.py [--clients 4] [--seconds 10]
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+import httpx
+
+from bench_serving import random_match, start_server
+
+
+def percentiles(values):
+    q = statistics.quantiles(values, n=100)
+    return statistics.median(values), q[94], q[98]
+
+
+def measure(url, clients, seconds, synthetic_rows=None):
+    latencies = []
+    synthetic_done = []
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def predict_loop(seed):
+        rng = random.Random(seed)
+        with httpx.Client(base_url=url, timeout=120) as http:
+            while time.monotonic() < stop:
+                t0 = time.perf_counter()
+                http.post("/predict", json=random_match(rng)).raise_for_status()
+                with lock:
+                    latencies.append(time.perf_counter() - t0)
+                time.sleep(0.01)
+
+    def synthetic_loop():
+        with httpx.Client(base_url=url, timeout=120) as http:
+            while time.monotonic() < stop:
+                http.post("/generate_synthetic", json={"n_matches": synthetic_rows}).raise_for_status()
+                synthetic_done.append(1)
+
+    threads = [threading.Thread(target=predict_loop, args=(i,)) for i in range(clients)]
+    if synthetic_rows:
+        threads.append(threading.Thread(target=synthetic_loop))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return percentiles(latencies), len(synthetic_done)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de /predict con carga sintética en paralelo")
+    parser.add_argument("--clients", type=int, default=4, help="Clientes de /predict")
+    parser.add_argument("--seconds", type=float, default=10, help="Duración de cada prueba")
+    parser.add_argument("--synthetic-rows", type=int, default=100_000,
+                        help="Partidas por petición a /generate_synthetic")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    server, url = start_server(args.port, "inline", 1)
+    try:
+        print(f"{'Escenario':<28} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'lotes sintéticos':>17}")
+        for name, rows in (("/predict solo", None),
+                           (f"+ sintético ({args.synthetic_rows:,})", args.synthetic_rows)):
+            (p50, p95, p99), n_synthetic = measure(url, args.clients, args.seconds, rows)
+            print(f"{name:<28} {p50 * 1000:>9.1f} {p95 * 1000:>9.1f} {p99 * 1000:>9.1f} {n_synthetic:>17}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
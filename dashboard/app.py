@@ -6,6 +6,7 @@ import dash_bootstrap_components as dbc
 import requests
 from datetime import datetime
 from pathlib import Path
+import sys
 
 # === App con Bootstrap ===
 app = Dash(__name__, external_stylesheets=[
@@ -15,13 +16,16 @@ app = Dash(__name__, external_stylesheets=[
 
 # === Variable global para datos ===
 BASE_DIR = Path(__file__).resolve().parent.parent
-PREDICTIONS_FILE = BASE_DIR / "data" / "processed" / "model_predictions.csv"
-df = pd.read_csv(PREDICTIONS_FILE)
+sys.path.insert(0, str(BASE_DIR / "src"))
+from storage import read_table
+
+# Tabla de predicciones en su formato más reciente (Parquet, Feather o CSV)
+df = read_table('model_predictions')
 
 # === Calcular métricas globales ===
 def calculate_metrics(data):
     if "winner" in data.columns:
-        accuracy = (data["winner"] == data["predicted_winner"]).mean() * 100
+        accuracy = (data["winner"].to_numpy() == data["predicted_winner"].to_numpy()).mean() * 100
     else:
         accuracy = data.get("prediction_confidence", pd.Series([0.95] * len(data))).mean() * 100
     total_matches = len(data)
@@ -330,7 +334,8 @@ def update_graphs(selected_mode, stored_data):
     acc, total, blue, orange = calculate_metrics(filtered)
 
     # Gráfico de torta mejorado con colores correctos
-    pred_counts = filtered["predicted_winner"].value_counts().reset_index()
+    pred_counts = filtered["predicted_winner"].value_counts()
+    pred_counts = pred_counts[pred_counts > 0].reset_index()
     pred_counts.columns = ["winner", "count"]
     
     color_map = {
@@ -364,7 +369,7 @@ def update_graphs(selected_mode, stored_data):
 
     # Gráfico de comparación
     if "winner" in filtered.columns:
-        compare = filtered.groupby(["winner", "predicted_winner"]).size().reset_index(name="count")
+        compare = filtered.groupby(["winner", "predicted_winner"], observed=True).size().reset_index(name="count")
         compare["winner"] = compare["winner"].str.capitalize()
         compare["predicted_winner"] = compare["predicted_winner"].str.capitalize()
         
@@ -391,7 +396,7 @@ def update_graphs(selected_mode, stored_data):
             hovermode='x unified'
         )
     else:
-        compare = filtered.groupby(["game_mode", "predicted_winner"]).size().reset_index(name="count")
+        compare = filtered.groupby(["game_mode", "predicted_winner"], observed=True).size().reset_index(name="count")
         compare["game_mode"] = compare["game_mode"].str.capitalize()
         compare["predicted_winner"] = compare["predicted_winner"].str.capitalize()
         
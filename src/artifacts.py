@@ -0,0 +1,40 @@
+"""
+Utilidades para guardar y cargar los artefactos del modelo
+Los artefactos se guardan con joblib sin compresión: así los arrays NumPy
+quedan en el archivo tal cual y se pueden abrir con mmap_mode='r', de forma
+que varios procesos (p. ej. workers de uvicorn) comparten las mismas páginas
+a través del sistema operativo en lugar de tener cada uno su copia.
+"""
+
+import hashlib
+from pathlib import Path
+
+import joblib
+
+# Rutas
+BASE_DIR = Path(__file__).resolve().parent.parent
+MODELS_DIR = BASE_DIR / "data" / "models"
+MODEL_PATH = MODELS_DIR / "random_forest_model.pkl"
+FLAT_FOREST_PATH = MODELS_DIR / "flat_forest.pkl"
+
+
+def file_sha256(path):
+    """Hash SHA-256 del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_artifact(obj, path):
+    """Guarda un artefacto en formato compatible con memory-map (sin compresión)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(obj, path, compress=0)
+    return path
+
+
+def load_artifact(path, mmap=True):
+    """Carga un artefacto; con mmap=True sus arrays se abren en modo solo lectura"""
+    return joblib.load(path, mmap_mode='r' if mmap else None)
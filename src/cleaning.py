@@ -1,5 +1,9 @@
 import pandas as pd
 
+from ingest import load_raw_matches
+from schema import MATCH_SCHEMA, apply_schema, memory_mb
+from storage import write_table
+
 def clean_data(df):
     # Convertir fechas a formato datetime
     df['match_date'] = pd.to_datetime(df['match_date'])
@@ -9,11 +13,15 @@ def clean_data(df):
     df['game_mode'] = df['game_mode'].astype(str)
     df['winner'] = df['winner'].astype(str)
 
-    return df
+    # Tipos compactos: category para los textos, enteros chicos para los números
+    return apply_schema(df, MATCH_SCHEMA)
 
 if __name__ == "__main__":
-    df = pd.read_excel('data/raw/rocket_league_matches.xlsx')
+    # Copia columnar del Excel (se convierte solo si el Excel cambió)
+    df = load_raw_matches()
+    raw_mb = memory_mb(df)
     df_clean = clean_data(df)
-    df_clean.to_csv('data/processed/processed_matches.csv', index=False)
-    print("Archivo generado: data/processed/processed_matches.csv")
+    output_path = write_table(df_clean, 'processed_matches')
+    print(f"Archivo generado: {output_path}")
     print("Shape:", df_clean.shape)
+    print(f"Memoria: {raw_mb:.2f} MB crudo -> {memory_mb(df_clean):.2f} MB")
@@ -0,0 +1,256 @@
+"""
+Compresión del modelo entrenado: poda del bosque y destilación
+1. Poda: elige árboles del bosque de forma greedy (en cada paso el que más
+   sube el F1 macro del subconjunto en validación) hasta quedar a menos de
+   --tolerance del F1 del bosque completo. Solo con el backend random_forest;
+   otros modelos (hist_gradient_boosting) se comparan tal cual.
+2. Destilación (opcional, --distill tree|hgb): entrena un solo árbol poco
+   profundo o un HistGradientBoosting con las predicciones del bosque sobre
+   las filas de entrenamiento más filas sintéticas.
+
+De los candidatos que cumplen la tolerancia se guarda el de menor latencia
+en data/models/compressed_model.pkl, junto con su pipeline
+(match_pipeline_compressed.pkl, que la API usa con
+RL_PIPELINE_FILE=match_pipeline_compressed.pkl). El modelo original no se
+toca. Se informa tamaño, tiempo de carga y latencia por fila de cada uno.
+
+La selección de árboles y la tolerancia usan una validación separada de la
+partición de entrenamiento de train_model.py (VALIDATION_SIZE); el F1 que se
+informa (f1_test) es el de la partición de prueba (misma semilla), que no
+interviene en ninguna decisión.
+
+Uso (después de train_model.py):
+    python src/compress_model.py [--tolerance 0.005] [--distill none|tree|hgb]
+"""
+
+import argparse
+import copy
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from artifacts import MODELS_DIR, file_sha256, save_artifact
+from model_backends import backend_name
+from model_pipeline import MatchPipeline, load_pipeline, save_pipeline
+from sklearn.model_selection import train_test_split
+
+from storage import read_table
+from tuning import F1_TOLERANCE, SPLIT_SEED, single_row_latency_ms, split_train_test
+
+# Rutas
+COMPRESSED_MODEL_PATH = MODELS_DIR / "compressed_model.pkl"
+COMPRESSED_PIPELINE_PATH = MODELS_DIR / "match_pipeline_compressed.pkl"
+COMPRESSION_REPORT_PATH = MODELS_DIR / "compression_report.csv"
+
+# Alumnos de la destilación
+STUDENTS = {
+    'tree': lambda: DecisionTreeClassifier(max_depth=8, min_samples_leaf=2, random_state=42),
+    'hgb': lambda: HistGradientBoostingClassifier(max_iter=50, max_depth=4, random_state=42),
+}
+
+# Fracción del entrenamiento reservada para elegir árboles y aplicar la tolerancia
+VALIDATION_SIZE = 0.25
+
+# Filas sintéticas por fila de entrenamiento al destilar
+SYNTHETIC_FACTOR = 20
+
+# Cargas por artefacto al medir el tiempo de carga (se informa la mínima)
+LOAD_REPEATS = 3
+
+
+def macro_f1(y_true, predictions, n_classes):
+    """
+    F1 macro sobre las clases 0..n_classes-1 de una o varias predicciones
+    (predictions de forma (n,) o (candidatos, n)); igual a
+    f1_score(..., average='macro', labels=range(n_classes)).
+    """
+    predictions = np.atleast_2d(predictions)
+    scores = np.zeros(len(predictions))
+    for c in range(n_classes):
+        predicted = predictions == c
+        actual = (y_true == c)[None, :]
+        tp = (predicted & actual).sum(axis=1)
+        denominator = predicted.sum(axis=1) + actual.sum()
+        scores += np.divide(2 * tp, denominator, out=np.zeros(len(predictions)), where=denominator > 0)
+    return scores / n_classes
+
+
+def select_trees(model, X_val, y_val, tolerance=F1_TOLERANCE):
+    """
+    Selección greedy de árboles. Retorna (índices elegidos en orden, F1 del
+    subconjunto, F1 del bosque completo).
+    """
+    X_val = np.asarray(X_val, dtype=np.float32)
+    y_val = np.asarray(y_val)
+    n_classes = len(model.classes_)
+    # Probabilidades de cada árbol: el bosque promedia estas matrices
+    probas = np.stack([tree.predict_proba(X_val) for tree in model.estimators_])
+    target = macro_f1(y_val, probas.mean(axis=0).argmax(axis=1), n_classes)[0]
+
+    selected = []
+    remaining = list(range(len(probas)))
+    total = np.zeros(probas.shape[1:])
+    score = 0.0
+    while remaining:
+        # F1 de agregar cada árbol restante, todos a la vez
+        candidates = (total[None] + probas[remaining]).argmax(axis=2)
+        scores = macro_f1(y_val, candidates, n_classes)
+        best = int(scores.argmax())
+        score = float(scores[best])
+        total += probas[remaining[best]]
+        selected.append(remaining.pop(best))
+        if score >= target - tolerance:
+            break
+    return selected, score, float(target)
+
+
+def subset_forest(model, indices):
+    """Copia del bosque con solo los árboles indicados"""
+    pruned = copy.copy(model)
+    pruned.estimators_ = [model.estimators_[i] for i in indices]
+    pruned.n_estimators = len(indices)
+    return pruned
+
+
+def n_trees(model):
+    """Árboles de un modelo: los del bosque, los del boosting o uno"""
+    if hasattr(model, 'estimators_'):
+        return len(model.estimators_)
+    if hasattr(model, 'n_iter_'):
+        return model.n_iter_ * model.n_trees_per_iteration_
+    return 1
+
+
+def synthetic_rows(X, n_rows, rng):
+    """Filas sintéticas: cada columna sorteada de los valores observados en X"""
+    return pd.DataFrame({column: rng.choice(X[column].to_numpy(), n_rows) for column in X.columns})
+
+
+def distill(model, X_train, kind, synthetic_factor=SYNTHETIC_FACTOR, random_state=42):
+    """Entrena un alumno ('tree' o 'hgb') con las predicciones del bosque"""
+    rng = np.random.default_rng(random_state)
+    X = pd.concat([X_train, synthetic_rows(X_train, len(X_train) * synthetic_factor, rng)],
+                  ignore_index=True).astype(np.float32)
+    student = STUDENTS[kind]()
+    student.fit(X, model.predict(X))
+    return student
+
+
+def artifact_stats(model, X, directory):
+    """Tamaño en MB, tiempo de carga en ms y latencia por fila en ms de un modelo"""
+    path = save_artifact(model, Path(directory) / "model.pkl")
+    load_times = []
+    for _ in range(LOAD_REPEATS):
+        start = time.perf_counter()
+        joblib.load(path)
+        load_times.append(time.perf_counter() - start)
+    return {
+        'size_mb': path.stat().st_size / 1e6,
+        'load_ms': min(load_times) * 1000,
+        'latency_ms': single_row_latency_ms(model, X),
+    }
+
+
+def split_validation(X_train, y_train):
+    """Partición (ajuste, validación) del entrenamiento para las decisiones de la compresión"""
+    return train_test_split(X_train, y_train, test_size=VALIDATION_SIZE,
+                            random_state=SPLIT_SEED, stratify=y_train)
+
+
+def compress(pipeline, X_train, y_train, X_test, y_test, tolerance=F1_TOLERANCE,
+             distill_kind=None, verbose=True):
+    """
+    Poda (y opcionalmente destila) el modelo del pipeline. Los árboles y la
+    tolerancia se deciden con una validación tomada de X_train; X_test solo
+    se usa para informar f1_test. Retorna (modelo comprimido, tabla con una
+    fila por candidato).
+    """
+    X_fit, X_val, _, y_val = split_validation(X_train, y_train)
+    model = pipeline.model
+    n_classes = len(model.classes_)
+    candidates = {'original': model}
+    if hasattr(model, 'estimators_'):
+        indices, _, full_f1 = select_trees(model, X_val, y_val, tolerance)
+        candidates['podado'] = subset_forest(model, indices)
+        if verbose:
+            print(f"🌲 Poda: {len(indices)} de {len(model.estimators_)} árboles")
+    else:
+        full_f1 = macro_f1(np.asarray(y_val), model.predict(X_val.astype(np.float32)), n_classes)[0]
+        if verbose:
+            print(f"🌲 {type(model).__name__} no es un bosque: sin poda")
+    if distill_kind:
+        candidates[f'destilado_{distill_kind}'] = distill(model, X_fit, distill_kind)
+
+    X_val_input = X_val.astype(np.float32)
+    X_test_input = X_test.astype(np.float32)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, candidate in candidates.items():
+            rows.append({
+                'modelo': name,
+                'arboles': n_trees(candidate),
+                'f1_val': float(macro_f1(np.asarray(y_val), candidate.predict(X_val_input), n_classes)[0]),
+                'f1_test': float(macro_f1(np.asarray(y_test), candidate.predict(X_test_input), n_classes)[0]),
+                **artifact_stats(candidate, X_test_input, tmp),
+            })
+    table = pd.DataFrame(rows).set_index('modelo')
+
+    # El más rápido de los comprimidos que cumple la tolerancia en validación (el podado la
+    # cumple por construcción); sin candidatos que la cumplan queda el original
+    compressed = table.drop(index='original')
+    eligible = compressed[compressed['f1_val'] >= full_f1 - tolerance]
+    chosen = eligible['latency_ms'].idxmin() if len(eligible) else 'original'
+    table['elegido'] = table.index == chosen
+    return candidates[chosen], table
+
+
+def print_report(table):
+    print("\n" + "="*60)
+    print("🗜️  COMPRESIÓN DEL MODELO")
+    print("="*60)
+    print(table.to_string(float_format=lambda value: f"{value:.3f}"))
+    original = table.loc['original']
+    chosen = table[table['elegido']].iloc[0]
+    print(f"\nElegido: {chosen.name} - {original['size_mb'] / chosen['size_mb']:.1f}x más chico, "
+          f"latencia por fila {original['latency_ms'] / chosen['latency_ms']:.1f}x menor")
+    print(f"F1 macro en prueba: original {original['f1_test']:.4f}, elegido {chosen['f1_test']:.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poda y destila el modelo entrenado")
+    parser.add_argument("--tolerance", type=float, default=F1_TOLERANCE,
+                        help="Pérdida de F1 macro aceptada respecto del bosque completo")
+    parser.add_argument("--distill", choices=["none", *STUDENTS], default="none",
+                        help="Destilar además en un árbol ('tree') o un HistGradientBoosting ('hgb')")
+    args = parser.parse_args(argv)
+
+    pipeline = load_pipeline(mmap=False)
+    df = read_table('processed_encoded')
+    X_train, X_test, y_train, y_test = split_train_test(df[pipeline.feature_names], df['winner_encoded'])
+
+    model, table = compress(pipeline, X_train, y_train, X_test, y_test, tolerance=args.tolerance,
+                            distill_kind=None if args.distill == "none" else args.distill)
+
+    save_artifact(model, COMPRESSED_MODEL_PATH)
+    save_pipeline(MatchPipeline(pipeline.encoder, model, file_sha256(COMPRESSED_MODEL_PATH),
+                                {'compressed_from': pipeline.version,
+                                 'backend': backend_name(model),
+                                 'model_file': COMPRESSED_MODEL_PATH.name}),
+                  COMPRESSED_PIPELINE_PATH)
+    table.to_csv(COMPRESSION_REPORT_PATH)
+
+    print_report(table)
+    print(f"\nModelo comprimido guardado en data/models/{COMPRESSED_MODEL_PATH.name}")
+    print(f"Pipeline guardado en data/models/{COMPRESSED_PIPELINE_PATH.name}")
+    print(f"Reporte guardado en data/models/{COMPRESSION_REPORT_PATH.name}")
+    return table
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
-import pandas as pd
+from ingest import load_raw_matches
 
-# Cargar tu dataset
-df = pd.read_excel('data/raw/rocket_league_matches.xlsx')
+# Cargar tu dataset (copia columnar del Excel, ver src/ingest.py)
+df = load_raw_matches()
 
 print("=== SHAPE (Filas, Columnas) ===")
 print(df.shape)
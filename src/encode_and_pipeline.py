@@ -1,26 +1,31 @@
-import pandas as pd
 import joblib
-from sklearn.preprocessing import LabelEncoder
+
+from artifacts import save_artifact
+from model_pipeline import ENCODER_PATH, TEAM_ENCODER_PATH, WINNER_ENCODER_PATH, MatchEncoder
+from schema import ENCODED_SCHEMA, apply_schema, memory_mb
+from storage import read_table, write_table
 
 # Cargar dataset con features
-df = pd.read_csv('data/processed/processed_features.csv')
+df = read_table('processed_features')
+
+# === 1. Ajustar la codificación (colores, modos de juego y ganador) ===
+encoder = MatchEncoder.fit(df)
+save_artifact(encoder, ENCODER_PATH)
 
-# === 1. LabelEncoder para team_color ===
-le_team = LabelEncoder()
-df['team_color_encoded'] = le_team.fit_transform(df['team_color'])
-joblib.dump(le_team, 'data/models/team_encoder.pkl')
+# === 2. team_color_encoded, one-hot mode_* y winner_encoded (TARGET) ===
+df = encoder.encode_frame(df)
 
-# === 2. One-Hot Encoding para game_mode ===
-df = pd.get_dummies(df, columns=['game_mode'], prefix='mode')
+# Encoders sueltos, para compatibilidad con scripts que los cargan por separado
+joblib.dump(encoder.team_encoder, TEAM_ENCODER_PATH)
+joblib.dump(encoder.winner_encoder, WINNER_ENCODER_PATH)
 
-# === 3. LabelEncoder para winner (TARGET) ===
-le_winner = LabelEncoder()
-df['winner_encoded'] = le_winner.fit_transform(df['winner'])
-joblib.dump(le_winner, 'data/models/winner_encoder.pkl')
+# Tipos compactos (int8 para los códigos)
+df = apply_schema(df, ENCODED_SCHEMA)
 
 # Guardar dataset final procesado
-df.to_csv('data/processed/processed_encoded.csv', index=False)
+output_path = write_table(df, 'processed_encoded')
 
-print("Dataset final guardado en data/processed/processed_encoded.csv")
+print(f"Dataset final guardado en {output_path}")
 print("Encoders guardados en data/models/")
 print("Shape final:", df.shape)
+print(f"Memoria: {memory_mb(df):.2f} MB")
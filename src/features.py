@@ -1,34 +1,110 @@
 import pandas as pd
 import numpy as np
 
+from schema import FEATURE_SCHEMA, memory_mb
+from storage import read_table, write_table
+
+# Modos de juego en el orden de prioridad de las columnas one-hot mode_*
+GAME_MODES = ['Duel', 'Doubles', 'Standard']
+UNKNOWN_GAME_MODE = 'Unknown'
+
+# Límites de los intervalos, cerrados a derecha como en pd.cut: (b[i-1], b[i]]
+GOAL_DIFF_BINS = [-np.inf, -3, -1, 1, 3, np.inf]
+DURATION_BINS = [0, 300, 360, 420, np.inf]
+
+# Diferencia de goles máxima (en valor absoluto) de una partida competitiva
+COMPETITIVE_MAX_GOAL_DIFF = 2
+
+def bin_codes(values, bins):
+    """
+    Código entero del intervalo de cada valor (np.digitize), igual al de
+    pd.cut con los mismos límites. -1 si el valor falta o queda fuera.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.digitize(values, bins, right=True) - 1
+    codes[(codes < 0) | (codes >= len(bins) - 1) | np.isnan(values)] = -1
+    return codes
+
+def competitive_flag(goal_difference):
+    """1 si la partida fue competitiva (goles cercanos), 0 si no; acepta escalares o arrays"""
+    return (np.abs(np.asarray(goal_difference)) <= COMPETITIVE_MAX_GOAL_DIFF).astype(np.int8)
+
+def category_values(series):
+    """Valores distintos de una columna: sus categorías si es category, si no ordenados"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return [str(c) for c in series.cat.categories]
+    return sorted(str(c) for c in pd.unique(series) if pd.notna(c))
+
+def category_codes(series, categories):
+    """Códigos de una columna respecto a una lista fija de categorías (-1 si no está)"""
+    if isinstance(series.dtype, pd.CategoricalDtype) and list(series.cat.categories) == categories:
+        return series.cat.codes.to_numpy()
+    # Una pasada de hash por fila; el resto trabaja sobre los valores distintos
+    codes, uniques = pd.factorize(series)
+    remap = pd.Index(categories).get_indexer(uniques.astype(str))
+    return np.where(codes < 0, -1, remap[codes])
+
+def team_mode(team_color, game_mode):
+    """
+    Feature combinada equipo + modo ('Blue_Duel', ...) calculada desde los
+    códigos de cada columna (sin armar strings por fila). Las categorías son
+    los colores y modos presentes en la tabla; NaN si falta alguno de los dos.
+    """
+    team_colors = category_values(team_color)
+    game_modes = category_values(game_mode)
+    team = category_codes(team_color, team_colors).astype(np.int64)
+    mode = category_codes(game_mode, game_modes).astype(np.int64)
+    codes = np.where((team < 0) | (mode < 0), -1, team * len(game_modes) + mode)
+    categories = [f'{t}_{m}' for t in team_colors for m in game_modes]
+    return pd.Categorical.from_codes(codes, categories=categories)
+
 def create_features(df):
+    """
+    Agrega a df (sin copiarlo) las columnas derivadas goal_diff_category,
+    duration_bucket, is_competitive y team_mode, con arrays de NumPy y
+    códigos enteros, y lo retorna
+    """
+    goal_difference = df['goal_difference'].to_numpy(dtype=np.float64, na_value=np.nan)
+    match_duration = df['match_duration'].to_numpy(dtype=np.float64, na_value=np.nan)
 
     # 1) Categoría por diferencia de goles
-    df['goal_diff_category'] = pd.cut(
-        df['goal_difference'],
-        bins=[-np.inf, -3, -1, 1, 3, np.inf],
-        labels=['large_loss', 'small_loss', 'close', 'small_win', 'large_win']
-    )
+    df['goal_diff_category'] = pd.Categorical.from_codes(
+        bin_codes(goal_difference, GOAL_DIFF_BINS), dtype=FEATURE_SCHEMA['goal_diff_category'])
 
-    # 2) bucket de duración del partido
-    df['duration_bucket'] = pd.cut(
-        df['match_duration'],
-        bins=[0, 300, 360, 420, np.inf],
-        labels=['short', 'normal', 'long', 'very_long']
-    )
+    # 2) Bucket de duración del partido
+    df['duration_bucket'] = pd.Categorical.from_codes(
+        bin_codes(match_duration, DURATION_BINS), dtype=FEATURE_SCHEMA['duration_bucket'])
 
-    # 3) indicador si el match fue competitivo (goles cercanos)
-    df['is_competitive'] = (df['goal_difference'].abs() <= 2).astype(int)
+    # 3) Indicador si el match fue competitivo (goles cercanos)
+    df['is_competitive'] = competitive_flag(goal_difference)
 
-    # 4) feature combinada: equipo + modo
-    df['team_mode'] = df['team_color'] + '_' + df['game_mode']
+    # 4) Feature combinada equipo + modo
+    df['team_mode'] = team_mode(df['team_color'], df['game_mode'])
 
     return df
 
+def decode_game_mode(df, prefix='mode_'):
+    """
+    Reconstruye game_mode desde las columnas one-hot mode_* de forma
+    vectorizada: argmax sobre las columnas (en el orden de GAME_MODES, así
+    que ante varias activas gana la primera) y 'Unknown' donde ninguna vale 1
+    o faltan todas. Retorna un pandas Categorical.
+    """
+    n_rows = len(df)
+    onehot = np.zeros((n_rows, len(GAME_MODES)), dtype=bool)
+    for i, mode in enumerate(GAME_MODES):
+        column = f'{prefix}{mode}'
+        if column in df.columns:
+            onehot[:, i] = df[column].to_numpy() == 1
+
+    codes = np.where(onehot.any(axis=1), onehot.argmax(axis=1), len(GAME_MODES))
+    return pd.Categorical.from_codes(codes, categories=GAME_MODES + [UNKNOWN_GAME_MODE])
+
 if __name__ == "__main__":
-    df = pd.read_csv('data/processed/processed_matches.csv')
+    df = read_table('processed_matches')
     df = create_features(df)
-    df.to_csv('data/processed/processed_features.csv', index=False)
+    output_path = write_table(df, 'processed_features')
     print("Features creadas correctamente.")
-    print("Archivo: data/processed/processed_features.csv")
+    print(f"Archivo: {output_path}")
     print("Shape:", df.shape)
+    print(f"Memoria: {memory_mb(df):.2f} MB")
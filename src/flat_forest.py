@@ -0,0 +1,184 @@
+"""
+Motor de inferencia compilado para RandomForestClassifier
+Aplana todos los árboles del bosque en arrays NumPy contiguos
+(feature, threshold, hijos y valor de hoja) y los recorre:
+  - de forma vectorizada (filas x árboles a la vez) para lotes
+  - con un bucle Python ajustado sobre listas para una sola fila
+
+El resultado coincide bit a bit con RandomForestClassifier.predict_proba
+(scikit-learn 1.4+, donde tree_.value ya guarda fracciones por clase).
+"""
+
+import numpy as np
+
+# Marca de hoja en los árboles de scikit-learn
+TREE_LEAF = -1
+
+# Número de pares (fila, árbol) procesados por bloque en el modo vectorizado
+BLOCK_SIZE = 1 << 16
+
+
+class FlatForest:
+    """Bosque aplanado en arrays contiguos, listo para inferencia rápida"""
+
+    def __init__(self, feature, threshold, left, right, value, roots,
+                 classes, n_features, max_depth, model_sha256=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        # Hijos intercalados: children[2 * nodo + (x <= umbral)] -> derecho / izquierdo
+        self.children = np.stack([self.right, self.left], axis=1).ravel()
+        self.classes_ = np.asarray(classes)
+        self.n_features = int(n_features)
+        self.max_depth = int(max_depth)
+        # Hash del archivo del modelo de origen (para verificar artefactos guardados)
+        self.model_sha256 = model_sha256
+        self._lists = None
+
+    @classmethod
+    def from_sklearn(cls, forest, model_sha256=None):
+        """Compila un RandomForestClassifier entrenado"""
+        if getattr(forest, 'n_outputs_', 1) != 1:
+            raise ValueError("Solo se soportan bosques de una única salida")
+
+        n_classes = len(forest.classes_)
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes)
+            is_leaf = tree.children_left == TREE_LEAF
+
+            # Las hojas apuntan a sí mismas: seguir recorriendo no las mueve
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            values.append(tree.value[:, 0, :n_classes])
+            roots.append(offset)
+
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.array(roots),
+            classes=forest.classes_,
+            n_features=forest.n_features_in_,
+            max_depth=max_depth,
+            model_sha256=model_sha256
+        )
+
+    def __getstate__(self):
+        # Las listas del bucle de una fila se reconstruyen al usarse
+        state = self.__dict__.copy()
+        state['_lists'] = None
+        return state
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_classes(self):
+        return self.value.shape[1]
+
+    def _check_input(self, X):
+        # Igual que scikit-learn: las comparaciones se hacen sobre float32
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(
+                f"X tiene {X.shape[1]} features, pero el modelo espera {self.n_features}"
+            )
+        return X
+
+    def apply(self, X):
+        """Índice (global) de la hoja alcanzada por cada fila en cada árbol (árboles x filas)"""
+        X = self._check_input(X)
+        n_rows = X.shape[0]
+        leaves = np.empty((self.n_trees, n_rows), dtype=np.int32)
+
+        block_rows = max(1, BLOCK_SIZE // self.n_trees)
+        for start in range(0, n_rows, block_rows):
+            X_block = np.ascontiguousarray(X[start:start + block_rows])
+            x_flat = X_block.ravel()
+            row_offset = np.arange(X_block.shape[0], dtype=np.int32) * self.n_features
+
+            # Todas las parejas (árbol, fila) avanzan un nivel por iteración
+            node = np.repeat(self.roots[:, np.newaxis], X_block.shape[0], axis=1)
+            position = np.empty_like(node)
+            x_value = np.empty(node.shape, dtype=np.float32)
+            threshold = np.empty(node.shape, dtype=np.float64)
+            go_left = np.empty(node.shape, dtype=bool)
+
+            for _ in range(self.max_depth):
+                np.take(self.feature, node, out=position)
+                position += row_offset
+                np.take(x_flat, position, out=x_value)
+                np.take(self.threshold, node, out=threshold)
+                np.less_equal(x_value, threshold, out=go_left)
+                node <<= 1
+                node |= go_left
+                np.take(self.children, node, out=node)
+
+            leaves[:, start:start + block_rows] = node
+
+        return leaves
+
+    def predict_proba(self, X):
+        """Probabilidades por clase, idénticas a las de scikit-learn"""
+        X = self._check_input(X)
+        if X.shape[0] == 1:
+            return self.predict_proba_row(X[0])[np.newaxis, :]
+
+        leaves = self.apply(X)
+
+        # Se acumula árbol por árbol, en el mismo orden que scikit-learn
+        proba = np.zeros((X.shape[0], self.n_classes), dtype=np.float64)
+        for tree_leaves in leaves:
+            proba += self.value[tree_leaves]
+        proba /= self.n_trees
+
+        return proba
+
+    def predict_proba_row(self, x):
+        """Recorrido de una sola fila con un bucle ajustado sobre listas Python"""
+        if self._lists is None:
+            self._lists = (
+                self.feature.tolist(), self.threshold.tolist(),
+                self.left.tolist(), self.right.tolist(),
+                self.value.tolist(), self.roots.tolist()
+            )
+        feature, threshold, left, right, value, roots = self._lists
+
+        x = np.asarray(x, dtype=np.float32).tolist()
+        proba = [0.0] * self.n_classes
+        classes = range(self.n_classes)
+
+        for node in roots:
+            while left[node] != node:
+                if x[feature[node]] <= threshold[node]:
+                    node = left[node]
+                else:
+                    node = right[node]
+            leaf_value = value[node]
+            for k in classes:
+                proba[k] += leaf_value[k]
+
+        return np.array(proba) / self.n_trees
+
+    def predict(self, X):
+        """Clase predicha (misma regla que scikit-learn: argmax de predict_proba)"""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
@@ -0,0 +1,112 @@
+"""
+Ingesta de los datos crudos
+Convierte una sola vez el Excel de data/raw/ a un archivo columnar que queda
+junto al original (rocket_league_matches.parquet por defecto); las lecturas
+siguientes usan esa copia en lugar de parsear el Excel. Solo se vuelve a
+convertir si el Excel cambia: se comparan tamaño y fecha de modificación y,
+si difieren, el hash del contenido.
+
+Motor de lectura del Excel: calamine si está instalado
+(pip install python-calamine), openpyxl si no.
+
+Uso:
+    python src/ingest.py [--force]
+"""
+
+import argparse
+import importlib.util
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from artifacts import file_sha256
+from storage import EXTENSIONS, STORAGE_FORMAT, check_format, read_frame, write_frame
+
+# Rutas
+BASE_DIR = Path(__file__).resolve().parent.parent
+RAW_DATA_PATH = BASE_DIR / "data" / "raw" / "rocket_league_matches.xlsx"
+
+HAS_CALAMINE = importlib.util.find_spec("python_calamine") is not None
+EXCEL_ENGINE = "calamine" if HAS_CALAMINE else "openpyxl"
+
+
+def cached_raw_path(xlsx_path=RAW_DATA_PATH, fmt=None):
+    """Ruta de la copia columnar del Excel"""
+    return Path(xlsx_path).with_suffix(EXTENSIONS[fmt or STORAGE_FORMAT])
+
+
+def ingest_meta_path(xlsx_path=RAW_DATA_PATH):
+    """Ruta de la metadata de la última conversión"""
+    return Path(xlsx_path).with_suffix(".ingest.json")
+
+
+def read_excel(xlsx_path=RAW_DATA_PATH):
+    """Parsea el Excel con el motor más rápido disponible"""
+    return pd.read_excel(xlsx_path, engine=EXCEL_ENGINE)
+
+
+def is_fresh(xlsx_path, cached_path, meta):
+    """Indica si la copia columnar corresponde al contenido actual del Excel"""
+    if meta is None or not cached_path.exists() or meta.get('cached') != cached_path.name:
+        return False
+    stat = xlsx_path.stat()
+    if (meta['size'], meta['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+        return True
+    # Cambió la fecha o el tamaño, pero el contenido puede ser el mismo (p. ej. una copia)
+    return meta['sha256'] == file_sha256(xlsx_path)
+
+
+def ingest_raw(xlsx_path=RAW_DATA_PATH, fmt=None, force=False):
+    """
+    Convierte el Excel a formato columnar si la copia no existe o quedó
+    desactualizada. Retorna (ruta de la copia, si hubo conversión).
+    """
+    xlsx_path = Path(xlsx_path)
+    fmt = check_format(fmt or STORAGE_FORMAT)
+    cached_path = cached_raw_path(xlsx_path, fmt)
+    meta_path = ingest_meta_path(xlsx_path)
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else None
+
+    if not force and is_fresh(xlsx_path, cached_path, meta):
+        return cached_path, False
+
+    # Si la conversión falla a mitad de camino, la próxima lectura la repite
+    meta_path.unlink(missing_ok=True)
+    df = read_excel(xlsx_path)
+    write_frame(df, cached_path)
+    stat = xlsx_path.stat()
+    meta_path.write_text(json.dumps({
+        'source': xlsx_path.name,
+        'cached': cached_path.name,
+        'sha256': file_sha256(xlsx_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'engine': EXCEL_ENGINE,
+        'rows': len(df),
+        'created_at': datetime.now().isoformat()
+    }, indent=2))
+    return cached_path, True
+
+
+def load_raw_matches(xlsx_path=RAW_DATA_PATH, columns=None):
+    """Partidas crudas desde la copia columnar (la crea o actualiza si hace falta)"""
+    cached_path, _ = ingest_raw(xlsx_path)
+    return read_frame(cached_path, columns=columns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte el Excel crudo a formato columnar")
+    parser.add_argument("--force", action="store_true", help="Convertir aunque la copia esté al día")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cached_path, converted = ingest_raw(force=args.force)
+    elapsed = time.perf_counter() - start
+    if converted:
+        print(f"📥 Excel convertido con {EXCEL_ENGINE} en {elapsed:.2f}s")
+    else:
+        print("✓ La copia columnar está al día")
+    print(f"Archivo: {cached_path}")
@@ -0,0 +1,179 @@
+"""
+Tabla de predicciones precalculada sobre todo el espacio de entrada discreto
+Enumera todas las combinaciones (color, modo, overtime, is_competitive,
+goal_difference, match_duration) dentro de rangos acotados, guarda
+predict_proba de cada una en un .npy que se abre con memory-map y permite
+responder una predicción con un acceso O(1) por índice.
+
+Uso (después de train_model.py):
+    python src/lookup_table.py
+"""
+
+import time
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from artifacts import MODELS_DIR, MODEL_PATH, file_sha256
+from model_pipeline import load_pipeline
+
+# Rutas
+TABLE_PATH = MODELS_DIR / "lookup_table.npy"
+META_PATH = MODELS_DIR / "lookup_table_meta.pkl"
+
+# Rangos enteros (inclusive) cubiertos por la tabla
+GOAL_DIFFERENCE_RANGE = (-10, 10)
+MATCH_DURATION_RANGE = (0, 900)
+
+# Filas puntuadas por llamada a predict_proba durante la construcción
+CHUNK_SIZE = 65536
+
+
+class LookupTable:
+    """
+    Probabilidades precalculadas indexadas por
+    [color, modo, overtime, is_competitive, goal_difference, match_duration].
+    El último índice de modo corresponde a "ningún modo conocido" (one-hot en cero).
+    """
+
+    def __init__(self, table, meta):
+        self.table = table
+        self.meta = meta
+
+        position = {name: i for i, name in enumerate(meta['feature_names'])}
+        self.team_pos = position['team_color_encoded']
+        self.goal_pos = position['goal_difference']
+        self.duration_pos = position['match_duration']
+        self.overtime_pos = position['overtime']
+        self.competitive_pos = position['is_competitive']
+        self.mode_pos = [position[col] for col in meta['mode_columns']]
+
+        self.n_teams = len(meta['team_classes'])
+        self.goal_min, self.goal_max = meta['goal_difference_range']
+        self.duration_min, self.duration_max = meta['match_duration_range']
+
+    @classmethod
+    def load(cls, table_path=TABLE_PATH, meta_path=META_PATH, mmap_mode='r'):
+        """Abre la tabla con memory-map (las páginas se comparten entre procesos)"""
+        meta = joblib.load(meta_path)
+        table = np.load(table_path, mmap_mode=mmap_mode)
+        if table.shape != tuple(meta['shape']):
+            raise ValueError(f"Forma de la tabla {table.shape} distinta a la de la metadata {meta['shape']}")
+        return cls(table, meta)
+
+    def matches_model(self, model_path):
+        """Indica si la tabla se construyó con el archivo de modelo indicado"""
+        return self.meta.get('model_sha256') == file_sha256(model_path)
+
+    def lookup(self, features):
+        """
+        Probabilidades de un vector de features (en el orden del modelo),
+        o None si la entrada cae fuera del espacio precalculado.
+        """
+        team = features[self.team_pos]
+        goal = features[self.goal_pos]
+        duration = features[self.duration_pos]
+        overtime = features[self.overtime_pos]
+        competitive = features[self.competitive_pos]
+
+        if not (team in range(self.n_teams)
+                and overtime in (0, 1) and competitive in (0, 1)
+                and self.goal_min <= goal <= self.goal_max and goal == int(goal)
+                and self.duration_min <= duration <= self.duration_max
+                and duration == int(duration)):
+            return None
+
+        mode = len(self.mode_pos)
+        for k, pos in enumerate(self.mode_pos):
+            value = features[pos]
+            if value == 1:
+                if mode != len(self.mode_pos):
+                    return None  # Más de un modo activo
+                mode = k
+            elif value != 0:
+                return None
+
+        return self.table[int(team), mode, int(overtime), int(competitive),
+                          int(goal) - self.goal_min, int(duration) - self.duration_min]
+
+
+def build_lookup_table(model, team_classes, table_path=TABLE_PATH, meta_path=META_PATH,
+                       goal_range=GOAL_DIFFERENCE_RANGE, duration_range=MATCH_DURATION_RANGE,
+                       model_path=MODEL_PATH, chunk_size=CHUNK_SIZE):
+    """Evalúa el modelo en todas las combinaciones y guarda tabla + metadata"""
+    feature_names = list(model.feature_names_in_)
+    mode_columns = [name for name in feature_names if name.startswith('mode_')]
+    position = {name: i for i, name in enumerate(feature_names)}
+
+    goal_min, goal_max = goal_range
+    duration_min, duration_max = duration_range
+    grid_shape = (
+        len(team_classes),
+        len(mode_columns) + 1,  # + "ningún modo"
+        2,  # overtime
+        2,  # is_competitive
+        goal_max - goal_min + 1,
+        duration_max - duration_min + 1
+    )
+    n_classes = len(model.classes_)
+
+    table_path = Path(table_path)
+    table_path.parent.mkdir(parents=True, exist_ok=True)
+    table = np.lib.format.open_memmap(table_path, mode='w+', dtype=np.float64,
+                                      shape=grid_shape + (n_classes,))
+    flat_table = table.reshape(-1, n_classes)
+    n_cells = flat_table.shape[0]
+
+    for start in range(0, n_cells, chunk_size):
+        cells = np.arange(start, min(start + chunk_size, n_cells))
+        team, mode, overtime, competitive, goal, duration = np.unravel_index(cells, grid_shape)
+
+        X = np.zeros((len(cells), len(feature_names)), dtype=np.float32)
+        X[:, position['team_color_encoded']] = team
+        X[:, position['goal_difference']] = goal + goal_min
+        X[:, position['match_duration']] = duration + duration_min
+        X[:, position['overtime']] = overtime
+        X[:, position['is_competitive']] = competitive
+        for k, col in enumerate(mode_columns):
+            X[:, position[col]] = mode == k
+
+        flat_table[cells] = model.predict_proba(pd.DataFrame(X, columns=feature_names))
+
+    table.flush()
+    del flat_table, table
+
+    meta = {
+        'shape': grid_shape + (n_classes,),
+        'feature_names': feature_names,
+        'team_classes': [str(c) for c in team_classes],
+        'mode_columns': mode_columns,
+        'goal_difference_range': (goal_min, goal_max),
+        'match_duration_range': (duration_min, duration_max),
+        'classes': list(model.classes_),
+        'model_sha256': file_sha256(model_path),
+        'created_at': datetime.now().isoformat()
+    }
+    joblib.dump(meta, meta_path)
+
+    return LookupTable.load(table_path, meta_path)
+
+
+if __name__ == "__main__":
+    print("📊 Cargando pipeline...")
+    pipeline = load_pipeline(mmap=False)
+    model_path = MODELS_DIR / pipeline.metadata.get('model_file', MODEL_PATH.name)
+
+    print("🧮 Precalculando predicciones sobre todo el espacio de entrada...")
+    start = time.perf_counter()
+    lookup_table = build_lookup_table(pipeline.model, pipeline.encoder.team_classes, model_path=model_path)
+    elapsed = time.perf_counter() - start
+
+    n_cells = int(np.prod(lookup_table.meta['shape'][:-1]))
+    print(f"✅ Tabla guardada en: {TABLE_PATH}")
+    print(f"   Combinaciones: {n_cells:,}")
+    print(f"   Forma: {lookup_table.meta['shape']}")
+    print(f"   Tamaño: {TABLE_PATH.stat().st_size / 1e6:.1f} MB")
+    print(f"   Tiempo: {elapsed:.1f}s")
@@ -0,0 +1,109 @@
+"""
+Backends de modelo: qué clasificador entrena train_model.py y dónde se guarda
+Cada backend tiene su clase de scikit-learn, sus parámetros por defecto y su
+archivo en data/models/. train_model.py anota el backend en
+model_metadata.pkl y en el pipeline; la API y la puntuación batch cargan el
+modelo que indica esa metadata, así que no dependen de RandomForest.
+
+    random_forest            RandomForestClassifier (defecto; admite el backend
+                             'flat' de la API, --tune y la poda de compress_model.py)
+    hist_gradient_boosting   HistGradientBoostingClassifier (árboles por histogramas)
+"""
+
+from pathlib import Path
+
+import joblib
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score, classification_report, f1_score
+
+from artifacts import MODEL_PATH, MODELS_DIR
+
+# Metadata del último entrenamiento
+METADATA_PATH = MODELS_DIR / "model_metadata.pkl"
+
+DEFAULT_BACKEND = "random_forest"
+
+RANDOM_FOREST_PARAMS = {
+    'n_estimators': 200,
+    'max_depth': 15,
+    'min_samples_split': 10,
+    'min_samples_leaf': 4,
+    'class_weight': 'balanced',
+    'random_state': 42,
+}
+
+HIST_GRADIENT_BOOSTING_PARAMS = {
+    'max_iter': 100,
+    'learning_rate': 0.1,
+    'max_depth': 6,
+    'min_samples_leaf': 4,
+    'class_weight': 'balanced',
+    'early_stopping': False,
+    'random_state': 42,
+}
+
+
+class ModelBackend:
+    """Un tipo de modelo entrenable: clase, parámetros por defecto y archivo"""
+
+    def __init__(self, name, estimator, params, model_file, is_forest=False):
+        self.name = name
+        self.estimator = estimator
+        self.params = params
+        self.model_file = model_file
+        # Tiene estimators_ de árboles de decisión (FlatForest, poda)
+        self.is_forest = is_forest
+
+    def build(self, params=None, n_jobs=-1):
+        """Clasificador sin entrenar; n_jobs solo se usa si la clase lo acepta"""
+        params = {**self.params, **(params or {})}
+        if 'n_jobs' in self.estimator().get_params():
+            params['n_jobs'] = n_jobs
+        return self.estimator(**params)
+
+    def model_path(self, models_dir=MODELS_DIR):
+        return Path(models_dir) / self.model_file
+
+
+BACKENDS = {
+    backend.name: backend for backend in [
+        ModelBackend("random_forest", RandomForestClassifier, RANDOM_FOREST_PARAMS,
+                     MODEL_PATH.name, is_forest=True),
+        ModelBackend("hist_gradient_boosting", HistGradientBoostingClassifier,
+                     HIST_GRADIENT_BOOSTING_PARAMS, "hist_gradient_boosting_model.pkl"),
+    ]
+}
+
+
+def get_backend(name):
+    """Backend por nombre (ValueError si no existe)"""
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Backend de modelo desconocido: '{name}' "
+                         f"(opciones: {', '.join(BACKENDS)})")
+
+
+def backend_name(model):
+    """Backend de un modelo ya entrenado, o el nombre de su clase si no es de ningún backend"""
+    for backend in BACKENDS.values():
+        if type(model) is backend.estimator:
+            return backend.name
+    return type(model).__name__
+
+
+def trained_backend(models_dir=MODELS_DIR):
+    """Backend del último entrenamiento según model_metadata.pkl (random_forest si no lo dice)"""
+    path = Path(models_dir) / METADATA_PATH.name
+    metadata = joblib.load(path) if path.exists() else {}
+    return get_backend(metadata.get('backend', DEFAULT_BACKEND))
+
+
+def evaluate(model, X_test, y_test):
+    """Métricas comunes a todos los backends sobre la partición de prueba"""
+    y_pred = model.predict(X_test)
+    return {
+        'accuracy': float(accuracy_score(y_test, y_pred)),
+        'f1_macro': float(f1_score(y_test, y_pred, average='macro')),
+        'report': classification_report(y_test, y_pred),
+    }
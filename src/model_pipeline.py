@@ -0,0 +1,398 @@
+"""
+Pipeline de predicción serializado: codificación + modelo en un solo artefacto
+MatchEncoder reúne lo que antes se repartía entre team_encoder.pkl,
+winner_encoder.pkl y las columnas one-hot mode_* armadas a mano en cada
+consumidor: los códigos de color y de ganador, los modos conocidos y el
+orden de features del modelo. MatchPipeline le suma el modelo entrenado y
+un sello de versión, y se guarda en data/models/match_pipeline.pkl.
+
+La API, la puntuación batch y la tabla precalculada hacen una sola carga
+(load_pipeline) y una sola llamada (predict_proba / transform). Los tres
+pickles anteriores se siguen escribiendo para compatibilidad; si el
+pipeline no existe, load_pipeline lo arma a partir de ellos.
+
+Uso (arma match_pipeline.pkl desde los artefactos ya entrenados):
+    python src/model_pipeline.py
+"""
+
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.preprocessing import LabelEncoder
+
+from artifacts import MODELS_DIR, file_sha256, load_artifact, save_artifact
+from features import competitive_flag
+from model_backends import trained_backend
+
+# Rutas
+PIPELINE_PATH = MODELS_DIR / "match_pipeline.pkl"
+ENCODER_PATH = MODELS_DIR / "match_encoder.pkl"  # salida de encode_and_pipeline.py
+TEAM_ENCODER_PATH = MODELS_DIR / "team_encoder.pkl"
+WINNER_ENCODER_PATH = MODELS_DIR / "winner_encoder.pkl"
+
+# Formato del artefacto (cambia si cambia la estructura de las clases)
+PIPELINE_FORMAT = 1
+
+# Orden de features del modelo (las columnas mode_* solo si el modo existe)
+FEATURE_NAMES = [
+    'team_color_encoded',
+    'goal_difference',
+    'match_duration',
+    'mode_Duel',
+    'mode_Doubles',
+    'mode_Standard',
+    'is_competitive',
+    'overtime'
+]
+
+TEAM_COLOR_ALIASES = {
+    "blue": "Blue", "azul": "Blue", "b": "Blue",
+    "orange": "Orange", "naranja": "Orange", "o": "Orange"
+}
+WINNER_ALIASES = {
+    **TEAM_COLOR_ALIASES,
+    "draw": "Draw", "empate": "Draw", "tie": "Draw"
+}
+
+
+def normalize_team_color(color: str) -> str:
+    """Normaliza color del equipo - retorna capitalizado"""
+    return TEAM_COLOR_ALIASES.get(color.lower(), color.capitalize())
+
+
+def normalize_winner(winner: str) -> str:
+    """Normaliza ganador - retorna capitalizado"""
+    return WINNER_ALIASES.get(winner.lower(), winner.capitalize())
+
+
+def sorted_values(series):
+    """Valores distintos ordenados, como LabelEncoder.classes_"""
+    return sorted(str(value) for value in pd.unique(series) if pd.notna(value))
+
+
+def label_encoder(classes):
+    """LabelEncoder ya ajustado con las clases indicadas"""
+    encoder = LabelEncoder()
+    encoder.classes_ = np.asarray(classes, dtype=object)
+    return encoder
+
+
+def model_matrix(model, X, index=None):
+    """
+    Matriz de features tal como la espera el modelo: con los nombres de
+    columna si se ajustó con ellos (sin copiar los datos; así scikit-learn no
+    advierte en cada predict_proba), o el array tal cual si no
+    """
+    names = getattr(model, 'feature_names_in_', None)
+    if names is None:
+        return X
+    return pd.DataFrame(X, columns=names, index=index, copy=False)
+
+
+class MatchEncoder:
+    """
+    Codificación de partidas a la matriz de features del modelo.
+    Guarda la posición de cada columna y la tabla de códigos de team_color,
+    de modo que una partida (o un DataFrame completo) se escribe directamente
+    en una matriz float32 sin pasar por pandas.get_dummies ni LabelEncoder.
+    """
+
+    def __init__(self, team_classes, winner_classes, game_modes, feature_names=None):
+        self.team_classes = np.asarray(team_classes, dtype=object)
+        self.winner_classes = np.asarray(winner_classes, dtype=object)
+        self.game_modes = list(game_modes)
+        if feature_names is None:
+            present = {f'mode_{mode}' for mode in self.game_modes}
+            feature_names = [name for name in FEATURE_NAMES
+                             if not name.startswith('mode_') or name in present]
+        self.feature_names = list(feature_names)
+        self._build()
+
+    @classmethod
+    def fit(cls, df):
+        """Aprende colores, ganadores y modos de juego de una tabla de features"""
+        return cls(sorted_values(df['team_color']), sorted_values(df['winner']),
+                   sorted_values(df['game_mode']))
+
+    def _build(self):
+        self.n_features = len(self.feature_names)
+
+        position = {name: i for i, name in enumerate(self.feature_names)}
+        self.team_pos = position['team_color_encoded']
+        self.goal_pos = position['goal_difference']
+        self.duration_pos = position['match_duration']
+        self.competitive_pos = position['is_competitive']
+        self.overtime_pos = position['overtime']
+
+        # Columnas one-hot de modo presentes en el modelo: "duel" -> posición
+        self.mode_columns = [name for name in self.feature_names if name.startswith('mode_')]
+        self.mode_pos = {name[len('mode_'):].lower(): position[name] for name in self.mode_columns}
+
+        # Códigos como diccionario: "Blue" -> 0
+        self.team_codes = {str(c): i for i, c in enumerate(self.team_classes)}
+        self.winner_codes = {str(c): i for i, c in enumerate(self.winner_classes)}
+
+        # Fila preasignada por hilo (se reutiliza en cada llamada)
+        self._local = threading.local()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    @property
+    def team_encoder(self):
+        return label_encoder(self.team_classes)
+
+    @property
+    def winner_encoder(self):
+        return label_encoder(self.winner_classes)
+
+    def team_code(self, color: str) -> int:
+        """Código de un color de equipo (acepta las variantes de normalize_team_color)"""
+        try:
+            return self.team_codes[normalize_team_color(color)]
+        except KeyError:
+            raise ValueError(f"Color de equipo desconocido: '{color}'")
+
+    @staticmethod
+    def _codes(series, codes, normalize, what):
+        """Códigos de una columna de texto, resolviendo una vez cada valor distinto"""
+        values, uniques = pd.factorize(series)
+        if (values < 0).any():
+            raise ValueError(f"Hay valores faltantes en {what}")
+        remap = np.array([codes.get(str(value), codes.get(normalize(str(value)), -1)) for value in uniques],
+                         dtype=np.int64)
+        unknown = [str(value) for value, code in zip(uniques, remap) if code < 0]
+        if unknown:
+            raise ValueError(f"Valores desconocidos en {what}: {unknown}")
+        return remap[values]
+
+    def encode_team(self, series):
+        """Códigos de team_color"""
+        return self._codes(series, self.team_codes, normalize_team_color, 'team_color')
+
+    def encode_winner(self, series):
+        """Códigos de winner (target)"""
+        return self._codes(series, self.winner_codes, normalize_winner, 'winner')
+
+    def decode_team(self, codes):
+        return self.team_classes[np.asarray(codes, dtype=np.int64)]
+
+    def decode_winner(self, codes):
+        return self.winner_classes[np.asarray(codes, dtype=np.int64)]
+
+    def encode_frame(self, df):
+        """
+        Agrega a df las columnas codificadas de processed_encoded
+        (team_color_encoded, mode_*, winner_encoded) y quita game_mode
+        """
+        df['team_color_encoded'] = self.encode_team(df['team_color'])
+        game_mode = df.pop('game_mode').astype(str).to_numpy()
+        for mode in self.game_modes:
+            df[f'mode_{mode}'] = game_mode == mode
+        df['winner_encoded'] = self.encode_winner(df['winner'])
+        return df
+
+    def row(self, match) -> np.ndarray:
+        """
+        Escribe una partida (objeto con team_color, game_mode, goal_difference,
+        match_duration, overtime e is_competitive opcional) en la fila
+        preasignada (1 x n_features, float32). La fila se reutiliza en la
+        siguiente llamada del mismo hilo.
+        """
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = self._local.row = np.zeros((1, self.n_features), dtype=np.float32)
+
+        values = row[0]
+        values[self.team_pos] = self.team_code(match.team_color)
+        values[self.goal_pos] = match.goal_difference
+        values[self.duration_pos] = match.match_duration
+        values[self.competitive_pos] = (match.is_competitive if match.is_competitive is not None
+                                        else competitive_flag(match.goal_difference))
+        values[self.overtime_pos] = match.overtime
+
+        mode = match.game_mode.lower()
+        for name, pos in self.mode_pos.items():
+            values[pos] = name == mode
+
+        return row
+
+    def rows(self, matches) -> np.ndarray:
+        """Matriz de features de una lista de partidas (mismos campos que row)"""
+        return self.matrix(
+            team_color_encoded=[self.team_code(m.team_color) for m in matches],
+            game_mode=[m.game_mode.lower() for m in matches],
+            goal_difference=[m.goal_difference for m in matches],
+            match_duration=[m.match_duration for m in matches],
+            is_competitive=[m.is_competitive if m.is_competitive is not None
+                            else competitive_flag(m.goal_difference) for m in matches],
+            overtime=[m.overtime for m in matches]
+        )
+
+    def matrix(self, team_color_encoded, game_mode, goal_difference,
+               match_duration, is_competitive, overtime) -> np.ndarray:
+        """
+        Ensambla la matriz de features (n_partidas x n_features, float32) a
+        partir de columnas ya codificadas. game_mode debe venir en minúsculas.
+        """
+        game_mode = np.asarray(game_mode)
+
+        X = np.empty((len(game_mode), self.n_features), dtype=np.float32)
+        X[:, self.team_pos] = team_color_encoded
+        X[:, self.goal_pos] = goal_difference
+        X[:, self.duration_pos] = match_duration
+        X[:, self.competitive_pos] = is_competitive
+        X[:, self.overtime_pos] = overtime
+        for name, pos in self.mode_pos.items():
+            X[:, pos] = game_mode == name
+
+        return X
+
+    def transform(self, df) -> np.ndarray:
+        """
+        Matriz de features de un DataFrame. Acepta partidas crudas
+        (team_color, game_mode) o ya codificadas (team_color_encoded, mode_*);
+        is_competitive se deriva de goal_difference si no viene.
+        """
+        n_rows = len(df)
+        X = np.zeros((n_rows, self.n_features), dtype=np.float32)
+
+        if 'team_color_encoded' in df.columns:
+            X[:, self.team_pos] = df['team_color_encoded'].to_numpy()
+        else:
+            X[:, self.team_pos] = self.encode_team(df['team_color'])
+
+        goal_difference = df['goal_difference'].to_numpy()
+        X[:, self.goal_pos] = goal_difference
+        X[:, self.duration_pos] = df['match_duration'].to_numpy()
+        X[:, self.overtime_pos] = df['overtime'].to_numpy()
+        X[:, self.competitive_pos] = (df['is_competitive'].to_numpy() if 'is_competitive' in df.columns
+                                      else competitive_flag(goal_difference))
+
+        if any(column in df.columns for column in self.mode_columns):
+            for column in self.mode_columns:
+                if column in df.columns:
+                    X[:, self.feature_names.index(column)] = df[column].to_numpy() == 1
+        else:
+            # Una comparación por modo sobre los códigos de los valores distintos
+            values, uniques = pd.factorize(df['game_mode'])
+            lowered = np.array([str(value).lower() for value in uniques] + [''])
+            game_mode = lowered[values]
+            for name, pos in self.mode_pos.items():
+                X[:, pos] = game_mode == name
+
+        return X
+
+
+def pipeline_version(encoder, model_sha256):
+    """Sello de versión: hash del formato, la codificación y el archivo del modelo"""
+    return joblib.hash((PIPELINE_FORMAT, encoder.feature_names, [str(c) for c in encoder.team_classes],
+                        [str(c) for c in encoder.winner_classes], encoder.game_modes, model_sha256))
+
+
+class MatchPipeline:
+    """
+    Codificación y modelo ajustados juntos: una carga y una llamada por
+    consumidor. model_sha256 es el hash de random_forest_model.pkl (con él
+    se validan el bosque compilado y la tabla precalculada) y version
+    identifica la combinación exacta de codificación y modelo.
+    """
+
+    def __init__(self, encoder, model, model_sha256, metadata=None):
+        model_features = getattr(model, 'feature_names_in_', None)
+        if model_features is not None and list(model_features) != encoder.feature_names:
+            raise ValueError(f"El modelo espera las features {list(model_features)}, "
+                             f"la codificación produce {encoder.feature_names}")
+        self.encoder = encoder
+        self.model = model
+        self.version = pipeline_version(encoder, model_sha256)
+        self.metadata = {
+            'format': PIPELINE_FORMAT,
+            'model_sha256': model_sha256,
+            'sklearn_version': sklearn.__version__,
+            'created_at': datetime.now().isoformat(),
+            **(metadata or {})
+        }
+
+    @property
+    def feature_names(self):
+        return self.encoder.feature_names
+
+    @property
+    def winner_labels(self):
+        """Etiquetas de ganador alineadas con las columnas de predict_proba"""
+        return self.encoder.decode_winner(self.model.classes_)
+
+    def transform(self, df) -> np.ndarray:
+        return self.encoder.transform(df)
+
+    def model_input(self, df):
+        """
+        Entrada del modelo para un DataFrame de partidas: la matriz float32 de
+        transform, con nombres de columna según model_matrix
+        """
+        return model_matrix(self.model, self.encoder.transform(df), index=df.index)
+
+    def predict_proba(self, df) -> np.ndarray:
+        """Probabilidades por clase de un DataFrame de partidas"""
+        return self.model.predict_proba(self.model_input(df))
+
+    def predict(self, df) -> np.ndarray:
+        """Ganador predicho de cada partida"""
+        return self.winner_labels[self.predict_proba(df).argmax(axis=1)]
+
+
+def save_pipeline(pipeline, path=PIPELINE_PATH):
+    """Guarda el pipeline (sin compresión, compatible con memory-map)"""
+    return save_artifact(pipeline, path)
+
+
+def pipeline_from_legacy(models_dir=MODELS_DIR, mmap=True):
+    """Arma el pipeline desde el modelo del último entrenamiento y los dos encoders"""
+    models_dir = Path(models_dir)
+    backend = trained_backend(models_dir)
+    model_path = backend.model_path(models_dir)
+    model = load_artifact(model_path, mmap=mmap)
+    team_encoder = joblib.load(models_dir / TEAM_ENCODER_PATH.name)
+    winner_encoder = joblib.load(models_dir / WINNER_ENCODER_PATH.name)
+
+    feature_names = list(getattr(model, 'feature_names_in_', FEATURE_NAMES))
+    game_modes = [name[len('mode_'):] for name in feature_names if name.startswith('mode_')]
+    encoder = MatchEncoder(team_encoder.classes_, winner_encoder.classes_, game_modes, feature_names)
+    return MatchPipeline(encoder, model, file_sha256(model_path),
+                         {'backend': backend.name, 'model_file': backend.model_file})
+
+
+def load_pipeline(models_dir=MODELS_DIR, mmap=True, name=PIPELINE_PATH.name):
+    """
+    Carga match_pipeline.pkl, u otro pipeline de models_dir por nombre (con
+    mmap=True los arrays del modelo se abren en modo solo lectura). Si no
+    existe, lo arma desde los pickles sueltos.
+    """
+    path = Path(models_dir) / name
+    if path.exists():
+        return load_artifact(path, mmap=mmap)
+    print(f"⚠️  No existe {path.name}, se arma el pipeline desde el modelo y los encoders")
+    return pipeline_from_legacy(models_dir, mmap=mmap)
+
+
+if __name__ == "__main__":
+    # Importado por nombre para que el pickle referencie model_pipeline y no __main__
+    from model_pipeline import pipeline_from_legacy, save_pipeline
+
+    pipeline = pipeline_from_legacy(mmap=False)
+    save_pipeline(pipeline)
+    print(f"Pipeline guardado en {PIPELINE_PATH}")
+    print(f"Versión: {pipeline.version}")
+    print(f"Features: {', '.join(pipeline.feature_names)}")
@@ -0,0 +1,82 @@
+"""
+Puntuación en paralelo de tablas grandes con un pool de procesos
+La entrada se divide en fragmentos contiguos que se puntúan en workers; cada
+worker carga el modelo una sola vez al iniciar (con memory-map, así los
+arrays del bosque se comparten entre procesos a través de la caché de
+páginas) y los resultados se unen en el orden original.
+
+Los workers arrancan con spawn en todas las plataformas (como en Windows):
+el script que crea el pool debe tener su trabajo detrás de
+if __name__ == "__main__", porque cada worker reimporta el módulo principal.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from artifacts import MODEL_PATH, load_artifact
+
+# Método de arranque de los workers (el mismo en Linux y Windows)
+START_METHOD = "spawn"
+
+# Modelo del proceso worker (lo asigna _init_worker)
+_worker_model = None
+
+
+def _init_worker(model_path, mmap):
+    """Carga el modelo en el worker (corre una vez por proceso)"""
+    global _worker_model
+    _worker_model = load_artifact(model_path, mmap=mmap)
+    # El paralelismo lo dan los procesos: un hilo por worker
+    if hasattr(_worker_model, 'n_jobs'):
+        _worker_model.n_jobs = 1
+
+
+def _predict_shard(X):
+    return _worker_model.predict_proba(X)
+
+
+def shard_bounds(n_rows, n_shards):
+    """Límites [inicio, fin) de n_shards fragmentos contiguos y parejos"""
+    edges = np.linspace(0, n_rows, n_shards + 1).astype(int)
+    return [(start, end) for start, end in zip(edges[:-1], edges[1:]) if end > start]
+
+
+class ParallelScorer:
+    """
+    Pool de procesos que puntúa matrices de features por fragmentos.
+    Se usa como context manager; el pool se reutiliza entre llamadas, así que
+    el modelo se carga una vez por worker aunque se puntúen muchos bloques.
+    """
+
+    def __init__(self, n_workers=None, model_path=MODEL_PATH, mmap=True, shards_per_worker=2,
+                 start_method=START_METHOD):
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.shards_per_worker = shards_per_worker
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(str(model_path), mmap)
+        )
+
+    def predict_proba(self, X):
+        """Probabilidades por clase de X (DataFrame o array), en el orden de las filas"""
+        # Una entrada vacía se delega igual al modelo, que reporta el error
+        bounds = shard_bounds(len(X), self.n_workers * self.shards_per_worker) or [(0, 0)]
+        take = X.iloc if hasattr(X, 'iloc') else X
+        shards = [take[start:end] for start, end in bounds]
+        # map conserva el orden de los fragmentos
+        return np.vstack(list(self._pool.map(_predict_shard, shards)))
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,224 @@
+"""
+Ejecución del pipeline de entrenamiento con caché por contenido
+ingesta -> limpieza -> features -> codificación -> entrenamiento -> compresión
+
+Cada etapa es uno de los scripts de src/. Antes de correrla se calcula una
+clave con el hash de su código y de sus archivos de entrada; si esa clave ya
+está en data/cache/ la etapa no se ejecuta: se deja la salida actual si
+coincide con la guardada o se restaura desde la caché. Como las claves
+dependen del contenido, una etapa que produce lo mismo que antes evita que
+se vuelvan a correr las siguientes.
+
+Uso:
+    python src/pipeline.py [--force] [--stages ingest clean features encode train compress]
+"""
+
+import argparse
+import hashlib
+import json
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from artifacts import FLAT_FOREST_PATH, MODEL_PATH, MODELS_DIR, file_sha256
+from compress_model import COMPRESSED_MODEL_PATH, COMPRESSED_PIPELINE_PATH, COMPRESSION_REPORT_PATH
+from ingest import RAW_DATA_PATH, cached_raw_path, ingest_meta_path
+from model_pipeline import ENCODER_PATH, PIPELINE_PATH, TEAM_ENCODER_PATH, WINNER_ENCODER_PATH
+from storage import CSV_EXPORT, STORAGE_FORMAT, table_path
+
+# Rutas
+BASE_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = BASE_DIR / "src"
+CACHE_DIR = BASE_DIR / "data" / "cache"
+
+# Entradas guardadas por etapa (las más antiguas se eliminan)
+MAX_CACHE_ENTRIES = 3
+
+
+class Stage:
+    """
+    Una etapa del pipeline: el script a ejecutar, los módulos de código de
+    los que depende, y sus archivos de entrada y de salida.
+    """
+
+    def __init__(self, name, script, inputs, outputs, code=()):
+        self.name = name
+        self.script = Path(script)
+        self.inputs = [Path(path) for path in inputs]
+        self.outputs = [Path(path) for path in outputs]
+        self.code = [Path(path) for path in code]
+
+    def cache_key(self):
+        """Hash del código de la etapa y del contenido de sus entradas"""
+        digest = hashlib.sha256(self.name.encode())
+        for path in [self.script, *self.code, *self.inputs]:
+            if not path.exists():
+                raise FileNotFoundError(f"Etapa '{self.name}': no existe {path}")
+            digest.update(path.name.encode())
+            digest.update(file_sha256(path).encode())
+        return digest.hexdigest()
+
+
+def table_outputs(name):
+    """Archivos que escribe write_table para una tabla con la configuración actual"""
+    paths = [table_path(name)]
+    if CSV_EXPORT and STORAGE_FORMAT != "csv":
+        paths.insert(0, table_path(name, "csv"))
+    return paths
+
+
+def default_stages():
+    """Etapas del pipeline de entrenamiento, en orden"""
+    storage_code = [SRC_DIR / "storage.py", SRC_DIR / "schema.py", SRC_DIR / "features.py"]
+    return [
+        Stage("ingest", SRC_DIR / "ingest.py",
+              inputs=[RAW_DATA_PATH],
+              outputs=[cached_raw_path(), ingest_meta_path()],
+              code=storage_code + [SRC_DIR / "artifacts.py"]),
+        Stage("clean", SRC_DIR / "cleaning.py",
+              inputs=[cached_raw_path()],
+              outputs=table_outputs("processed_matches"),
+              code=storage_code + [SRC_DIR / "ingest.py"]),
+        Stage("features", SRC_DIR / "features.py",
+              inputs=[table_path("processed_matches")],
+              outputs=table_outputs("processed_features"),
+              code=storage_code),
+        Stage("encode", SRC_DIR / "encode_and_pipeline.py",
+              inputs=[table_path("processed_features")],
+              outputs=table_outputs("processed_encoded")
+              + [ENCODER_PATH, TEAM_ENCODER_PATH, WINNER_ENCODER_PATH],
+              code=storage_code + [SRC_DIR / "artifacts.py", SRC_DIR / "model_backends.py",
+                                   SRC_DIR / "model_pipeline.py"]),
+        Stage("train", SRC_DIR / "train_model.py",
+              inputs=[table_path("processed_encoded"), ENCODER_PATH],
+              outputs=[MODEL_PATH, FLAT_FOREST_PATH, MODELS_DIR / "model_metadata.pkl", PIPELINE_PATH],
+              code=storage_code + [SRC_DIR / "artifacts.py", SRC_DIR / "flat_forest.py",
+                                   SRC_DIR / "model_backends.py", SRC_DIR / "model_pipeline.py",
+                                   SRC_DIR / "tuning.py"]),
+        Stage("compress", SRC_DIR / "compress_model.py",
+              inputs=[table_path("processed_encoded"), PIPELINE_PATH],
+              outputs=[COMPRESSED_MODEL_PATH, COMPRESSED_PIPELINE_PATH, COMPRESSION_REPORT_PATH],
+              code=storage_code + [SRC_DIR / "artifacts.py", SRC_DIR / "model_backends.py",
+                                   SRC_DIR / "model_pipeline.py", SRC_DIR / "tuning.py"]),
+    ]
+
+
+def outputs_match(stage, manifest):
+    """Indica si las salidas actuales son las que guarda la entrada de caché"""
+    return all(path.exists() and file_sha256(path) == manifest['outputs'].get(path.name)
+               for path in stage.outputs)
+
+
+def store_outputs(stage, entry_dir, key, cache_dir):
+    """Copia las salidas de una etapa a su entrada de caché"""
+    missing = [str(path) for path in stage.outputs if not path.exists()]
+    if missing:
+        raise FileNotFoundError(f"Etapa '{stage.name}' no generó: {', '.join(missing)}")
+
+    tmp_dir = entry_dir.with_name(entry_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    for path in stage.outputs:
+        shutil.copyfile(path, tmp_dir / path.name)
+    manifest = {
+        'stage': stage.name,
+        'key': key,
+        'outputs': {path.name: file_sha256(path) for path in stage.outputs}
+    }
+    (tmp_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    # La entrada aparece completa o no aparece
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    tmp_dir.replace(entry_dir)
+    prune_cache(Path(cache_dir) / stage.name)
+
+
+def restore_outputs(stage, entry_dir):
+    """Copia las salidas guardadas en caché a sus rutas (con fecha de modificación nueva)"""
+    for path in stage.outputs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(entry_dir / path.name, path)
+
+
+def prune_cache(stage_dir, keep=MAX_CACHE_ENTRIES):
+    """Elimina las entradas más antiguas de una etapa"""
+    entries = sorted((entry for entry in stage_dir.iterdir() if (entry / "manifest.json").exists()),
+                     key=lambda entry: (entry / "manifest.json").stat().st_mtime_ns, reverse=True)
+    for entry in entries[keep:]:
+        shutil.rmtree(entry, ignore_errors=True)
+
+
+def run_stage(stage, force=False, cache_dir=CACHE_DIR, cwd=BASE_DIR):
+    """
+    Ejecuta una etapa si hace falta. Retorna el estado:
+    'ejecutada', 'sin cambios' o 'restaurada'.
+    """
+    key = stage.cache_key()
+    entry_dir = Path(cache_dir) / stage.name / key
+    manifest_path = entry_dir / "manifest.json"
+
+    if not force and manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        # Se marca como usada para que no la elimine prune_cache
+        manifest_path.touch()
+        if outputs_match(stage, manifest):
+            return 'sin cambios'
+        restore_outputs(stage, entry_dir)
+        return 'restaurada'
+
+    # Los scripts usan rutas relativas a la raíz del proyecto
+    result = subprocess.run([sys.executable, str(stage.script)], cwd=cwd)
+    if result.returncode != 0:
+        raise RuntimeError(f"La etapa '{stage.name}' terminó con código {result.returncode}")
+    store_outputs(stage, entry_dir, key, cache_dir)
+    return 'ejecutada'
+
+
+def run_pipeline(stages=None, force=False, cache_dir=CACHE_DIR, cwd=BASE_DIR, verbose=True):
+    """Ejecuta las etapas en orden. Retorna [(etapa, estado, segundos)]"""
+    stages = default_stages() if stages is None else stages
+    report = []
+    for stage in stages:
+        if verbose:
+            print(f"\n▶️  Etapa '{stage.name}' ({stage.script.name})")
+        start = time.perf_counter()
+        status = run_stage(stage, force=force, cache_dir=cache_dir, cwd=cwd)
+        report.append((stage.name, status, time.perf_counter() - start))
+        if verbose:
+            print(f"   ✓ {status} en {report[-1][2]:.2f}s")
+    return report
+
+
+def print_report(report):
+    """Tabla de tiempos por etapa"""
+    print("\n" + "="*60)
+    print("⏱️  TIEMPOS POR ETAPA")
+    print("="*60)
+    for name, status, seconds in report:
+        print(f"{name:<10} {status:<12} {seconds:>8.2f}s")
+    print(f"{'total':<10} {'':<12} {sum(seconds for _, _, seconds in report):>8.2f}s")
+
+
+def main(argv=None):
+    stages = default_stages()
+    parser = argparse.ArgumentParser(description="Pipeline de entrenamiento con caché por contenido")
+    parser.add_argument("--force", action="store_true",
+                        help="Ejecutar todas las etapas aunque sus entradas no hayan cambiado")
+    parser.add_argument("--stages", nargs="+", choices=[stage.name for stage in stages], default=None,
+                        help="Ejecutar solo estas etapas (en el orden del pipeline)")
+    args = parser.parse_args(argv)
+
+    if args.stages:
+        stages = [stage for stage in stages if stage.name in args.stages]
+    try:
+        report = run_pipeline(stages, force=args.force)
+    except (RuntimeError, FileNotFoundError) as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    print_report(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
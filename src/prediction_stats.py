@@ -0,0 +1,216 @@
+"""
+Estadísticas agregadas de las predicciones guardadas (model_predictions)
+Mantiene en memoria los conteos, sumas y momentos que necesita /stats, de
+modo que responder es O(1) sin importar el tamaño del archivo. La media y la
+desviación estándar de goal_difference se acumulan con el método de Welford
+(combinando bloques con la fórmula de Chan), así que agregar filas nuevas no
+obliga a releer las anteriores: si un CSV solo creció (como al puntuar con
+--incremental), se leen únicamente los bytes nuevos.
+"""
+
+import io
+import threading
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from storage import format_of, iter_frame_chunks
+
+# Filas leídas por bloque al reconstruir las estadísticas desde el archivo
+CHUNK_SIZE = 100_000
+
+# Columnas que se leen del archivo (el resto no interviene en /stats)
+STATS_COLUMNS = ['game_mode', 'predicted_winner', 'match_duration', 'overtime', 'goal_difference']
+
+# Bytes finales del CSV que se comparan para confirmar que el archivo solo creció
+TAIL_BYTES = 4096
+
+
+def value_counts(series):
+    """Conteo por valor, sin las categorías que no aparecen"""
+    counts = series.value_counts()
+    return counts[counts > 0].to_dict()
+
+
+class PredictionStats:
+    """Agregados incrementales de un conjunto de predicciones"""
+
+    def __init__(self):
+        self.total_matches = 0
+        self.game_modes = Counter()
+        self.predicted_winners = Counter()
+        self.duration_sum = 0.0
+        self.overtime_count = 0
+        # Welford para goal_difference: n, media y suma de cuadrados de desviaciones
+        self.goal_mean = 0.0
+        self.goal_m2 = 0.0
+        self.goal_min = None
+        self.goal_max = None
+
+    def update(self, df: pd.DataFrame):
+        """Incorpora un bloque de predicciones a los agregados"""
+        n = len(df)
+        if n == 0:
+            return self
+
+        self.game_modes.update(value_counts(df['game_mode']))
+        self.predicted_winners.update(value_counts(df['predicted_winner']))
+        self.duration_sum += float(df['match_duration'].sum())
+        self.overtime_count += int(df['overtime'].sum())
+
+        goals = df['goal_difference'].to_numpy(dtype=np.float64)
+        chunk_mean = goals.mean()
+        chunk_m2 = float(((goals - chunk_mean) ** 2).sum())
+
+        # Combinación de dos estados de Welford (Chan et al.)
+        total = self.total_matches + n
+        delta = chunk_mean - self.goal_mean
+        self.goal_mean += delta * n / total
+        self.goal_m2 += chunk_m2 + delta ** 2 * self.total_matches * n / total
+        self.total_matches = total
+
+        chunk_min, chunk_max = int(goals.min()), int(goals.max())
+        self.goal_min = chunk_min if self.goal_min is None else min(self.goal_min, chunk_min)
+        self.goal_max = chunk_max if self.goal_max is None else max(self.goal_max, chunk_max)
+        return self
+
+    def to_dict(self) -> dict:
+        """Respuesta de /stats"""
+        n = self.total_matches
+        if n == 0:
+            return {
+                "message": "No hay predicciones guardadas aún",
+                "total_matches": 0
+            }
+
+        return {
+            "total_matches": n,
+            "game_modes": dict(self.game_modes.most_common()),
+            "predicted_winner_distribution": dict(self.predicted_winners.most_common()),
+            "avg_match_duration": self.duration_sum / n,
+            "overtime_percentage": self.overtime_count / n * 100,
+            "goal_difference_stats": {
+                "mean": self.goal_mean,
+                # Desviación muestral (ddof=1), igual que pandas
+                "std": (self.goal_m2 / (n - 1)) ** 0.5 if n > 1 else 0.0,
+                "min": self.goal_min,
+                "max": self.goal_max
+            }
+        }
+
+
+class PredictionStatsCache:
+    """
+    Estadísticas de un archivo de predicciones (CSV, Parquet o Feather),
+    calculadas una vez y reutilizadas mientras el archivo no cambie (ruta,
+    inodo, mtime y tamaño). path puede ser una función que retorne la ruta
+    vigente (o None), para seguir a la tabla cuando cambia de formato. Si un
+    CSV solo creció (mismo archivo y mismos bytes finales), los agregados se
+    actualizan con las filas nuevas sin releer el archivo; igual con append().
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self.stats = None
+        self.stamp = None
+        self.reloads = 0
+        self.incremental_reads = 0
+        self._header = b''
+        self._tail = b''
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        path = self._path() if callable(self._path) else self._path
+        return Path(path) if path is not None else None
+
+    def _file_stamp(self):
+        path = self.path
+        try:
+            stat = path.stat()
+        except (OSError, AttributeError):
+            return None
+        return (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _remember_edges(self, stamp):
+        """Guarda el encabezado y los últimos bytes del CSV leído (para detectar agregados)"""
+        self._header = self._tail = b''
+        if stamp is None or stamp[3] == 0 or format_of(stamp[0]) != "csv":
+            return
+        with open(stamp[0], 'rb') as f:
+            self._header = f.readline()
+            f.seek(max(stamp[3] - TAIL_BYTES, 0))
+            self._tail = f.read(stamp[3] - f.tell())
+
+    def _reload(self, stamp):
+        stats = PredictionStats()
+        if stamp is not None and stamp[3] > 0:
+            for chunk in iter_frame_chunks(stamp[0], CHUNK_SIZE, columns=STATS_COLUMNS):
+                stats.update(chunk)
+        self.stats, self.stamp = stats, stamp
+        self._remember_edges(stamp)
+        self.reloads += 1
+
+    def _only_grew(self, stamp):
+        """Indica si el archivo es el mismo CSV leído antes con filas agregadas al final"""
+        if stamp is None or format_of(stamp[0]) != "csv":
+            return False
+        if self.stamp is None or self.stamp[3] == 0:
+            return True  # antes no había nada que leer
+        if stamp[:2] != self.stamp[:2] or stamp[3] <= self.stamp[3]:
+            return False
+        with open(stamp[0], 'rb') as f:
+            f.seek(self.stamp[3] - len(self._tail))
+            return f.read(len(self._tail)) == self._tail
+
+    def _read_appended(self, stamp):
+        """Agrega a las estadísticas solo las líneas completas escritas después de la última lectura"""
+        start = self.stamp[3] if self.stamp is not None else 0
+        with open(stamp[0], 'rb') as f:
+            f.seek(start)
+            data = f.read(stamp[3] - start)
+        # Una línea a medio escribir se lee en la próxima consulta
+        data = data[:data.rfind(b'\n') + 1]
+        if start == 0:
+            self._header = data[:data.find(b'\n') + 1]
+            rows = data[len(self._header):]
+        else:
+            rows = data
+        if rows:
+            self.stats.update(pd.read_csv(io.BytesIO(self._header + rows), usecols=STATS_COLUMNS))
+        size = start + len(data)
+        self.stamp = stamp[:3] + (size,)
+        self._tail = ((self._tail if start else b'') + data)[-TAIL_BYTES:]
+        self.incremental_reads += 1
+
+    def _refresh(self):
+        stamp = self._file_stamp()
+        if self.stats is None:
+            self._reload(stamp)
+        elif stamp != self.stamp:
+            if self._only_grew(stamp):
+                self._read_appended(stamp)
+            else:
+                self._reload(stamp)
+
+    def get(self) -> dict:
+        """Estadísticas actuales; relee el archivo solo si cambió en disco (o solo lo nuevo)"""
+        with self._lock:
+            self._refresh()
+            return self.stats.to_dict()
+
+    def append(self, df: pd.DataFrame):
+        """Agrega predicciones al final del archivo (solo CSV) y actualiza los agregados"""
+        path = self.path
+        if path is None or format_of(path) != "csv":
+            raise ValueError(f"append() solo admite archivos CSV (ruta: {path})")
+
+        with self._lock:
+            self._refresh()
+            stamp = self._file_stamp()
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_csv(path, mode='a', header=stamp is None or stamp[3] == 0, index=False)
+            self._refresh()
@@ -0,0 +1,90 @@
+"""
+Esquema central de tipos de las tablas del pipeline
+Los textos con pocos valores distintos (color, modo, ganador) se guardan como
+category y los enteros chicos con el menor ancho que les alcanza, así cada
+tabla ocupa varias veces menos memoria que con object/int64. Limpieza,
+features, codificación, puntuación y la capa de almacenamiento usan estos
+mismos esquemas.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Etiquetas de las categorías creadas con pd.cut
+GOAL_DIFF_CATEGORY_LABELS = ['large_loss', 'small_loss', 'close', 'small_win', 'large_win']
+DURATION_BUCKET_LABELS = ['short', 'normal', 'long', 'very_long']
+
+# === ESQUEMAS ===
+MATCH_SCHEMA = {
+    'match_id': 'int64',
+    'match_date': 'datetime64[ns]',
+    'team_color': 'category',
+    'game_mode': 'category',
+    'goal_difference': 'int16',
+    'match_duration': 'int16',  # segundos: hasta ~9 horas
+    'overtime': 'bool',
+    'winner': 'category',
+}
+
+FEATURE_SCHEMA = {
+    **MATCH_SCHEMA,
+    'goal_diff_category': pd.CategoricalDtype(GOAL_DIFF_CATEGORY_LABELS, ordered=True),
+    'duration_bucket': pd.CategoricalDtype(DURATION_BUCKET_LABELS, ordered=True),
+    'is_competitive': 'int8',
+    'team_mode': 'category',
+}
+
+ENCODED_SCHEMA = {
+    **FEATURE_SCHEMA,
+    'team_color_encoded': 'int8',
+    'mode_Duel': 'bool',
+    'mode_Doubles': 'bool',
+    'mode_Standard': 'bool',
+    'winner_encoded': 'int8',
+}
+
+PREDICTION_SCHEMA = {
+    'team_color': 'category',
+    'game_mode': 'category',
+    'goal_difference': 'int16',
+    'match_duration': 'int16',
+    'overtime': 'bool',
+    'is_competitive': 'int8',
+    'winner': 'category',
+    'predicted_winner': 'category',
+    'prediction_confidence': 'float64',
+}
+
+# Tablas del pipeline: nombre -> esquema
+SCHEMAS = {
+    'processed_matches': MATCH_SCHEMA,
+    'processed_features': FEATURE_SCHEMA,
+    'processed_encoded': ENCODED_SCHEMA,
+    'model_predictions': PREDICTION_SCHEMA,
+}
+
+
+def check_int_range(series, dtype):
+    """Verifica que los valores entren en el tipo entero indicado antes de convertir"""
+    info = np.iinfo(dtype)
+    values = series.dropna()
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        raise ValueError(f"Columna '{series.name}' fuera del rango de {dtype}: "
+                         f"[{values.min()}, {values.max()}]")
+
+
+def apply_schema(df, schema):
+    """Convierte las columnas presentes en el esquema a su tipo declarado"""
+    casts = {
+        column: dtype for column, dtype in schema.items()
+        if column in df.columns and df[column].dtype != dtype
+    }
+    for column, dtype in casts.items():
+        if pd.api.types.is_integer_dtype(dtype) and pd.api.types.is_numeric_dtype(df[column]):
+            check_int_range(df[column], dtype)
+    return df.astype(casts) if casts else df
+
+
+def memory_mb(df):
+    """Memoria de un DataFrame en MB, incluyendo el contenido de los textos"""
+    return df.memory_usage(deep=True).sum() / 1e6
@@ -0,0 +1,402 @@
+"""
+Motor de puntuación batch: carga del modelo, reconstrucción de columnas,
+puntuación y escritura de model_predictions
+Reúne lo que antes duplicaban batch_predictions.py y
+generate_predictions_with_winner.py. Se puede usar desde otro proceso de
+Python (ScoringEngine mantiene el modelo y el pool cargados entre llamadas)
+o por línea de comandos.
+
+Uso:
+    python src/scoring.py [--input RUTA] [--output RUTA] [--chunk-size N]
+                          [--workers N] [--format parquet|feather|csv]
+"""
+
+import argparse
+import hashlib
+import time
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from artifacts import MODELS_DIR, file_sha256
+from features import competitive_flag, decode_game_mode
+from model_backends import trained_backend
+from model_pipeline import PIPELINE_PATH, load_pipeline
+from parallel_scoring import ParallelScorer
+from storage import (EXTENSIONS, SCHEMAS, TableWriter, apply_schema, count_rows, find_table, format_of,
+                     iter_frame_chunks, read_frame, table_path, write_frame, write_table)
+
+# Valores por defecto de las columnas requeridas que falten
+# (is_competitive se deriva de goal_difference, como en el entrenamiento)
+REQUIRED_DEFAULTS = {
+    'goal_difference': 0,
+    'match_duration': 300,
+    'overtime': 0
+}
+
+# Artefactos que determinan la versión del modelo en modo incremental
+# (el primero se reemplaza por el modelo del backend entrenado; más match_pipeline.pkl si existe)
+MODEL_FILES = ['random_forest_model.pkl', 'team_encoder.pkl', 'winner_encoder.pkl']
+
+# Filas por bloque al recorrer la entrada en modo incremental sin --chunk-size
+INCREMENTAL_CHUNK_SIZE = 100_000
+
+
+class ScoringEngine:
+    """
+    Pipeline (codificación + modelo) cargado una vez, con un pool de procesos opcional,
+    listos para puntuar DataFrames o archivos completos. Se usa como
+    context manager para cerrar el pool al terminar.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR, workers=1, mmap=True):
+        models_dir = Path(models_dir)
+        self.pipeline = load_pipeline(models_dir, mmap=mmap)
+        # Los workers del pool cargan el mismo modelo suelto que usó el pipeline
+        model_path = models_dir / self.pipeline.metadata.get('model_file', MODEL_FILES[0])
+        self.encoder = self.pipeline.encoder
+        self.model = self.pipeline.model
+        self.team_encoder = self.encoder.team_encoder
+        self.winner_encoder = self.encoder.winner_encoder
+        self.feature_names = self.pipeline.feature_names
+        # Etiquetas en minúsculas alineadas con las columnas de predict_proba
+        self.winner_labels = pd.Index(self.pipeline.winner_labels).str.lower()
+        self.model_version = model_fingerprint(models_dir)
+        self.workers = workers
+        self.scorer = ParallelScorer(workers, model_path, mmap=mmap) if workers > 1 else None
+        self._warned = set()
+
+    def decode(self, df):
+        """Reconstruye game_mode y team_color y completa las columnas requeridas"""
+        df['game_mode'] = decode_game_mode(df)
+
+        if 'team_color_encoded' in df.columns:
+            df['team_color'] = self.encoder.decode_team(df['team_color_encoded'])
+        elif 'team_color' not in df.columns:
+            df['team_color'] = 'Blue'  # Default
+
+        for col, default in REQUIRED_DEFAULTS.items():
+            if col not in df.columns:
+                if col not in self._warned:
+                    print(f"⚠️  Columna {col} no encontrada, usando valores por defecto")
+                    self._warned.add(col)
+                df[col] = default
+        if 'is_competitive' not in df.columns:
+            df['is_competitive'] = competitive_flag(df['goal_difference'].to_numpy())
+        return df
+
+    def predict_proba(self, X):
+        """Probabilidades por clase, en este proceso o en el pool"""
+        return (self.scorer or self.model).predict_proba(X)
+
+    def score(self, df):
+        """
+        Puntúa un bloque de processed_encoded y retorna las columnas de
+        model_predictions. Incluye el ganador real si hay winner_encoded.
+        """
+        df = self.decode(df)
+        probabilities = self.predict_proba(self.pipeline.model_input(df))
+        best = probabilities.argmax(axis=1)
+
+        output = {
+            'team_color': df['team_color'],
+            'game_mode': df['game_mode'],
+            'goal_difference': df['goal_difference'],
+            'match_duration': df['match_duration'],
+            'overtime': df['overtime'],
+            'is_competitive': df['is_competitive'],
+        }
+        if 'winner_encoded' in df.columns:
+            real = self.encoder.decode_winner(df['winner_encoded'])
+            output['winner'] = pd.Index(real).str.lower()
+        output['predicted_winner'] = self.winner_labels[best]
+        output['prediction_confidence'] = probabilities.max(axis=1)
+        return apply_schema(pd.DataFrame(output, index=df.index), SCHEMAS['model_predictions'])
+
+    def score_file(self, input_path=None, output_path=None, chunk_size=0, fmt=None, verbose=True):
+        """
+        Puntúa un archivo completo y guarda el resultado. Con chunk_size > 0
+        lo recorre por bloques (memoria acotada por el bloque); si no, lo
+        carga entero. Retorna (ruta de salida, filas).
+        """
+        input_path = Path(input_path) if input_path is not None else find_table('processed_encoded')
+        if input_path is None or not input_path.exists():
+            raise FileNotFoundError(f"No existe la tabla de entrada: {input_path}")
+        schema = SCHEMAS['processed_encoded']
+
+        if chunk_size <= 0:
+            output = self.score(read_frame(input_path, schema=schema))
+            if output_path is None:
+                # Tabla estándar del pipeline: respeta RL_CSV_EXPORT
+                return write_table(output, 'model_predictions', fmt=fmt), len(output)
+            return write_predictions(output, output_path), len(output)
+
+        output_path = Path(output_path) if output_path is not None else table_path('model_predictions', fmt)
+
+        total_rows = count_rows(input_path)
+        if verbose:
+            print(f"📊 Leyendo {input_path.name} por bloques de {chunk_size:,} filas ({total_rows:,} filas)")
+
+        start = time.perf_counter()
+        with TableWriter(output_path, SCHEMAS['model_predictions']) as writer:
+            for chunk in iter_frame_chunks(input_path, chunk_size, schema=schema):
+                writer.write(self.score(chunk))
+                if verbose:
+                    elapsed = time.perf_counter() - start
+                    progress = writer.rows / total_rows if total_rows else 1.0
+                    print(f"   🔮 {writer.rows:,}/{total_rows:,} filas ({progress:.0%}) - "
+                          f"{writer.rows / elapsed:,.0f} filas/s")
+
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"   ⏱️  {writer.rows:,} filas en {elapsed:.1f}s "
+                  f"({writer.rows / max(elapsed, 1e-9):,.0f} filas/s)")
+        return output_path, writer.rows
+
+    def score_incremental(self, input_path=None, output_path=None, chunk_size=0, fmt=None, verbose=True):
+        """
+        Como score_file, pero solo puntúa las filas de entrada nuevas o
+        modificadas desde la corrida anterior y conserva las demás
+        predicciones. Si no hay estado previo válido o cambió la versión del
+        modelo, puntúa todo. Retorna (ruta de salida, filas, filas puntuadas).
+        """
+        input_path = Path(input_path) if input_path is not None else find_table('processed_encoded')
+        if input_path is None or not input_path.exists():
+            raise FileNotFoundError(f"No existe la tabla de entrada: {input_path}")
+        output_path = Path(output_path) if output_path is not None else table_path('model_predictions', fmt)
+        chunk_size = chunk_size if chunk_size > 0 else INCREMENTAL_CHUNK_SIZE
+        schema = SCHEMAS['processed_encoded']
+
+        # Primera pasada: hash de cada fila, leyendo solo las columnas que usa la puntuación
+        columns = [col for col in self.feature_names + ['winner_encoded'] if col in schema]
+        available = set(next(iter_frame_chunks(input_path, 1)).columns)
+        columns = [col for col in columns if col in available]
+        hashes = np.concatenate([row_hashes(chunk, columns) for chunk in
+                                 iter_frame_chunks(input_path, chunk_size, columns=columns, schema=schema)]
+                                or [np.empty(0, dtype=np.uint64)])
+
+        state = load_scoring_state(output_path)
+        reason = None
+        if state is None:
+            reason = "sin estado previo"
+        elif state['meta']['model_version'] != self.model_version:
+            reason = "cambió el modelo"
+        elif state['meta']['hash_columns'] != columns:
+            reason = "cambiaron las columnas de entrada"
+        elif not output_path.exists() or output_signature(output_path) != state['meta']['output']:
+            reason = "la salida fue modificada"
+
+        if reason is not None:
+            if verbose:
+                print(f"🔄 Puntuación completa ({reason})")
+            output_path, rows = self.score_file(input_path, output_path, chunk_size=chunk_size, verbose=verbose)
+            save_scoring_state(output_path, hashes, columns, self.model_version)
+            return output_path, rows, rows
+
+        previous = state['hashes']
+        n_common = min(len(hashes), len(previous))
+        changed = np.flatnonzero(hashes[:n_common] != previous[:n_common])
+        n_new = max(len(hashes) - len(previous), 0)
+        if verbose:
+            print(f"♻️  Modo incremental: {n_new:,} filas nuevas, {len(changed):,} modificadas, "
+                  f"{max(len(previous) - len(hashes), 0):,} eliminadas")
+
+        if len(changed) == 0 and len(hashes) == len(previous):
+            return output_path, len(hashes), 0
+
+        if len(changed) == 0 and len(hashes) > len(previous) and format_of(output_path) == 'csv':
+            # Solo se agregaron filas: se anexan al CSV sin reescribirlo
+            scored = 0
+            for start, chunk in _chunks_with_offset(input_path, chunk_size, schema):
+                new_rows = chunk.iloc[max(len(previous) - start, 0):].copy()
+                if len(new_rows):
+                    self.score(new_rows).to_csv(
+                        output_path, mode='a', header=False, index=False)
+                    scored += len(new_rows)
+        else:
+            scored = self._merge_scores(input_path, output_path, chunk_size, schema, hashes, previous)
+
+        save_scoring_state(output_path, hashes, columns, self.model_version)
+        return output_path, len(hashes), scored
+
+    def _merge_scores(self, input_path, output_path, chunk_size, schema, hashes, previous):
+        """Reescribe la salida con las predicciones previas y las filas repuntuadas"""
+        old_rows = _RowReader(iter_frame_chunks(output_path, chunk_size))
+        scored = 0
+        with TableWriter(output_path, SCHEMAS['model_predictions']) as writer:
+            for start, chunk in _chunks_with_offset(input_path, chunk_size, schema):
+                end = start + len(chunk)
+                chunk = chunk.reset_index(drop=True)
+                old = old_rows.take(max(min(end, len(previous)) - start, 0))
+
+                positions = np.arange(start, end)
+                needs = positions >= len(previous)
+                needs[:len(old)] = hashes[start:start + len(old)] != previous[start:start + len(old)]
+
+                if needs.any():
+                    new = self.score(chunk[needs].copy())
+                    old = pd.concat([old.drop(index=new.index, errors='ignore'), new]).sort_index()
+                    scored += int(needs.sum())
+                writer.write(old)
+            # Se suelta la salida anterior antes de reemplazarla
+            old_rows.close()
+        return scored
+
+    def close(self):
+        if self.scorer is not None:
+            self.scorer.close()
+            self.scorer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def model_fingerprint(models_dir=MODELS_DIR):
+    """Versión del modelo: hash del contenido del modelo, de sus encoders y del pipeline"""
+    digest = hashlib.sha256()
+    for name in [trained_backend(models_dir).model_file] + MODEL_FILES[1:]:
+        digest.update(file_sha256(Path(models_dir) / name).encode())
+    pipeline_path = Path(models_dir) / PIPELINE_PATH.name
+    if pipeline_path.exists():
+        digest.update(file_sha256(pipeline_path).encode())
+    return digest.hexdigest()
+
+
+def row_hashes(df, columns):
+    """Hash de 64 bits de cada fila según los valores de las columnas indicadas"""
+    # Mismos números => mismo hash, aunque el formato guarde otro tipo (bool vs int)
+    return pd.util.hash_pandas_object(df[columns].astype('float64'), index=False).to_numpy()
+
+
+def output_signature(path):
+    """Tamaño y fecha de modificación de un archivo de salida"""
+    stat = Path(path).stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def state_paths(output_path):
+    """Rutas de los hashes por fila y de la metadata del modo incremental"""
+    output_path = Path(output_path)
+    return (output_path.with_name(output_path.name + '.rows.npy'),
+            output_path.with_name(output_path.name + '.meta.pkl'))
+
+
+def load_scoring_state(output_path):
+    """Estado de la corrida incremental anterior, o None si no existe o es inconsistente"""
+    hashes_path, meta_path = state_paths(output_path)
+    if not hashes_path.exists() or not meta_path.exists():
+        return None
+    meta = joblib.load(meta_path)
+    hashes = np.load(hashes_path)
+    if len(hashes) != meta.get('rows'):
+        return None
+    return {'hashes': hashes, 'meta': meta}
+
+
+def save_scoring_state(output_path, hashes, columns, model_version):
+    """Guarda los hashes por fila y la metadata tras escribir la salida"""
+    hashes_path, meta_path = state_paths(output_path)
+    # La metadata se escribe al final: si algo falla antes, la próxima corrida puntúa todo
+    meta_path.unlink(missing_ok=True)
+    np.save(hashes_path, hashes)
+    joblib.dump({
+        'model_version': model_version,
+        'hash_columns': columns,
+        'rows': len(hashes),
+        'output': output_signature(output_path),
+        'created_at': datetime.now().isoformat()
+    }, meta_path)
+
+
+def _chunks_with_offset(path, chunk_size, schema):
+    """Bloques de un archivo junto con la posición de su primera fila"""
+    start = 0
+    for chunk in iter_frame_chunks(path, chunk_size, schema=schema):
+        yield start, chunk
+        start += len(chunk)
+
+
+class _RowReader:
+    """Entrega las filas de un iterador de bloques en la cantidad que se pida"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = []
+        self._buffered = 0
+
+    def take(self, n):
+        while self._buffered < n:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer.append(chunk)
+            self._buffered += len(chunk)
+        if not self._buffer:
+            return pd.DataFrame()
+        data = pd.concat(self._buffer, ignore_index=True)
+        rows, rest = data.iloc[:n], data.iloc[n:]
+        self._buffer = [rest] if len(rest) else []
+        self._buffered = len(rest)
+        return rows.reset_index(drop=True)
+
+    def close(self):
+        self._chunks.close()
+        self._buffer = []
+
+
+def load_engine(models_dir=MODELS_DIR, workers=1, mmap=True):
+    """Carga el pipeline (y el pool si workers > 1)"""
+    return ScoringEngine(models_dir, workers=workers, mmap=mmap)
+
+
+def write_predictions(df, path):
+    """Guarda predicciones con el esquema de model_predictions (formato según la extensión)"""
+    return write_frame(df, path, SCHEMAS['model_predictions'])
+
+
+def build_parser(description="Puntúa processed_encoded y guarda model_predictions"):
+    """Argumentos de línea de comandos comunes a los scripts de predicción"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--input", type=Path, default=None,
+                        help="Tabla de entrada (por defecto, processed_encoded más reciente)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Archivo de salida (por defecto, data/processed/model_predictions.<formato>)")
+    parser.add_argument("--chunk-size", type=int, default=0,
+                        help="Filas por bloque en modo streaming (0: toda la tabla en memoria)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos de puntuación (1: en este proceso)")
+    parser.add_argument("--format", choices=list(EXTENSIONS), default=None,
+                        help="Formato de salida si no se indica --output")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Puntuar solo las filas nuevas o modificadas desde la última corrida")
+    return parser
+
+
+def run(engine, args):
+    """Puntúa según los argumentos de build_parser. Retorna (ruta, filas, filas puntuadas)"""
+    if args.incremental:
+        return engine.score_incremental(args.input, args.output,
+                                        chunk_size=args.chunk_size, fmt=args.format)
+    output_path, rows = engine.score_file(args.input, args.output,
+                                          chunk_size=args.chunk_size, fmt=args.format)
+    return output_path, rows, rows
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with load_engine(workers=args.workers) as engine:
+        output_path, rows, scored = run(engine, args)
+    print(f"\n✅ Predicciones guardadas en: {output_path}")
+    print(f"📈 Total de predicciones: {rows:,} ({scored:,} puntuadas en esta corrida)")
+    return output_path
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Capa de almacenamiento de los artefactos de datos del pipeline
+Las etapas guardan sus tablas en formato columnar (Parquet o Feather) con un
+esquema explícito de tipos, así que al releerlas no hay que parsear texto y
+se conservan los tipos compactos de schema.py (fechas, booleanos, enteros
+chicos y categorías). Las lecturas pueden pedir solo algunas columnas. El CSV
+queda como exportación opcional y como respaldo de lectura para archivos
+antiguos.
+
+Formato de escritura: RL_STORAGE_FORMAT = parquet | feather | csv
+(parquet por defecto si pyarrow está instalado, csv si no).
+Exportar además a CSV: RL_CSV_EXPORT=1.
+"""
+
+import importlib.util
+import os
+from pathlib import Path
+
+import pandas as pd
+
+# Los esquemas viven en schema.py; se reexportan para los módulos que los toman de aquí
+from schema import (ENCODED_SCHEMA, FEATURE_SCHEMA, MATCH_SCHEMA, PREDICTION_SCHEMA, SCHEMAS,
+                    apply_schema)
+
+# Rutas
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROCESSED_DIR = BASE_DIR / "data" / "processed"
+
+# Extensión de cada formato, en orden de preferencia al buscar una tabla
+EXTENSIONS = {
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "csv": ".csv",
+}
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+STORAGE_FORMAT = os.getenv("RL_STORAGE_FORMAT", "parquet" if HAS_PYARROW else "csv").lower()
+CSV_EXPORT = os.getenv("RL_CSV_EXPORT", "0").lower() in ("1", "true", "yes")
+
+
+def check_format(fmt):
+    """Valida un nombre de formato y que su dependencia esté disponible"""
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"Formato de almacenamiento inválido: '{fmt}' (usar {', '.join(EXTENSIONS)})")
+    if fmt != "csv" and not HAS_PYARROW:
+        raise ImportError(f"El formato '{fmt}' requiere pyarrow (pip install pyarrow)")
+    return fmt
+
+
+def table_path(name, fmt=None, directory=PROCESSED_DIR):
+    """Ruta de la tabla en el formato indicado (por defecto, el configurado)"""
+    return Path(directory) / f"{name}{EXTENSIONS[fmt or STORAGE_FORMAT]}"
+
+
+def find_table(name, directory=PROCESSED_DIR):
+    """
+    Ruta de la versión más reciente de una tabla entre los formatos
+    disponibles, o None si no existe en ninguno.
+    """
+    candidates = [table_path(name, fmt, directory) for fmt in EXTENSIONS
+                  if fmt == "csv" or HAS_PYARROW]
+    existing = [path for path in candidates if path.exists()]
+    if not existing:
+        return None
+    # Si quedó un CSV exportado antes que el columnar, gana el que se escribió último
+    return max(existing, key=lambda path: path.stat().st_mtime_ns)
+
+
+def format_of(path):
+    """Formato de un archivo según su extensión"""
+    suffix = Path(path).suffix.lower()
+    for fmt, extension in EXTENSIONS.items():
+        if suffix == extension:
+            return fmt
+    raise ValueError(f"Extensión no reconocida: '{suffix}'")
+
+
+def write_frame(df, path, schema=None):
+    """Guarda un DataFrame en el formato que indica la extensión de path"""
+    path = Path(path)
+    fmt = check_format(format_of(path))
+    if schema is not None:
+        df = apply_schema(df, schema)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def read_frame(path, columns=None, schema=None):
+    """Lee un archivo de cualquier formato soportado, opcionalmente solo algunas columnas"""
+    path = Path(path)
+    fmt = check_format(format_of(path))
+    columns = list(columns) if columns is not None else None
+
+    if fmt == "parquet":
+        df = pd.read_parquet(path, columns=columns)
+    elif fmt == "feather":
+        df = pd.read_feather(path, columns=columns)
+    else:
+        df = pd.read_csv(path, usecols=columns)
+    # El CSV pierde los tipos (y las tablas antiguas pueden tener otros): se restauran desde el esquema
+    if schema is not None:
+        df = apply_schema(df, schema)
+    return df
+
+
+def iter_frame_chunks(path, chunksize, columns=None, schema=None):
+    """Recorre un archivo por bloques de hasta chunksize filas"""
+    path = Path(path)
+    fmt = check_format(format_of(path))
+    columns = list(columns) if columns is not None else None
+
+    if fmt == "csv":
+        for chunk in pd.read_csv(path, chunksize=chunksize, usecols=columns):
+            yield apply_schema(chunk, schema) if schema is not None else chunk
+        return
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns)
+    else:
+        import pyarrow.feather as feather
+        batches = feather.read_table(path, columns=columns, memory_map=True).to_batches(chunksize)
+    for batch in batches:
+        chunk = batch.to_pandas()
+        yield apply_schema(chunk, schema) if schema is not None else chunk
+
+
+class TableWriter:
+    """
+    Escritura incremental de una tabla por bloques: cada write() agrega filas
+    sin mantener las anteriores en memoria. Se escribe en un archivo temporal
+    que reemplaza al destino en close(), así los lectores nunca ven una tabla
+    a medias. Se usa como context manager.
+    """
+
+    def __init__(self, path, schema=None):
+        self.path = Path(path)
+        self.format = check_format(format_of(self.path))
+        self.schema = schema
+        self.rows = 0
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._writer = None
+        self._arrow_schema = None
+
+    def write(self, df):
+        """Agrega un bloque de filas"""
+        if self.schema is not None:
+            df = apply_schema(df, self.schema)
+
+        if self.format == "csv":
+            self._tmp_path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_csv(self._tmp_path, mode='w' if self.rows == 0 else 'a',
+                      header=self.rows == 0, index=False)
+        else:
+            import pyarrow as pa
+            if self.format == "feather":
+                # Un archivo Arrow admite un solo diccionario por columna: las
+                # categorías se guardan como texto y las restaura el esquema al leer
+                categorical = df.select_dtypes('category').columns
+                df = df.astype({column: df[column].cat.categories.dtype for column in categorical})
+            # Todos los bloques se escriben con el esquema Arrow del primero
+            table = pa.Table.from_pandas(df, schema=self._arrow_schema, preserve_index=False)
+            if self._writer is None:
+                self._arrow_schema = table.schema
+                self._tmp_path.parent.mkdir(parents=True, exist_ok=True)
+                if self.format == "parquet":
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self._tmp_path, table.schema)
+                else:
+                    self._writer = pa.ipc.new_file(str(self._tmp_path), table.schema)
+            self._writer.write_table(table)
+
+        self.rows += len(df)
+
+    def close(self):
+        """Cierra el archivo y lo mueve a su ruta final"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._tmp_path.exists():
+            self._tmp_path.replace(self.path)
+        return self.path
+
+    def abort(self):
+        """Descarta lo escrito hasta ahora"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_table(df, name, fmt=None, csv_export=None, directory=PROCESSED_DIR):
+    """
+    Guarda una tabla del pipeline con su esquema en el formato configurado y,
+    si se pide, también como CSV. Retorna la ruta principal.
+    """
+    fmt = check_format(fmt or STORAGE_FORMAT)
+    schema = SCHEMAS.get(name)
+
+    # El CSV se escribe primero para que la versión columnar quede como la más reciente
+    export = CSV_EXPORT if csv_export is None else csv_export
+    if export and fmt != "csv":
+        write_frame(df, table_path(name, "csv", directory), schema)
+    return write_frame(df, table_path(name, fmt, directory), schema)
+
+
+def read_table(name, columns=None, directory=PROCESSED_DIR):
+    """Lee la versión más reciente de una tabla del pipeline, con sus tipos"""
+    path = find_table(name, directory)
+    if path is None:
+        raise FileNotFoundError(f"No existe la tabla '{name}' en {directory}")
+    return read_frame(path, columns=columns, schema=SCHEMAS.get(name))
+
+
+def iter_table_chunks(name, chunksize, columns=None, directory=PROCESSED_DIR):
+    """Recorre la versión más reciente de una tabla del pipeline por bloques"""
+    path = find_table(name, directory)
+    if path is None:
+        raise FileNotFoundError(f"No existe la tabla '{name}' en {directory}")
+    return iter_frame_chunks(path, chunksize, columns=columns, schema=SCHEMAS.get(name))
+
+
+def count_rows(path):
+    """Número de filas de un archivo, leyendo solo metadatos cuando es posible"""
+    path = Path(path)
+    fmt = check_format(format_of(path))
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    if fmt == "feather":
+        import pyarrow as pa
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    if path.stat().st_size == 0:
+        return 0
+    if HAS_PYARROW:
+        # Lector de CSV por bloques: respeta saltos de línea dentro de campos entre comillas.
+        # Se convierte una sola columna, como texto, para no inferir tipos en cada bloque
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        first = pd.read_csv(path, nrows=0).columns[0]
+        convert = pacsv.ConvertOptions(include_columns=[first], column_types={first: pa.string()})
+        return sum(batch.num_rows for batch in pacsv.open_csv(path, convert_options=convert))
+    # Sin pyarrow: líneas del archivo menos el encabezado (la última puede no terminar en \n)
+    newlines, last = 0, b''
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            newlines += block.count(b'\n')
+            last = block[-1:]
+    return max(newlines + (last != b'\n') - 1, 0)
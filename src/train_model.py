@@ -1,74 +1,126 @@
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, f1_score, classification_report
+"""
+Entrenamiento del modelo final
+--backend elige el tipo de modelo (src/model_backends.py, random_forest por
+defecto). Con --tune (solo random_forest) busca antes los hiperparámetros
+(src/tuning.py) y entrena con los elegidos; si no, usa los parámetros por
+defecto del backend.
+
+Uso:
+    python src/train_model.py [--backend random_forest|hist_gradient_boosting]
+                              [--tune] [--budget 40] [--jobs -1] [--f1-tolerance 0.005]
+                              [--tree-cost 0.00005]
+"""
+
+import argparse
+
 import joblib
 
+from artifacts import FLAT_FOREST_PATH, file_sha256, load_artifact, save_artifact
+from flat_forest import FlatForest
+from model_backends import BACKENDS, DEFAULT_BACKEND, METADATA_PATH, evaluate, get_backend
+from model_pipeline import ENCODER_PATH, PIPELINE_PATH, MatchPipeline, save_pipeline
+from storage import read_table
+from tuning import (DEFAULT_BUDGET, F1_TOLERANCE, TREE_COST, TUNING_RESULTS_PATH,
+                    split_train_test, tune)
+
+parser = argparse.ArgumentParser(description="Entrena el modelo final")
+parser.add_argument("--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND,
+                    help="Tipo de modelo a entrenar")
+parser.add_argument("--tune", action="store_true",
+                    help="Buscar hiperparámetros (successive halving) antes de entrenar")
+parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                    help="Combinaciones sorteadas en la búsqueda")
+parser.add_argument("--jobs", type=int, default=-1,
+                    help="Procesos para los folds de la búsqueda (-1: todos los núcleos)")
+parser.add_argument("--f1-tolerance", type=float, default=F1_TOLERANCE,
+                    help="Pérdida de F1 aceptada a cambio de un modelo más rápido")
+parser.add_argument("--tree-cost", type=float, default=TREE_COST,
+                    help="F1 descontado por árbol al eliminar combinaciones en la búsqueda")
+args = parser.parse_args()
+backend = get_backend(args.backend)
+if args.tune and backend.name != "random_forest":
+    parser.error("--tune solo está disponible para el backend random_forest")
+
 # === Cargar dataset final ===
-df = pd.read_csv('data/processed/processed_encoded.csv')
-
-# === Selección de features ===
-features = [
-    'team_color_encoded',
-    'goal_difference',
-    'match_duration',
-    'mode_Duel',
-    'mode_Doubles',
-    'mode_Standard',
-    'is_competitive',
-    'overtime'
-]
-
-# Filtrar por si alguna columna no existe
-features = [f for f in features if f in df.columns]
+df = read_table('processed_encoded')
+
+# === Selección de features (el orden lo fija la codificación de encode_and_pipeline.py) ===
+encoder = load_artifact(ENCODER_PATH, mmap=False)
+features = encoder.feature_names
 
 X = df[features]
 y = df['winner_encoded']
 
 # === Train / Test split ===
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y,
-    test_size=0.2,
-    random_state=42,
-    stratify=y
-)
+X_train, X_test, y_train, y_test = split_train_test(X, y)
+
+# === Hiperparámetros (la búsqueda usa solo el conjunto de entrenamiento) ===
+params = dict(backend.params)
+tuning = None
+if args.tune:
+    print("=== BÚSQUEDA DE HIPERPARÁMETROS ===")
+    tuned, table = tune(X_train, y_train, budget=args.budget, n_jobs=args.jobs,
+                        tolerance=args.f1_tolerance, tree_cost=args.tree_cost)
+    params.update(tuned)
+    selected = table[table['selected']].iloc[0]
+    tuning = {
+        'budget': args.budget,
+        'f1_tolerance': args.f1_tolerance,
+        'tree_cost': args.tree_cost,
+        'f1_cv': float(selected['f1_cv']),
+        'latency_ms': float(selected['latency_ms']),
+        'results_path': TUNING_RESULTS_PATH.name
+    }
+    print(f"Tabla de resultados guardada en data/models/{TUNING_RESULTS_PATH.name}\n")
 
 # === Crear modelo ===
-model = RandomForestClassifier(
-    n_estimators=200,
-    max_depth=15,
-    min_samples_split=10,
-    min_samples_leaf=4,
-    class_weight='balanced',
-    random_state=42,
-    n_jobs=-1
-)
+model = backend.build(params, n_jobs=-1)
 
 # Entrenar
 model.fit(X_train, y_train)
 
-# === Evaluar ===
-y_pred = model.predict(X_test)
-
-accuracy = accuracy_score(y_test, y_pred)
-f1 = f1_score(y_test, y_pred, average='macro')
+# === Evaluar (mismas métricas para todos los backends) ===
+metrics = evaluate(model, X_test, y_test)
 
-print("=== MÉTRICAS DEL MODELO ===")
-print(f"Accuracy: {accuracy:.4f}")
-print(f"F1 Macro: {f1:.4f}")
+print(f"=== MÉTRICAS DEL MODELO ({backend.name}) ===")
+print(f"Accuracy: {metrics['accuracy']:.4f}")
+print(f"F1 Macro: {metrics['f1_macro']:.4f}")
 print("\n=== Classification Report ===")
-print(classification_report(y_test, y_pred))
+print(metrics['report'])
 
 # === Guardar modelo ===
-joblib.dump(model, 'data/models/random_forest_model.pkl')
+# Sin compresión: compatible con joblib.load(..., mmap_mode='r')
+model_path = save_artifact(model, backend.model_path())
+model_sha256 = file_sha256(model_path)
+
+# === Guardar bosque compilado (arrays planos, se abre con memory-map en la API) ===
+if backend.is_forest:
+    flat_forest = FlatForest.from_sklearn(model, model_sha256=model_sha256)
+    save_artifact(flat_forest, FLAT_FOREST_PATH)
 
 # === Guardar metadata ===
 metadata = {
+    'backend': backend.name,
+    'model_file': backend.model_file,
     'features_used': features,
-    'accuracy': float(accuracy),
-    'f1_macro': float(f1)
+    'accuracy': metrics['accuracy'],
+    'f1_macro': metrics['f1_macro'],
+    'params': params,
+    'tuning': tuning
 }
-joblib.dump(metadata, 'data/models/model_metadata.pkl')
+joblib.dump(metadata, METADATA_PATH)
+
+# === Guardar pipeline completo (codificación + modelo), al final: la API recarga al verlo cambiar ===
+pipeline = MatchPipeline(encoder, model, model_sha256, {
+    'backend': backend.name,
+    'model_file': backend.model_file,
+    'accuracy': metrics['accuracy'],
+    'f1_macro': metrics['f1_macro']
+})
+save_pipeline(pipeline)
 
-print("\nModelo guardado en data/models/random_forest_model.pkl")
+print(f"\nModelo guardado en data/models/{backend.model_file}")
+if backend.is_forest:
+    print("Bosque compilado guardado en data/models/flat_forest.pkl")
 print("Metadata guardada en data/models/model_metadata.pkl")
+print(f"Pipeline guardado en data/models/{PIPELINE_PATH.name} (versión {pipeline.version[:12]})")
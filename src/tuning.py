@@ -0,0 +1,190 @@
+"""
+Búsqueda de hiperparámetros del bosque con presupuesto (successive halving)
+Se sortean n_candidates combinaciones de n_estimators, max_depth,
+min_samples_leaf y max_features; todas arrancan con pocas filas y solo el
+tercio mejor pasa a la ronda siguiente con el triple de datos, así las
+combinaciones malas se descartan temprano. Los folds y candidatos de cada
+ronda corren en paralelo (n_jobs).
+
+El puntaje de cada ronda es el F1 macro en validación cruzada menos tree_cost
+por árbol: la latencia de predict_proba para una fila crece con la cantidad
+de árboles, así que un bosque grande solo sobrevive si gana F1 suficiente
+para pagar su latencia. Entre las finalistas se mide la latencia real y se
+elige la más rápida cuyo F1 quede a menos de f1_tolerance del mejor.
+
+Uso (desde train_model.py):
+    python src/train_model.py --tune [--budget 40] [--jobs -1] [--f1-tolerance 0.005]
+                                     [--tree-cost 0.00005]
+"""
+
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import f1_score
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingRandomSearchCV, StratifiedKFold, train_test_split
+
+from artifacts import MODELS_DIR
+from model_backends import RANDOM_FOREST_PARAMS
+from model_pipeline import model_matrix
+
+# Ruta de la tabla de resultados (junto a model_metadata.pkl)
+TUNING_RESULTS_PATH = MODELS_DIR / "tuning_results.csv"
+
+# Parámetros del bosque por defecto (entrenamiento sin --tune)
+DEFAULT_PARAMS = RANDOM_FOREST_PARAMS
+
+# Espacio de búsqueda (el resto de los parámetros queda como en DEFAULT_PARAMS)
+SEARCH_SPACE = {
+    'n_estimators': [10, 25, 50, 100, 200],
+    'max_depth': [4, 6, 8, 10, 15, None],
+    'min_samples_leaf': [1, 2, 4, 8],
+    'max_features': ['sqrt', 0.5, None],
+}
+
+# Fracción de prueba y semilla de la partición train/test de train_model.py
+TEST_SIZE = 0.2
+SPLIT_SEED = 42
+
+# Combinaciones sorteadas, folds, factor de eliminación y tolerancia de F1
+DEFAULT_BUDGET = 40
+CV_FOLDS = 5
+HALVING_FACTOR = 3
+F1_TOLERANCE = 0.005
+
+# F1 macro que se descuenta por árbol al eliminar combinaciones (200 árboles: 0.01)
+TREE_COST = 0.00005
+
+# Llamadas a predict_proba por finalista al medir la latencia de una fila
+LATENCY_REPEATS = 200
+
+
+def split_train_test(X, y):
+    """Partición estratificada train/test del entrenamiento (la misma en cada corrida)"""
+    return train_test_split(X, y, test_size=TEST_SIZE, random_state=SPLIT_SEED, stratify=y)
+
+
+def single_row_latency_ms(model, X, repeats=LATENCY_REPEATS):
+    """
+    Mediana en ms de predict_proba sobre una fila float32, como llega una
+    petición a /predict (un hilo: con n_jobs > 1 domina el reparto de tareas)
+    """
+    row = model_matrix(model, np.asarray(X, dtype=np.float32)[:1])
+    n_jobs = getattr(model, 'n_jobs', None)
+    if n_jobs is not None:
+        model.n_jobs = 1
+    times = []
+    try:
+        model.predict_proba(row)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model.predict_proba(row)
+            times.append(time.perf_counter() - start)
+    finally:
+        if n_jobs is not None:
+            model.n_jobs = n_jobs
+    return float(np.median(times) * 1000)
+
+
+def latency_aware_f1(estimator, X, y, tree_cost=TREE_COST):
+    """F1 macro menos tree_cost por árbol (scorer de la búsqueda)"""
+    f1 = f1_score(y, estimator.predict(X), average='macro')
+    return f1 - tree_cost * len(estimator.estimators_)
+
+
+def halving_search(X, y, budget=DEFAULT_BUDGET, n_jobs=-1, tree_cost=TREE_COST, random_state=42):
+    """Successive halving sobre SEARCH_SPACE con el F1 macro penalizado por árbol"""
+    base = {**DEFAULT_PARAMS, 'n_jobs': 1}  # el paralelismo lo dan los folds
+    search = HalvingRandomSearchCV(
+        RandomForestClassifier(**base),
+        SEARCH_SPACE,
+        n_candidates=budget,
+        factor=HALVING_FACTOR,
+        resource='n_samples',
+        cv=StratifiedKFold(CV_FOLDS, shuffle=True, random_state=random_state),
+        scoring=partial(latency_aware_f1, tree_cost=tree_cost),
+        refit=False,
+        n_jobs=n_jobs,
+        random_state=random_state,
+    )
+    search.fit(X, y)
+    return search
+
+
+def results_table(search, tree_cost=TREE_COST):
+    """
+    Una fila por (combinación, ronda) con el puntaje de la búsqueda (score_cv)
+    y el F1 en validación cruzada sin el descuento por árbol (f1_cv)
+    """
+    results = search.cv_results_
+    table = pd.DataFrame(list(results['params']))
+    table['max_depth'] = table['max_depth'].astype('Int64')  # None -> <NA>
+    table['iter'] = results['iter']
+    table['n_resources'] = results['n_resources']
+    table['score_cv'] = results['mean_test_score']
+    table['f1_cv'] = table['score_cv'] + tree_cost * table['n_estimators']
+    table['f1_cv_std'] = results['std_test_score']
+    table['fit_seconds'] = results['mean_fit_time']
+    return table
+
+
+def row_params(table, i):
+    """Parámetros de búsqueda de una fila de la tabla, con tipos de Python (enteros, 'sqrt', None)"""
+    params = {}
+    for name in SEARCH_SPACE:
+        value = table.at[i, name]
+        if isinstance(value, str):
+            params[name] = value
+        elif value is None or pd.isna(value):
+            params[name] = None
+        elif float(value).is_integer() and name != 'max_features':
+            params[name] = int(value)
+        else:
+            params[name] = float(value)
+    return params
+
+
+def select_model(table, tolerance=F1_TOLERANCE):
+    """Índice de la finalista más rápida con F1 a menos de tolerance del mejor"""
+    finalists = table[table['latency_ms'].notna()]
+    eligible = finalists[finalists['f1_cv'] >= finalists['f1_cv'].max() - tolerance]
+    return eligible.sort_values(['latency_ms', 'f1_cv'], ascending=[True, False]).index[0]
+
+
+def tune(X, y, budget=DEFAULT_BUDGET, n_jobs=-1, tolerance=F1_TOLERANCE, tree_cost=TREE_COST,
+         results_path=TUNING_RESULTS_PATH, verbose=True):
+    """
+    Busca los hiperparámetros, mide la latencia de las finalistas y guarda la
+    tabla de resultados. Retorna (parámetros elegidos, tabla).
+    """
+    start = time.perf_counter()
+    search = halving_search(X, y, budget=budget, n_jobs=n_jobs, tree_cost=tree_cost)
+    table = results_table(search, tree_cost)
+    if verbose:
+        rounds = table['iter'].max() + 1
+        print(f"🔎 {budget} combinaciones, {rounds} rondas de successive halving "
+              f"en {time.perf_counter() - start:.1f}s")
+
+    # Finalistas: las que llegaron a la última ronda (con todos los datos)
+    table['latency_ms'] = np.nan
+    for i in table.index[table['iter'] == table['iter'].max()]:
+        params = {**DEFAULT_PARAMS, **row_params(table, i), 'n_jobs': 1}
+        model = RandomForestClassifier(**params).fit(X, y)
+        table.at[i, 'latency_ms'] = single_row_latency_ms(model, X)
+
+    best = select_model(table, tolerance)
+    table['selected'] = table.index == best
+    params = row_params(table, best)
+
+    if results_path is not None:
+        table.sort_values(['iter', 'score_cv'], ascending=False).to_csv(results_path, index=False)
+    if verbose:
+        finalists = table[table['latency_ms'].notna()].sort_values('f1_cv', ascending=False)
+        columns = list(SEARCH_SPACE) + ['score_cv', 'f1_cv', 'latency_ms', 'selected']
+        print(finalists[columns].to_string(index=False))
+        print(f"✓ Elegido: {params}")
+    return params, table
+
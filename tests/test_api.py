@@ -4,6 +4,8 @@ Cubre endpoints, validaciones y manejo de errores
 """
 
 import pytest
+import pandas as pd
+import numpy as np
 from fastapi.testclient import TestClient
 import sys
 import os
@@ -12,7 +14,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
 
 # Importar después de ajustar el path
-from main import app, normalize_team_color, normalize_winner, MatchInput
+from main import app, normalize_team_color, normalize_winner, MatchInput, prepare_features
 
 
 client = TestClient(app)
@@ -84,6 +86,12 @@ class TestRootEndpoint:
         assert 'message' in data
         assert 'status' in data
     
+    def test_root_reports_pipeline_version(self):
+        """Verifica que informe la versión del pipeline cargado"""
+        import main
+        data = client.get("/").json()
+        assert data['pipeline_version'] == main.pipeline.version
+    
     def test_root_contains_endpoints_info(self):
         """Verifica que contenga información de endpoints"""
         response = client.get("/")
@@ -238,6 +246,623 @@ class TestPredictEndpoint:
         assert response.status_code == 422
 
 
+class TestPredictBatchEndpoint:
+    """Tests para el endpoint de predicción por lotes"""
+    
+    @pytest.fixture
+    def batch_data(self):
+        """Lote de partidas válidas con distintos modos y colores"""
+        return {
+            "matches": [
+                {"team_color": "Blue", "game_mode": "Duel", "goal_difference": 2,
+                 "match_duration": 320, "overtime": False},
+                {"team_color": "naranja", "game_mode": "Doubles", "goal_difference": -1,
+                 "match_duration": 350, "overtime": True, "is_competitive": 1},
+                {"team_color": "orange", "game_mode": "Standard", "goal_difference": 4,
+                 "match_duration": 410, "overtime": False, "is_competitive": 0}
+            ]
+        }
+    
+    def test_predict_batch_returns_200(self, batch_data):
+        """Verifica que el endpoint batch retorne 200"""
+        response = client.post("/predict_batch", json=batch_data)
+        assert response.status_code == 200
+    
+    def test_predict_batch_returns_one_prediction_per_match(self, batch_data):
+        """Verifica que retorne una predicción por partida, en orden"""
+        response = client.post("/predict_batch", json=batch_data)
+        data = response.json()
+        
+        assert data['total_matches'] == 3
+        assert len(data['predictions']) == 3
+        for match, prediction in zip(batch_data['matches'], data['predictions']):
+            assert prediction['input_data']['team_color'] == match['team_color']
+            assert prediction['input_data']['game_mode'] == match['game_mode']
+    
+    def test_predict_batch_matches_single_predict(self, batch_data):
+        """Verifica que cada resultado coincida con el de /predict"""
+        response = client.post("/predict_batch", json=batch_data)
+        batch_predictions = response.json()['predictions']
+        
+        for match, batch_prediction in zip(batch_data['matches'], batch_predictions):
+            single = client.post("/predict", json=match).json()
+            assert batch_prediction['winner_prediction'] == single['winner_prediction']
+            assert batch_prediction['confidence'] == pytest.approx(single['confidence'])
+            for winner, prob in single['probabilities'].items():
+                assert batch_prediction['probabilities'][winner] == pytest.approx(prob)
+    
+    def test_predict_batch_empty_list(self):
+        """Verifica que un lote vacío retorne una lista vacía"""
+        response = client.post("/predict_batch", json={"matches": []})
+        assert response.status_code == 200
+        assert response.json()['predictions'] == []
+    
+    def test_predict_batch_invalid_match(self, batch_data):
+        """Verifica error de validación si una partida es inválida"""
+        batch_data['matches'][1]['goal_difference'] = "dos"
+        response = client.post("/predict_batch", json=batch_data)
+        assert response.status_code == 422
+
+
+class TestGenerateSyntheticEndpoint:
+    """Tests para la generación vectorizada de partidas sintéticas"""
+    
+    def test_generate_synthetic_returns_summary(self):
+        """Verifica que retorne el resumen con el total pedido"""
+        response = client.post("/generate_synthetic", json={"n_matches": 50, "seed": 7})
+        assert response.status_code == 200
+        
+        summary = response.json()['summary']
+        assert summary['total_matches'] == 50
+        assert sum(summary['predictions'].values()) == 50
+        assert 0 <= summary['avg_confidence'] <= 1
+    
+    def test_generate_synthetic_respects_game_mode(self):
+        """Verifica que el filtro de modo se aplique a todas las partidas"""
+        response = client.post("/generate_synthetic",
+                               json={"n_matches": 30, "game_mode": "Duel", "seed": 3})
+        data = response.json()
+        
+        df = pd.read_csv(data['file_path'])
+        assert len(df) == 30
+        assert (df['game_mode'] == 'Duel').all()
+    
+    def test_generate_synthetic_value_ranges(self):
+        """Verifica los rangos de las columnas generadas"""
+        response = client.post("/generate_synthetic", json={"n_matches": 200, "seed": 11})
+        df = pd.read_csv(response.json()['file_path'])
+        
+        assert df['goal_difference'].between(-10, 10).all()
+        assert df['match_duration'].between(180, 720).all()
+        assert (df.loc[~df['overtime'], 'match_duration'] <= 600).all()
+        assert set(df['predicted_winner']).issubset({'blue', 'orange', 'draw'})
+    
+    def test_generate_synthetic_seed_is_reproducible(self):
+        """Verifica que la misma semilla produzca el mismo resultado"""
+        payload = {"n_matches": 40, "seed": 123}
+        first = client.post("/generate_synthetic", json=payload).json()['summary']
+        second = client.post("/generate_synthetic", json=payload).json()['summary']
+        
+        assert first == second
+
+
+class TestPrepareFeatures:
+    """Tests para el layout precompilado de features"""
+    
+    def _row_as_dict(self, match):
+        from main import FEATURE_LAYOUT
+        row = prepare_features(match)
+        return dict(zip(FEATURE_LAYOUT.feature_names, row[0].tolist()))
+    
+    def test_prepare_features_returns_float32_row(self):
+        """Verifica que retorne una fila float32 con todas las features"""
+        from main import FEATURE_LAYOUT
+        match = MatchInput(team_color="Blue", game_mode="Duel", goal_difference=2,
+                           match_duration=320, overtime=False)
+        row = prepare_features(match)
+        
+        assert row.shape == (1, FEATURE_LAYOUT.n_features)
+        assert row.dtype.name == 'float32'
+    
+    def test_prepare_features_values(self):
+        """Verifica que cada valor quede en la columna correcta"""
+        match = MatchInput(team_color="naranja", game_mode="standard", goal_difference=-3,
+                           match_duration=410, overtime=True, is_competitive=1)
+        values = self._row_as_dict(match)
+        
+        assert values['goal_difference'] == -3
+        assert values['match_duration'] == 410
+        assert values['overtime'] == 1
+        assert values['is_competitive'] == 1
+        assert values['mode_Standard'] == 1
+        assert values['mode_Duel'] == 0
+        assert values['mode_Doubles'] == 0
+    
+    def test_missing_is_competitive_is_derived(self):
+        """Verifica que sin is_competitive se use el mismo criterio del entrenamiento"""
+        close = MatchInput(team_color="Blue", game_mode="Duel", goal_difference=-2,
+                           match_duration=300, overtime=False)
+        wide = MatchInput(team_color="Blue", game_mode="Duel", goal_difference=4,
+                          match_duration=300, overtime=False)
+        
+        assert self._row_as_dict(close)['is_competitive'] == 1
+        assert self._row_as_dict(wide)['is_competitive'] == 0
+        
+        response = client.post("/predict", json=close.model_dump(exclude={'is_competitive'}))
+        assert response.json()['input_data']['is_competitive'] == 1
+    
+    def test_prepare_features_reuses_row_without_leaking_modes(self):
+        """Verifica que la fila reutilizada no arrastre el modo anterior"""
+        first = MatchInput(team_color="Blue", game_mode="Duel", goal_difference=0,
+                           match_duration=300, overtime=False)
+        second = MatchInput(team_color="Blue", game_mode="Doubles", goal_difference=0,
+                            match_duration=300, overtime=False)
+        self._row_as_dict(first)
+        values = self._row_as_dict(second)
+        
+        assert values['mode_Duel'] == 0
+        assert values['mode_Doubles'] == 1
+    
+    def test_predict_unknown_team_color_returns_error(self):
+        """Verifica que un color desconocido retorne error"""
+        data = {
+            "team_color": "Green",
+            "game_mode": "Duel",
+            "goal_difference": 1,
+            "match_duration": 300,
+            "overtime": False
+        }
+        response = client.post("/predict", json=data)
+        assert response.status_code == 500
+        assert 'Green' in response.json()['detail']
+
+
+class TestPredictionCache:
+    """Tests para el caché LRU de predicciones"""
+    
+    @pytest.fixture
+    def match_data(self):
+        """Partida usada para consultas repetidas"""
+        return {
+            "team_color": "Orange",
+            "game_mode": "Standard",
+            "goal_difference": -2,
+            "match_duration": 333,
+            "overtime": True,
+            "is_competitive": 1
+        }
+    
+    @pytest.fixture(autouse=True)
+    def without_lookup_table(self, monkeypatch):
+        """El caché solo interviene cuando no responde la tabla precalculada"""
+        import main
+        monkeypatch.setattr(main, 'lookup_table', None)
+    
+    def _cache_metrics(self):
+        return client.get("/metrics").json()['prediction_cache']
+    
+    def test_metrics_returns_cache_info(self):
+        """Verifica que /metrics exponga los contadores del caché"""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        
+        cache = response.json()['prediction_cache']
+        for key in ['hits', 'misses', 'hit_rate', 'size', 'max_size', 'invalidations']:
+            assert key in cache
+    
+    def test_repeated_predict_hits_cache(self, match_data):
+        """Verifica que una consulta repetida sea un acierto de caché"""
+        first = client.post("/predict", json=match_data).json()
+        before = self._cache_metrics()
+        second = client.post("/predict", json=match_data).json()
+        after = self._cache_metrics()
+        
+        assert after['hits'] == before['hits'] + 1
+        assert after['misses'] == before['misses']
+        assert first == second
+    
+    def test_equivalent_inputs_share_cache_entry(self, match_data):
+        """Verifica que entradas equivalentes tras normalizar compartan entrada"""
+        client.post("/predict", json=match_data)
+        before = self._cache_metrics()
+        
+        variant = dict(match_data, team_color="naranja", game_mode="STANDARD")
+        response = client.post("/predict", json=variant)
+        after = self._cache_metrics()
+        
+        assert response.status_code == 200
+        assert response.json()['input_data']['team_color'] == "naranja"
+        assert after['hits'] == before['hits'] + 1
+    
+    def test_model_predictions_do_not_warn(self, match_data):
+        """Verifica que el modelo reciba las features con nombres de columna (sin UserWarning)"""
+        import warnings
+        import main
+        main.cached_probabilities.cache_clear()
+        batch = {"matches": [match_data, dict(match_data, goal_difference=3)]}
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", UserWarning)
+            assert client.post("/predict", json=match_data).status_code == 200
+            assert client.post("/predict_batch", json=batch).status_code == 200
+    
+    def test_model_file_change_invalidates_cache(self, match_data, monkeypatch):
+        """Verifica que un cambio en el archivo del modelo vacíe el caché"""
+        import main
+        client.post("/predict", json=match_data)
+        before = self._cache_metrics()
+        
+        # Simular un archivo de modelo distinto en disco
+        monkeypatch.setattr(main, 'model_file_stamp', lambda: (0, 0))
+        response = client.post("/predict", json=match_data)
+        after = self._cache_metrics()
+        
+        assert response.status_code == 200
+        assert after['invalidations'] == before['invalidations'] + 1
+        assert after['hits'] == 0
+        
+        # Volver al modelo real para no afectar a otros tests
+        monkeypatch.undo()
+        main.ensure_artifacts()
+    
+    def test_reload_check_only_stats_the_watched_file(self, match_data, monkeypatch):
+        """Verifica que cada petición mire solo el archivo resuelto al cargar (sin leer metadata)"""
+        import main
+        client.post("/predict", json=match_data)
+        
+        def unexpected(*args):
+            raise AssertionError("model_metadata.pkl leído en una petición")
+        monkeypatch.setattr(main, 'trained_backend', unexpected)
+        monkeypatch.setattr(main, 'PIPELINE_PATH', main.PIPELINE_PATH.with_name('no_existe.pkl'))
+        
+        assert client.post("/predict", json=match_data).status_code == 200
+        assert main.model_file_stamp() == main.loaded_model_stamp
+
+
+class TestLookupTableMode:
+    """Tests para el modo de respuesta desde la tabla precalculada"""
+    
+    @pytest.fixture
+    def small_lookup_table(self, tmp_path, monkeypatch):
+        """Tabla reducida construida con el modelo cargado y activada en la API"""
+        import main
+        from lookup_table import build_lookup_table
+        main.ensure_artifacts()
+        table = build_lookup_table(
+            main.model, main.team_encoder.classes_,
+            table_path=tmp_path / 'lookup_table.npy',
+            meta_path=tmp_path / 'lookup_table_meta.pkl',
+            goal_range=(-3, 3), duration_range=(300, 330),
+            model_path=main.MODEL_PATH
+        )
+        monkeypatch.setattr(main, 'lookup_table', table)
+        return table
+    
+    def _match(self, **overrides):
+        data = {
+            "team_color": "Blue",
+            "game_mode": "Doubles",
+            "goal_difference": 1,
+            "match_duration": 315,
+            "overtime": False,
+            "is_competitive": 1
+        }
+        data.update(overrides)
+        return data
+    
+    def test_in_range_input_is_answered_from_table(self, small_lookup_table):
+        """Verifica que una entrada en rango se responda desde la tabla"""
+        before = client.get("/metrics").json()['lookup_table']
+        response = client.post("/predict", json=self._match())
+        after = client.get("/metrics").json()['lookup_table']
+        
+        assert response.status_code == 200
+        assert after['enabled'] is True
+        assert after['hits'] == before['hits'] + 1
+    
+    def test_out_of_range_input_falls_back_to_model(self, small_lookup_table):
+        """Verifica que una entrada fuera de rango use el modelo"""
+        before = client.get("/metrics").json()['lookup_table']
+        response = client.post("/predict", json=self._match(match_duration=600))
+        after = client.get("/metrics").json()['lookup_table']
+        
+        assert response.status_code == 200
+        assert after['fallbacks'] == before['fallbacks'] + 1
+    
+    def test_table_and_model_agree(self, small_lookup_table, monkeypatch):
+        """Verifica que la tabla y el modelo den las mismas probabilidades"""
+        import main
+        match = self._match(team_color="orange", game_mode="Duel", goal_difference=-2)
+        from_table = client.post("/predict", json=match).json()
+        
+        monkeypatch.setattr(main, 'lookup_table', None)
+        from_model = client.post("/predict", json=match).json()
+        
+        assert from_table['winner_prediction'] == from_model['winner_prediction']
+        for winner, prob in from_model['probabilities'].items():
+            assert from_table['probabilities'][winner] == pytest.approx(prob)
+
+
+class TestReadinessEndpoint:
+    """Tests para la carga diferida de modelos y el endpoint de readiness"""
+    
+    def test_ready_after_first_request(self):
+        """Verifica que /ready indique modelos cargados tras usarlos"""
+        client.get("/")
+        response = client.get("/ready")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data['ready'] is True
+        assert data['load_seconds'] >= 0
+        assert data['model_backend'] == 'random_forest'
+    
+    def test_flat_backend_falls_back_for_non_forest_models(self):
+        """Verifica que el backend 'flat' use predict_proba si el modelo no es un bosque"""
+        import main
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        model = HistGradientBoostingClassifier(max_iter=5).fit([[0], [1], [0], [1]], [0, 1, 0, 1])
+        
+        assert main.load_flat_forest(model, 'sha') is None
+    
+    def test_ready_returns_503_before_loading(self, monkeypatch):
+        """Verifica que /ready responda 503 mientras no hay modelos cargados"""
+        import main
+        monkeypatch.setattr(main, 'loaded_model_stamp', None)
+        
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()['ready'] is False
+    
+    def test_startup_hook_loads_models(self):
+        """Verifica que el arranque de la app deje los modelos listos"""
+        import time
+        with TestClient(app) as startup_client:
+            for _ in range(100):
+                if startup_client.get("/ready").status_code == 200:
+                    break
+                time.sleep(0.05)
+            assert startup_client.get("/ready").status_code == 200
+
+
+class TestBoundedExecutors:
+    """Tests para los ejecutores acotados del trabajo bloqueante"""
+    
+    def test_metrics_exposes_executor_queues(self):
+        """Verifica que /metrics informe profundidad de cola por ejecutor"""
+        client.post("/predict", json={
+            "team_color": "Blue", "game_mode": "Duel", "goal_difference": 1,
+            "match_duration": 300, "overtime": False
+        })
+        executors = client.get("/metrics").json()['executors']
+        
+        assert set(executors) == {'inference', 'io'}
+        for stats in executors.values():
+            assert stats['queue_depth'] >= 0
+            assert stats['max_workers'] >= 1
+        assert executors['inference']['completed'] >= 1
+    
+    def test_executor_bounds_concurrency(self):
+        """Verifica que el ejecutor no supere su máximo de tareas simultáneas"""
+        import asyncio
+        import threading
+        import time
+        import main
+        
+        executor = main.BoundedExecutor("test", 2)
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def work():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+        
+        async def run_all():
+            await asyncio.gather(*(executor.run(work) for _ in range(6)))
+        
+        asyncio.run(run_all())
+        stats = executor.stats()
+        
+        assert max(peak) <= 2
+        assert stats['completed'] == 6
+        assert stats['queue_depth'] == 0
+        assert stats['max_queue_depth'] >= 4
+    
+    def test_synthetic_runs_on_io_executor(self):
+        """Verifica que /generate_synthetic se ejecute en el ejecutor de I/O"""
+        import main
+        before = main.io_executor.stats()['completed']
+        response = client.post("/generate_synthetic", json={"n_matches": 20, "seed": 3})
+        
+        assert response.status_code == 200
+        assert main.io_executor.stats()['completed'] == before + 1
+    
+    def test_root_loads_artifacts_on_io_executor(self):
+        """Verifica que / cargue los artefactos en el ejecutor de I/O y no en el event loop"""
+        import main
+        before = main.io_executor.stats()['completed']
+        response = client.get("/")
+        
+        assert response.status_code == 200
+        assert main.io_executor.stats()['completed'] == before + 1
+
+
+class TestMicroBatching:
+    """Tests para el micro-batching de peticiones concurrentes de /predict"""
+    
+    @pytest.fixture
+    def batcher(self, monkeypatch):
+        import main
+        main.ensure_artifacts()
+        monkeypatch.setattr(main, 'lookup_table', None)
+        batcher = main.MicroBatcher(main.predict_coalesced, main.inference_executor,
+                                    max_size=8, max_wait_ms=20)
+        monkeypatch.setattr(main, 'predict_batcher', batcher)
+        return batcher
+    
+    @staticmethod
+    def _matches(n):
+        return [
+            {"team_color": ["Blue", "Orange"][i % 2], "game_mode": "Doubles",
+             "goal_difference": i % 7 - 3, "match_duration": 250 + i, "overtime": i % 3 == 0}
+            for i in range(n)
+        ]
+    
+    def test_response_schema_unchanged(self, batcher, monkeypatch):
+        """Verifica que /predict responda igual con y sin micro-batching"""
+        import main
+        match = self._matches(1)[0]
+        batched = client.post("/predict", json=match)
+        monkeypatch.setattr(main, 'predict_batcher', None)
+        direct = client.post("/predict", json=match)
+        
+        assert batched.status_code == 200
+        assert batched.json().keys() == direct.json().keys()
+        assert batched.json()['winner_prediction'] == direct.json()['winner_prediction']
+        assert batched.json()['probabilities'] == pytest.approx(direct.json()['probabilities'])
+    
+    def test_concurrent_requests_are_coalesced(self, batcher):
+        """Verifica que peticiones concurrentes se puntúen en lotes"""
+        import asyncio
+        import main
+        matches = [main.MatchInput(**m) for m in self._matches(20)]
+        
+        async def run_all():
+            return await asyncio.gather(*(main.predict_winner(m) for m in matches))
+        
+        results = asyncio.run(run_all())
+        stats = client.get("/metrics").json()['microbatch']
+        
+        assert [r['input_data']['match_duration'] for r in results] == [m.match_duration for m in matches]
+        assert stats['requests'] == 20
+        assert stats['batches'] < 20
+        assert sum(stats['batch_size_histogram'].values()) == stats['batches']
+        assert set(stats['batch_size_histogram']) == {'1', '2', '4', '8'}
+    
+    def test_invalid_input_only_fails_its_request(self, batcher):
+        """Verifica que una entrada inválida no haga fallar al resto del lote"""
+        import asyncio
+        import main
+        from fastapi import HTTPException
+        matches = self._matches(3)
+        matches[1]['team_color'] = 'Verde'
+        
+        async def run_all():
+            return await asyncio.gather(
+                *(main.predict_winner(main.MatchInput(**m)) for m in matches),
+                return_exceptions=True
+            )
+        
+        results = asyncio.run(run_all())
+        
+        assert isinstance(results[1], HTTPException)
+        assert results[1].status_code == 500
+        assert results[0]['winner_prediction'] in ['Blue', 'Orange', 'Draw']
+        assert results[2]['winner_prediction'] in ['Blue', 'Orange', 'Draw']
+        assert batcher.fallbacks == 1
+    
+    def test_batches_only_score_cache_misses(self, batcher, monkeypatch):
+        """Verifica que el lote consulte el caché y mande al modelo solo las partidas faltantes"""
+        import asyncio
+        import main
+        main.cached_probabilities.cache_clear()
+        matches = [main.MatchInput(**m) for m in self._matches(4)]
+        scored_rows = []
+        predict_proba = main.predict_proba
+        monkeypatch.setattr(main, 'predict_proba', lambda X: scored_rows.append(len(X)) or predict_proba(X))
+        
+        async def run_all(batch):
+            return await asyncio.gather(*(main.predict_winner(m) for m in batch))
+        
+        first = asyncio.run(run_all(matches[:3]))
+        second = asyncio.run(run_all(matches))
+        info = main.cached_probabilities.cache_info()
+        
+        assert scored_rows == [3, 1]
+        assert (info.hits, info.misses, info.currsize) == (3, 4, 4)
+        assert second[:3] == first
+    
+    def test_metrics_reports_disabled_by_default(self, monkeypatch):
+        """Verifica que /metrics indique micro-batching desactivado"""
+        import main
+        monkeypatch.setattr(main, 'predict_batcher', None)
+        
+        assert client.get("/metrics").json()['microbatch'] == {"enabled": False}
+
+
+class TestProcessServingMode:
+    """Tests para el modo de servicio con pool de procesos de inferencia"""
+    
+    @pytest.fixture
+    def process_mode(self, monkeypatch):
+        import main
+        main.ensure_artifacts()
+        monkeypatch.setattr(main, 'SERVING_MODE', 'process')
+        main.start_inference_pool(2)
+        yield main
+        main.stop_inference_pool()
+    
+    def test_pool_predictions_match_inline(self, process_mode):
+        """Verifica que el pool de procesos prediga lo mismo que el modo inline"""
+        matches = [
+            {"team_color": "Blue", "game_mode": "Duel", "goal_difference": gd,
+             "match_duration": 300 + gd, "overtime": False}
+            for gd in range(-5, 6)
+        ]
+        X = process_mode.prepare_features_batch(
+            [process_mode.MatchInput(**m) for m in matches]
+        )
+        
+        np.testing.assert_array_equal(
+            process_mode.predict_proba(X),
+            process_mode.local_predict_proba(X)
+        )
+        
+        response = client.post("/predict_batch", json={"matches": matches})
+        assert response.status_code == 200
+        assert response.json()['total_matches'] == len(matches)
+    
+    def test_workers_start_while_server_holds_reload_lock(self, process_mode):
+        """Verifica que los workers no se creen con fork ni hereden el lock de recarga tomado"""
+        with process_mode._reload_lock:
+            pool = process_mode.start_inference_pool(2)
+        
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+        pids = set(pool.map(process_mode._warm_worker, range(4)))
+        assert os.getpid() not in pids
+    
+    def test_predict_endpoint_uses_pool(self, process_mode):
+        """Verifica que /predict responda en modo process"""
+        process_mode.cached_probabilities.cache_clear()
+        response = client.post("/predict", json={
+            "team_color": "Orange", "game_mode": "Standard", "goal_difference": -2,
+            "match_duration": 411, "overtime": True
+        })
+        
+        assert response.status_code == 200
+        assert response.json()['winner_prediction'] in ['Blue', 'Orange', 'Draw']
+    
+    def test_ready_reports_workers(self, process_mode):
+        """Verifica que /ready informe el modo de servicio y los workers"""
+        data = client.get("/ready").json()
+        
+        assert data['serving_mode'] == 'process'
+        assert data['inference_workers'] == 2
+    
+    def test_ready_waits_for_pool(self, monkeypatch):
+        """Verifica que /ready responda 503 en modo process sin pool activo"""
+        import main
+        main.ensure_artifacts()
+        monkeypatch.setattr(main, 'SERVING_MODE', 'process')
+        
+        assert client.get("/ready").status_code == 503
+
+
 class TestStatsEndpoint:
     """Tests para el endpoint de estadísticas"""
     
@@ -252,6 +252,552 @@ class TestBatchPredictions:
         assert probas.shape[1] >= 2  # Al menos 2 clases
 
 
+class TestScoringEngine:
+    """Tests del motor de puntuación batch (src/scoring.py)"""
+    
+    @pytest.fixture
+    def encoded_path(self, tmp_path):
+        """Copia de processed_encoded en CSV"""
+        from storage import read_table, write_table
+        return write_table(read_table('processed_encoded'), 'processed_encoded', fmt='csv', directory=tmp_path)
+    
+    @pytest.fixture
+    def engine(self):
+        from scoring import load_engine
+        with load_engine() as engine:
+            yield engine
+    
+    def test_score_uses_model_feature_order(self, engine):
+        """Verifica que se respete feature_names_in_ y coincida con el modelo"""
+        from storage import read_table
+        df = read_table('processed_encoded')
+        expected = engine.model.predict(df[list(engine.model.feature_names_in_)])
+        
+        result = engine.score(df.copy())
+        
+        assert engine.feature_names == list(engine.model.feature_names_in_)
+        assert list(result['predicted_winner']) == \
+            [w.lower() for w in engine.winner_encoder.inverse_transform(expected)]
+        assert list(result['winner']) == \
+            [w.lower() for w in engine.winner_encoder.inverse_transform(df['winner_encoded'])]
+        assert set(result['game_mode']) <= {'Duel', 'Doubles', 'Standard', 'Unknown'}
+    
+    def test_score_without_winner_column(self, engine):
+        """Verifica que sin winner_encoded no se agregue la columna winner"""
+        from storage import read_table
+        df = read_table('processed_encoded').drop(columns=['winner_encoded'])
+        
+        result = engine.score(df)
+        
+        assert 'winner' not in result.columns
+        assert result['prediction_confidence'].between(0, 1).all()
+    
+    @pytest.mark.parametrize('fmt', ['csv', 'parquet', 'feather'])
+    def test_streaming_matches_in_memory(self, engine, encoded_path, tmp_path, fmt):
+        """Verifica que puntuar por bloques dé el mismo resultado que todo en memoria"""
+        if fmt != 'csv':
+            pytest.importorskip('pyarrow')
+        from storage import PREDICTION_SCHEMA, read_frame
+        expected_path, _ = engine.score_file(encoded_path, tmp_path / f'in_memory.{fmt}')
+        
+        path, rows = engine.score_file(encoded_path, tmp_path / f'streamed.{fmt}', chunk_size=77)
+        
+        expected = read_frame(expected_path, schema=PREDICTION_SCHEMA)
+        assert rows == len(expected)
+        assert not path.with_name(path.name + '.tmp').exists()
+        pd.testing.assert_frame_equal(read_frame(path, schema=PREDICTION_SCHEMA), expected,
+                                      check_dtype=False, check_categorical=False)
+    
+    def test_report_script_runs_only_from_main(self, encoded_path, tmp_path, capsys):
+        """Verifica que importar el script no puntúe nada y que main() genere el reporte"""
+        import generate_predictions_with_winner as script
+        assert capsys.readouterr().out == ''
+        
+        path = script.main(['--input', str(encoded_path), '--output', str(tmp_path / 'out.csv')])
+        
+        output = capsys.readouterr().out
+        assert path.exists()
+        assert 'Accuracy del modelo' in output and 'Unknown' not in output
+    
+    def test_streaming_failure_keeps_previous_output(self, engine, encoded_path, tmp_path, monkeypatch):
+        """Verifica que un fallo a mitad de camino no deje una salida parcial"""
+        path, _ = engine.score_file(encoded_path, tmp_path / 'out.csv', chunk_size=100)
+        before = path.read_bytes()
+        
+        calls = []
+        original = engine.score
+        def failing_score(df):
+            calls.append(1)
+            if len(calls) == 3:
+                raise RuntimeError("fallo simulado")
+            return original(df)
+        monkeypatch.setattr(engine, 'score', failing_score)
+        
+        with pytest.raises(RuntimeError):
+            engine.score_file(encoded_path, path, chunk_size=100)
+        
+        assert path.read_bytes() == before
+        assert not path.with_name(path.name + '.tmp').exists()
+    
+    def test_cli_writes_requested_output(self, encoded_path, tmp_path):
+        """Verifica la CLI con entrada, salida, bloques y formato"""
+        from scoring import main
+        from storage import read_frame
+        
+        output = main(['--input', str(encoded_path), '--output', str(tmp_path / 'cli.csv'),
+                       '--chunk-size', '200'])
+        
+        assert output == tmp_path / 'cli.csv'
+        assert len(read_frame(output)) == 500
+
+
+class TestIncrementalScoring:
+    """Tests del modo incremental del motor de puntuación"""
+    
+    @pytest.fixture
+    def encoded(self):
+        from storage import read_table
+        return read_table('processed_encoded')
+    
+    @pytest.fixture
+    def engine(self):
+        from scoring import load_engine
+        with load_engine() as engine:
+            yield engine
+    
+    def assert_matches_full_rescore(self, engine, input_path, output_path):
+        from storage import read_frame
+        expected_path, _ = engine.score_file(input_path, output_path.with_name('full' + output_path.suffix))
+        pd.testing.assert_frame_equal(read_frame(output_path), read_frame(expected_path), check_dtype=False)
+    
+    @pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+    def test_second_run_scores_nothing(self, engine, encoded, tmp_path, fmt):
+        """Verifica que sin cambios no se vuelva a puntuar ninguna fila"""
+        from storage import write_frame
+        input_path = write_frame(encoded, tmp_path / f'input.{fmt}')
+        output_path = tmp_path / f'out.{fmt}'
+        
+        _, rows, scored = engine.score_incremental(input_path, output_path, chunk_size=120)
+        assert rows == scored == len(encoded)
+        before = output_path.read_bytes()
+        
+        _, rows, scored = engine.score_incremental(input_path, output_path, chunk_size=120)
+        assert (rows, scored) == (len(encoded), 0)
+        assert output_path.read_bytes() == before
+    
+    @pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+    def test_appended_rows_only(self, engine, encoded, tmp_path, fmt):
+        """Verifica que solo se puntúen las filas agregadas"""
+        from storage import write_frame
+        input_path = tmp_path / f'input.{fmt}'
+        output_path = tmp_path / f'out.{fmt}'
+        write_frame(encoded.iloc[:400], input_path)
+        engine.score_incremental(input_path, output_path, chunk_size=150)
+        
+        write_frame(encoded, input_path)
+        _, rows, scored = engine.score_incremental(input_path, output_path, chunk_size=150)
+        
+        assert (rows, scored) == (len(encoded), len(encoded) - 400)
+        self.assert_matches_full_rescore(engine, input_path, output_path)
+    
+    def test_changed_and_removed_rows(self, engine, encoded, tmp_path):
+        """Verifica que se repuntúen las filas modificadas y se descarten las eliminadas"""
+        from storage import write_frame
+        input_path = tmp_path / 'input.parquet'
+        output_path = tmp_path / 'out.parquet'
+        write_frame(encoded, input_path)
+        engine.score_incremental(input_path, output_path, chunk_size=150)
+        
+        modified = encoded.iloc[:450].copy()
+        modified.loc[[10, 300], 'goal_difference'] += 3
+        write_frame(modified, input_path)
+        _, rows, scored = engine.score_incremental(input_path, output_path, chunk_size=150)
+        
+        assert (rows, scored) == (450, 2)
+        self.assert_matches_full_rescore(engine, input_path, output_path)
+    
+    def test_model_change_triggers_full_rescore(self, engine, encoded, tmp_path):
+        """Verifica que un cambio de versión del modelo vuelva a puntuar todo"""
+        from storage import write_frame
+        input_path = write_frame(encoded, tmp_path / 'input.parquet')
+        output_path = tmp_path / 'out.parquet'
+        engine.score_incremental(input_path, output_path)
+        
+        engine.model_version = 'otro-modelo'
+        _, rows, scored = engine.score_incremental(input_path, output_path)
+        
+        assert rows == scored == len(encoded)
+    
+    def test_modified_output_triggers_full_rescore(self, engine, encoded, tmp_path):
+        """Verifica que si la salida cambió por fuera se puntúe todo de nuevo"""
+        from storage import write_frame
+        input_path = write_frame(encoded, tmp_path / 'input.csv')
+        output_path = tmp_path / 'out.csv'
+        engine.score_incremental(input_path, output_path)
+        
+        with open(output_path, 'a') as f:
+            f.write('basura\n')
+        _, rows, scored = engine.score_incremental(input_path, output_path)
+        
+        assert rows == scored == len(encoded)
+        self.assert_matches_full_rescore(engine, input_path, output_path)
+    
+    def test_model_fingerprint_depends_on_artifacts(self, tmp_path):
+        """Verifica que la versión del modelo cambie si cambia un artefacto"""
+        import shutil
+        from scoring import MODEL_FILES, model_fingerprint
+        for name in MODEL_FILES:
+            shutil.copy(BASE_DIR / 'data' / 'models' / name, tmp_path / name)
+        original = model_fingerprint(tmp_path)
+        
+        with open(tmp_path / 'winner_encoder.pkl', 'ab') as f:
+            f.write(b'\0')
+        
+        assert model_fingerprint(tmp_path) != original
+
+
+class TestParallelScoring:
+    """Tests de la puntuación batch en un pool de procesos"""
+    
+    def test_shard_bounds_cover_all_rows_in_order(self):
+        """Verifica que los fragmentos cubran todas las filas sin solaparse"""
+        from parallel_scoring import shard_bounds
+        bounds = shard_bounds(10, 4)
+        
+        assert bounds[0][0] == 0 and bounds[-1][1] == 10
+        assert all(end == next_start for (_, end), (next_start, _) in zip(bounds, bounds[1:]))
+        assert shard_bounds(3, 8) == [(0, 1), (1, 2), (2, 3)]
+    
+    def test_parallel_matches_sequential(self):
+        """Verifica que puntuar en procesos dé exactamente lo mismo y en orden"""
+        from parallel_scoring import ParallelScorer
+        from storage import read_table
+        model = joblib.load(str(BASE_DIR / 'data' / 'models' / 'random_forest_model.pkl'))
+        model.set_params(n_jobs=1)
+        X = read_table('processed_encoded')[list(model.feature_names_in_)]
+        
+        with ParallelScorer(2) as scorer:
+            probabilities = scorer.predict_proba(X)
+            array_probabilities = scorer.predict_proba(X.to_numpy()[:7])
+        
+        assert np.array_equal(probabilities, model.predict_proba(X))
+        assert np.array_equal(array_probabilities, model.predict_proba(X.to_numpy()[:7]))
+    
+    def test_engine_parallel_mode(self, tmp_path):
+        """Verifica que el motor en paralelo coincida con el modo secuencial"""
+        from scoring import load_engine
+        from storage import read_table, write_table, read_frame
+        encoded_path = write_table(read_table('processed_encoded'), 'processed_encoded',
+                                   fmt='csv', directory=tmp_path)
+        
+        with load_engine() as engine:
+            expected_path, _ = engine.score_file(encoded_path, tmp_path / 'sequential.csv')
+        with load_engine(workers=2) as engine:
+            parallel_path, _ = engine.score_file(encoded_path, tmp_path / 'parallel.csv')
+            streamed_path, _ = engine.score_file(encoded_path, tmp_path / 'streamed.csv', chunk_size=150)
+        
+        expected = read_frame(expected_path)
+        pd.testing.assert_frame_equal(read_frame(parallel_path), expected)
+        pd.testing.assert_frame_equal(read_frame(streamed_path), expected)
+    
+    @pytest.mark.parametrize('script', ['batch_predictions.py', 'generate_predictions_with_winner.py'])
+    def test_scripts_run_workers_with_spawn(self, script, tmp_path):
+        """Verifica que los scripts con --workers arranquen el pool (spawn reimporta el script)"""
+        import subprocess
+        from storage import read_table, write_table
+        encoded_path = write_table(read_table('processed_encoded'), 'processed_encoded',
+                                   fmt='csv', directory=tmp_path)
+        output_path = tmp_path / 'out.csv'
+        
+        result = subprocess.run(
+            [sys.executable, str(BASE_DIR / 'src' / script), '--workers', '2',
+             '--input', str(encoded_path), '--output', str(output_path)],
+            capture_output=True, text=True, timeout=300
+        )
+        
+        assert result.returncode == 0, result.stderr
+        assert output_path.exists()
+
+
+class TestFlatForest:
+    """Tests del motor de inferencia compilado (bosque aplanado)"""
+    
+    @pytest.fixture
+    def model_and_flat(self):
+        """Modelo original (secuencial) y su versión compilada"""
+        from flat_forest import FlatForest
+        model = joblib.load(str(BASE_DIR / 'data' / 'models' / 'random_forest_model.pkl'))
+        # n_jobs=1 para que scikit-learn acumule los árboles en orden fijo
+        model.set_params(n_jobs=1)
+        return model, FlatForest.from_sklearn(model)
+    
+    @pytest.fixture
+    def realistic_batch(self):
+        """Partidas aleatorias dentro de los rangos reales de cada feature"""
+        rng = np.random.default_rng(42)
+        n = 2000
+        return np.column_stack([
+            rng.integers(0, 2, n),        # team_color_encoded
+            rng.integers(-10, 11, n),     # goal_difference
+            rng.integers(150, 800, n),    # match_duration
+            rng.integers(0, 2, (n, 5))    # modos, is_competitive, overtime
+        ]).astype(np.float64)
+    
+    def test_flat_forest_keeps_all_trees(self, model_and_flat):
+        """Verifica que se compilen todos los árboles"""
+        model, flat = model_and_flat
+        
+        assert flat.n_trees == len(model.estimators_)
+        assert flat.n_features == model.n_features_in_
+        assert np.array_equal(flat.classes_, model.classes_)
+    
+    def test_flat_forest_batch_matches_sklearn_bit_for_bit(self, model_and_flat, realistic_batch):
+        """Verifica paridad exacta de predict_proba en lote"""
+        model, flat = model_and_flat
+        
+        assert np.array_equal(flat.predict_proba(realistic_batch),
+                              model.predict_proba(realistic_batch))
+    
+    def test_flat_forest_single_row_matches_sklearn_bit_for_bit(self, model_and_flat, realistic_batch):
+        """Verifica paridad exacta del bucle de una sola fila"""
+        model, flat = model_and_flat
+        
+        for row in realistic_batch[:100]:
+            X = row.reshape(1, -1)
+            assert np.array_equal(flat.predict_proba(X), model.predict_proba(X))
+    
+    def test_flat_forest_matches_sklearn_on_continuous_values(self, model_and_flat):
+        """Verifica paridad con valores continuos cercanos a los umbrales"""
+        model, flat = model_and_flat
+        X = np.random.default_rng(0).uniform(-20, 900, (1000, 8))
+        
+        assert np.array_equal(flat.predict_proba(X), model.predict_proba(X))
+    
+    def test_flat_forest_predict_matches_sklearn(self, model_and_flat, realistic_batch):
+        """Verifica que la clase predicha coincida con model.predict"""
+        model, flat = model_and_flat
+        
+        assert np.array_equal(flat.predict(realistic_batch), model.predict(realistic_batch))
+    
+    def test_flat_forest_artifact_loads_memory_mapped(self, model_and_flat, realistic_batch, tmp_path):
+        """Verifica que el bosque guardado se abra con memory-map y prediga igual"""
+        from artifacts import save_artifact, load_artifact
+        model, flat = model_and_flat
+        
+        path = save_artifact(flat, tmp_path / 'flat_forest.pkl')
+        loaded = load_artifact(path, mmap=True)
+        
+        assert isinstance(loaded.threshold, np.memmap)
+        assert np.array_equal(loaded.predict_proba(realistic_batch),
+                              model.predict_proba(realistic_batch))
+        assert np.array_equal(loaded.predict_proba(realistic_batch[:1]),
+                              model.predict_proba(realistic_batch[:1]))
+    
+    def test_flat_forest_rejects_wrong_feature_count(self, model_and_flat):
+        """Verifica que rechace entradas con número incorrecto de features"""
+        model, flat = model_and_flat
+        
+        with pytest.raises(ValueError):
+            flat.predict_proba(np.random.rand(1, 5))
+
+
+class TestLookupTable:
+    """Tests de la tabla de predicciones precalculada"""
+    
+    @pytest.fixture
+    def model_and_table(self, tmp_path):
+        """Modelo y tabla reducida construida en un directorio temporal"""
+        from lookup_table import build_lookup_table
+        model_path = BASE_DIR / 'data' / 'models' / 'random_forest_model.pkl'
+        model = joblib.load(str(model_path))
+        model.set_params(n_jobs=1)
+        team_enc = joblib.load(str(BASE_DIR / 'data' / 'models' / 'team_encoder.pkl'))
+        
+        table = build_lookup_table(
+            model, team_enc.classes_,
+            table_path=tmp_path / 'lookup_table.npy',
+            meta_path=tmp_path / 'lookup_table_meta.pkl',
+            goal_range=(-2, 2), duration_range=(295, 305),
+            model_path=model_path
+        )
+        return model, table
+    
+    def _features(self, model, **values):
+        """Vector de features en el orden del modelo"""
+        row = dict.fromkeys(model.feature_names_in_, 0)
+        row.update(values)
+        return tuple(float(row[name]) for name in model.feature_names_in_)
+    
+    def test_table_shape_covers_all_combinations(self, model_and_table):
+        """Verifica que la tabla tenga una celda por combinación"""
+        model, table = model_and_table
+        n_modes = sum(name.startswith('mode_') for name in model.feature_names_in_)
+        
+        assert table.table.shape == (2, n_modes + 1, 2, 2, 5, 11, len(model.classes_))
+    
+    def test_table_is_memory_mapped(self, model_and_table):
+        """Verifica que la tabla se abra con memory-map"""
+        model, table = model_and_table
+        assert isinstance(table.table, np.memmap)
+    
+    def test_lookup_matches_model(self, model_and_table):
+        """Verifica que cada celda coincida con predict_proba del modelo"""
+        model, table = model_and_table
+        
+        for team in (0, 1):
+            for mode in ('mode_Duel', 'mode_Doubles', 'mode_Standard', None):
+                for goal in (-2, 0, 2):
+                    extra = {mode: 1} if mode else {}
+                    features = self._features(model, team_color_encoded=team, goal_difference=goal,
+                                              match_duration=300, is_competitive=1, **extra)
+                    expected = model.predict_proba(np.array([features]))[0]
+                    assert np.array_equal(table.lookup(features), expected)
+    
+    def test_lookup_out_of_range_returns_none(self, model_and_table):
+        """Verifica que las entradas fuera de rango no se respondan desde la tabla"""
+        model, table = model_and_table
+        
+        assert table.lookup(self._features(model, goal_difference=3, match_duration=300)) is None
+        assert table.lookup(self._features(model, match_duration=400)) is None
+        assert table.lookup(self._features(model, match_duration=300, is_competitive=5)) is None
+        assert table.lookup(self._features(model, match_duration=300,
+                                           mode_Duel=1, mode_Doubles=1)) is None
+    
+    def test_table_is_tied_to_model_file(self, model_and_table, tmp_path):
+        """Verifica que la tabla reconozca el modelo con el que se construyó"""
+        model, table = model_and_table
+        other_model = tmp_path / 'otro_modelo.pkl'
+        other_model.write_bytes(b'otro modelo')
+        
+        assert table.matches_model(BASE_DIR / 'data' / 'models' / 'random_forest_model.pkl')
+        assert not table.matches_model(other_model)
+
+
+class TestPredictionStats:
+    """Tests de las estadísticas incrementales de predicciones guardadas"""
+    
+    @pytest.fixture
+    def predictions(self):
+        return pd.read_csv(BASE_DIR / 'data' / 'processed' / 'model_predictions.csv')
+    
+    def _full_stats(self, df):
+        """Cálculo de referencia con pandas sobre el archivo completo"""
+        return {
+            "total_matches": len(df),
+            "avg_match_duration": df['match_duration'].mean(),
+            "overtime_percentage": df['overtime'].sum() / len(df) * 100,
+            "mean": df['goal_difference'].mean(),
+            "std": df['goal_difference'].std(),
+            "min": df['goal_difference'].min(),
+            "max": df['goal_difference'].max(),
+            "game_modes": df['game_mode'].value_counts().to_dict()
+        }
+    
+    def test_compact_dtypes_match_reference(self, predictions):
+        """Verifica que con el esquema compacto no aparezcan categorías sin filas"""
+        from prediction_stats import PredictionStats
+        from storage import PREDICTION_SCHEMA, apply_schema
+        compact = apply_schema(predictions, PREDICTION_SCHEMA)
+        compact['game_mode'] = compact['game_mode'].cat.add_categories(['Unknown'])
+        
+        stats = PredictionStats().update(compact).to_dict()
+        
+        self._assert_matches(stats, self._full_stats(predictions))
+    
+    def _assert_matches(self, stats, expected):
+        goals = stats['goal_difference_stats']
+        assert stats['total_matches'] == expected['total_matches']
+        assert stats['avg_match_duration'] == pytest.approx(expected['avg_match_duration'])
+        assert stats['overtime_percentage'] == pytest.approx(expected['overtime_percentage'])
+        assert goals['mean'] == pytest.approx(expected['mean'])
+        assert goals['std'] == pytest.approx(expected['std'])
+        assert goals['min'] == expected['min']
+        assert goals['max'] == expected['max']
+        assert stats['game_modes'] == expected['game_modes']
+    
+    def test_chunked_aggregation_matches_pandas(self, predictions):
+        """Verifica que agregar por bloques dé lo mismo que pandas sobre todo el archivo"""
+        from prediction_stats import PredictionStats
+        stats = PredictionStats()
+        for start in range(0, len(predictions), 37):
+            stats.update(predictions.iloc[start:start + 37])
+        
+        self._assert_matches(stats.to_dict(), self._full_stats(predictions))
+    
+    def test_cache_reloads_only_when_file_changes(self, predictions, tmp_path):
+        """Verifica que el archivo se relea solo si cambia en disco"""
+        from prediction_stats import PredictionStatsCache
+        path = tmp_path / 'model_predictions.csv'
+        predictions.iloc[:100].to_csv(path, index=False)
+        cache = PredictionStatsCache(path)
+        
+        first = cache.get()
+        assert cache.get() == first
+        assert cache.reloads == 1
+        
+        # Reescritura con otro contenido (no solo filas agregadas): se relee todo
+        predictions.iloc[::-1].to_csv(path, index=False)
+        self._assert_matches(cache.get(), self._full_stats(predictions))
+        assert cache.reloads == 2
+    
+    def test_cache_reads_only_rows_appended_by_writers(self, predictions, tmp_path):
+        """Verifica que un CSV que solo creció (como con --incremental) se lea desde el final anterior"""
+        from prediction_stats import PredictionStatsCache
+        path = tmp_path / 'model_predictions.csv'
+        predictions.iloc[:300].to_csv(path, index=False)
+        cache = PredictionStatsCache(path)
+        cache.get()
+        
+        predictions.iloc[300:].to_csv(path, mode='a', header=False, index=False)
+        
+        self._assert_matches(cache.get(), self._full_stats(predictions))
+        assert cache.reloads == 1 and cache.incremental_reads == 1
+    
+    def test_cache_waits_for_partially_written_line(self, predictions, tmp_path):
+        """Verifica que una línea a medio escribir se cuente recién cuando se completa"""
+        from prediction_stats import PredictionStatsCache
+        path = tmp_path / 'model_predictions.csv'
+        predictions.iloc[:10].to_csv(path, index=False)
+        cache = PredictionStatsCache(path)
+        cache.get()
+        line = predictions.iloc[10:11].to_csv(header=False, index=False)
+        
+        with open(path, 'a', newline='') as f:
+            f.write(line[:5])
+        assert cache.get()['total_matches'] == 10
+        with open(path, 'a', newline='') as f:
+            f.write(line[5:])
+        
+        self._assert_matches(cache.get(), self._full_stats(predictions.iloc[:11]))
+        assert cache.reloads == 1
+    
+    def test_cache_reads_parquet(self, predictions, tmp_path):
+        """Verifica que las estadísticas se calculen también desde Parquet"""
+        pytest.importorskip('pyarrow')
+        from prediction_stats import PredictionStatsCache
+        path = tmp_path / 'model_predictions.parquet'
+        predictions.to_parquet(path, index=False)
+        
+        cache = PredictionStatsCache(lambda: path)
+        self._assert_matches(cache.get(), self._full_stats(predictions))
+        with pytest.raises(ValueError):
+            cache.append(predictions.iloc[:1])
+    
+    def test_append_updates_incrementally(self, predictions, tmp_path):
+        """Verifica que append() actualice los agregados sin releer el archivo"""
+        from prediction_stats import PredictionStatsCache
+        path = tmp_path / 'model_predictions.csv'
+        cache = PredictionStatsCache(path)
+        
+        assert cache.get()['total_matches'] == 0
+        cache.append(predictions.iloc[:200])
+        cache.append(predictions.iloc[200:])
+        
+        self._assert_matches(cache.get(), self._full_stats(predictions))
+        assert cache.reloads == 1
+        self._assert_matches(PredictionStatsCache(path).get(), self._full_stats(predictions))
+
+
 class TestFeatureEngineering:
     """Tests para ingeniería de features"""
     
@@ -376,5 +922,384 @@ class TestDataIntegrityForPredictions:
             model.predict(X_wrong)
 
 
+class TestMatchPipeline:
+    """Tests del artefacto único de codificación + modelo"""
+    
+    @pytest.fixture
+    def pipeline(self):
+        from model_pipeline import pipeline_from_legacy
+        return pipeline_from_legacy(BASE_DIR / 'data' / 'models')
+    
+    @pytest.fixture
+    def features(self):
+        from storage import read_table
+        return read_table('processed_features')
+    
+    def test_encode_frame_matches_processed_encoded(self, features):
+        """Verifica que la codificación reproduzca processed_encoded"""
+        from model_pipeline import MatchEncoder
+        from schema import ENCODED_SCHEMA, apply_schema
+        from storage import read_table
+        encoded = read_table('processed_encoded')
+        
+        result = apply_schema(MatchEncoder.fit(features).encode_frame(features.copy()), ENCODED_SCHEMA)
+        
+        assert list(result.columns) == list(encoded.columns)
+        for column in ['team_color_encoded', 'mode_Duel', 'mode_Doubles', 'mode_Standard', 'winner_encoded']:
+            assert (result[column].to_numpy() == encoded[column].to_numpy()).all()
+    
+    def test_transform_raw_and_encoded_frames_agree(self, pipeline, features):
+        """Verifica que partidas crudas y ya codificadas den la misma matriz"""
+        from storage import read_table
+        encoded = read_table('processed_encoded')
+        
+        X_raw = pipeline.transform(features)
+        X_encoded = pipeline.transform(encoded)
+        
+        assert X_raw.dtype == np.float32
+        np.testing.assert_array_equal(X_raw, X_encoded)
+        np.testing.assert_array_equal(X_raw, encoded[pipeline.feature_names].to_numpy(dtype=np.float32))
+    
+    def test_predict_proba_matches_model(self, pipeline, features):
+        """Verifica que una llamada al pipeline equivalga a codificar y predecir por separado"""
+        from storage import read_table
+        encoded = read_table('processed_encoded')
+        
+        expected = pipeline.model.predict_proba(encoded[pipeline.feature_names])
+        
+        np.testing.assert_allclose(pipeline.predict_proba(features), expected)
+        assert list(pipeline.predict(features.head(3))) == \
+            list(pipeline.winner_labels[expected[:3].argmax(axis=1)])
+    
+    def test_transform_normalizes_colors_and_derives_competitive(self, pipeline):
+        """Verifica variantes de color y is_competitive derivado de goal_difference"""
+        df = pd.DataFrame({
+            'team_color': ['azul', 'Orange'],
+            'game_mode': ['duel', 'Standard'],
+            'goal_difference': [1, -5],
+            'match_duration': [300, 420],
+            'overtime': [False, True]
+        })
+        
+        X = dict(zip(pipeline.feature_names, pipeline.transform(df).T))
+        
+        assert list(X['team_color_encoded']) == [pipeline.encoder.team_code('Blue'),
+                                                 pipeline.encoder.team_code('Orange')]
+        assert list(X['mode_Duel']) == [1, 0]
+        assert list(X['mode_Standard']) == [0, 1]
+        assert list(X['is_competitive']) == [1, 0]
+    
+    def test_unknown_team_color_raises(self, pipeline):
+        """Verifica que un color desconocido se reporte en lugar de codificarse mal"""
+        df = pd.DataFrame({'team_color': ['Green'], 'game_mode': ['Duel'], 'goal_difference': [0],
+                           'match_duration': [300], 'overtime': [False]})
+        
+        with pytest.raises(ValueError, match='Green'):
+            pipeline.transform(df)
+    
+    def test_saved_pipeline_round_trip(self, pipeline, features, tmp_path):
+        """Verifica que el pipeline guardado conserve versión y predicciones"""
+        from model_pipeline import load_pipeline, save_pipeline
+        save_pipeline(pipeline, tmp_path / 'match_pipeline.pkl')
+        
+        loaded = load_pipeline(tmp_path)
+        
+        assert loaded.version == pipeline.version
+        np.testing.assert_allclose(loaded.predict_proba(features), pipeline.predict_proba(features))
+    
+    def test_version_depends_on_model_file(self, pipeline):
+        """Verifica que la versión sea estable y cambie con el archivo del modelo"""
+        from model_pipeline import MatchPipeline, pipeline_from_legacy
+        
+        assert pipeline_from_legacy(BASE_DIR / 'data' / 'models').version == pipeline.version
+        assert MatchPipeline(pipeline.encoder, pipeline.model, '0' * 64).version != pipeline.version
+    
+    def test_feature_mismatch_raises(self, pipeline):
+        """Verifica que no se acepte un modelo con otro orden de features"""
+        from model_pipeline import MatchEncoder, MatchPipeline
+        encoder = pipeline.encoder
+        reordered = MatchEncoder(encoder.team_classes, encoder.winner_classes, encoder.game_modes,
+                                 list(reversed(encoder.feature_names)))
+        
+        with pytest.raises(ValueError):
+            MatchPipeline(reordered, pipeline.model, pipeline.metadata['model_sha256'])
+
+
+class TestTuning:
+    """Tests de la búsqueda de hiperparámetros con successive halving"""
+    
+    @pytest.fixture
+    def small_space(self, monkeypatch):
+        """Espacio reducido para que la búsqueda tarde poco"""
+        import tuning
+        monkeypatch.setattr(tuning, 'SEARCH_SPACE', {
+            'n_estimators': [5, 20],
+            'max_depth': [3, None],
+            'min_samples_leaf': [1, 4],
+            'max_features': ['sqrt', None],
+        })
+        monkeypatch.setattr(tuning, 'LATENCY_REPEATS', 5)
+    
+    def test_select_model_prefers_fastest_within_tolerance(self):
+        """Verifica que se elija la finalista más rápida sin perder más F1 que la tolerancia"""
+        from tuning import select_model
+        table = pd.DataFrame({
+            'f1_cv': [0.90, 0.95, 0.948, 0.96],
+            'latency_ms': [0.5, 5.0, 1.0, np.nan]  # la última no llegó a la ronda final
+        })
+        
+        assert select_model(table, tolerance=0.005) == 2
+        assert select_model(table, tolerance=0.0) == 1
+        assert select_model(table, tolerance=0.1) == 0
+    
+    def test_scorer_discounts_each_tree(self):
+        """Verifica que el puntaje de la búsqueda descuente tree_cost por árbol del F1"""
+        from sklearn.ensemble import RandomForestClassifier
+        from tuning import latency_aware_f1
+        X, y = np.array([[0.0], [1.0]] * 10), np.array([0, 1] * 10)
+        model = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+        
+        assert latency_aware_f1(model, X, y, tree_cost=0.0) == 1.0
+        assert latency_aware_f1(model, X, y, tree_cost=0.001) == pytest.approx(0.98)
+    
+    def test_row_params_returns_python_types(self):
+        """Verifica la conversión de los valores de la tabla a parámetros válidos"""
+        from tuning import row_params
+        table = pd.DataFrame({
+            'n_estimators': [50], 'max_depth': pd.array([pd.NA], dtype='Int64'),
+            'min_samples_leaf': [4], 'max_features': [0.5]
+        })
+        
+        params = row_params(table, 0)
+        
+        assert params == {'n_estimators': 50, 'max_depth': None, 'min_samples_leaf': 4, 'max_features': 0.5}
+        assert type(params['n_estimators']) is int
+    
+    def test_tune_persists_results_table(self, small_space, tmp_path):
+        """Verifica que la búsqueda guarde la tabla y marque una sola combinación elegida"""
+        from storage import read_table
+        from tuning import tune
+        df = read_table('processed_encoded')
+        X = df[['team_color_encoded', 'goal_difference', 'match_duration', 'is_competitive', 'overtime']]
+        results_path = tmp_path / 'tuning_results.csv'
+        
+        params, table = tune(X, df['winner_encoded'], budget=6, n_jobs=1,
+                             results_path=results_path, verbose=False)
+        
+        saved = pd.read_csv(results_path)
+        assert len(saved) == len(table)
+        assert table['selected'].sum() == 1
+        finalists = table[table['latency_ms'].notna()]
+        assert (finalists['iter'] == table['iter'].max()).all()
+        assert table.loc[table['selected'], 'f1_cv'].iloc[0] >= finalists['f1_cv'].max() - 0.005
+        assert set(params) == {'n_estimators', 'max_depth', 'min_samples_leaf', 'max_features'}
+        assert np.allclose(table['f1_cv'] - table['score_cv'], 0.00005 * table['n_estimators'])
+    
+    def test_elimination_penalizes_large_forests(self, small_space):
+        """Verifica que con un costo por árbol alto solo lleguen a la final los bosques chicos"""
+        from storage import read_table
+        from tuning import tune
+        df = read_table('processed_encoded')
+        X = df[['team_color_encoded', 'goal_difference', 'match_duration', 'is_competitive', 'overtime']]
+        
+        params, table = tune(X, df['winner_encoded'], budget=6, n_jobs=1, tree_cost=1.0,
+                             results_path=None, verbose=False)
+        
+        finalists = table[table['latency_ms'].notna()]
+        assert (table.loc[table['iter'] == 0, 'n_estimators'] == 20).any()
+        assert (finalists['n_estimators'] == 5).all()
+        assert params['n_estimators'] == 5
+
+
+class TestModelCompression:
+    """Tests de la poda y destilación del bosque"""
+    
+    @pytest.fixture
+    def split(self):
+        from model_pipeline import pipeline_from_legacy
+        from storage import read_table
+        from tuning import split_train_test
+        pipeline = pipeline_from_legacy(BASE_DIR / 'data' / 'models', mmap=False)
+        df = read_table('processed_encoded')
+        X_train, X_test, y_train, y_test = split_train_test(df[pipeline.feature_names], df['winner_encoded'])
+        return pipeline, X_train, X_test, y_train, y_test
+    
+    def test_macro_f1_matches_sklearn(self):
+        """Verifica que el F1 vectorizado coincida con f1_score para cada candidato"""
+        from sklearn.metrics import f1_score
+        from compress_model import macro_f1
+        rng = np.random.default_rng(0)
+        y = rng.integers(0, 3, 50)
+        predictions = rng.integers(0, 3, (4, 50))
+        
+        expected = [f1_score(y, p, average='macro', labels=[0, 1, 2]) for p in predictions]
+        
+        np.testing.assert_allclose(macro_f1(y, predictions, 3), expected)
+    
+    def test_pruned_forest_keeps_f1_within_tolerance(self, split):
+        """Verifica que la poda respete la tolerancia y promedie solo los árboles elegidos"""
+        from compress_model import select_trees, subset_forest
+        pipeline, _, X_val, _, y_val = split
+        model = pipeline.model
+        
+        indices, score, full_f1 = select_trees(model, X_val, y_val, tolerance=0.01)
+        pruned = subset_forest(model, indices)
+        
+        assert 0 < len(indices) <= len(model.estimators_)
+        assert len(set(indices)) == len(indices)
+        assert score >= full_f1 - 0.01
+        assert len(model.estimators_) == model.n_estimators  # el original no cambia
+        X = X_val.to_numpy(dtype=np.float32)
+        expected = np.mean([model.estimators_[i].predict_proba(X) for i in indices], axis=0)
+        np.testing.assert_allclose(pruned.predict_proba(X_val.astype(np.float32)), expected)
+    
+    def test_compress_reports_and_chooses_within_tolerance(self, split, monkeypatch):
+        """Verifica el reporte de tamaño, carga y latencia y la elección del comprimido"""
+        import compress_model
+        pipeline, X_train, X_test, y_train, y_test = split
+        monkeypatch.setattr(compress_model, 'LOAD_REPEATS', 1)
+        
+        model, table = compress_model.compress(pipeline, X_train, y_train, X_test, y_test, tolerance=0.01,
+                                               distill_kind='tree', verbose=False)
+        
+        assert list(table.index) == ['original', 'podado', 'destilado_tree']
+        assert table['elegido'].sum() == 1 and not table.loc['original', 'elegido']
+        assert {'size_mb', 'load_ms', 'latency_ms', 'f1_val', 'f1_test'} <= set(table.columns)
+        chosen = table[table['elegido']].iloc[0]
+        assert chosen['f1_val'] >= table.loc['original', 'f1_val'] - 0.01
+        assert chosen['size_mb'] < table.loc['original', 'size_mb']
+        assert list(model.classes_) == list(pipeline.model.classes_)
+    
+    def test_validation_comes_from_training_split(self, split):
+        """Verifica que las decisiones de la compresión no usen filas de la partición de prueba"""
+        from compress_model import VALIDATION_SIZE, split_validation
+        _, X_train, X_test, y_train, _ = split
+        
+        X_fit, X_val, _, _ = split_validation(X_train, y_train)
+        
+        assert set(X_val.index) <= set(X_train.index)
+        assert set(X_val.index).isdisjoint(X_test.index) and set(X_val.index).isdisjoint(X_fit.index)
+        assert len(X_val) == pytest.approx(len(X_train) * VALIDATION_SIZE, abs=1)
+    
+    def test_compressed_pipeline_records_student_backend(self, monkeypatch, tmp_path, capsys):
+        """Verifica que el pipeline comprimido anote el tipo del modelo elegido"""
+        import compress_model
+        from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+        from sklearn.tree import DecisionTreeClassifier
+        from artifacts import load_artifact
+        from model_backends import backend_name
+        for name in ['COMPRESSED_MODEL_PATH', 'COMPRESSED_PIPELINE_PATH', 'COMPRESSION_REPORT_PATH']:
+            monkeypatch.setattr(compress_model, name, tmp_path / getattr(compress_model, name).name)
+        monkeypatch.setattr(compress_model, 'LOAD_REPEATS', 1)
+        
+        compress_model.main(['--distill', 'tree'])
+        
+        saved = load_artifact(tmp_path / 'match_pipeline_compressed.pkl', mmap=False)
+        assert saved.metadata['backend'] == backend_name(saved.model)
+        assert backend_name(RandomForestClassifier()) == 'random_forest'
+        assert backend_name(HistGradientBoostingClassifier()) == 'hist_gradient_boosting'
+        assert backend_name(DecisionTreeClassifier()) == 'DecisionTreeClassifier'
+
+
+class TestModelBackends:
+    """Tests de los backends de modelo (random_forest / hist_gradient_boosting)"""
+    
+    @pytest.fixture
+    def split(self):
+        from model_pipeline import FEATURE_NAMES
+        from storage import read_table
+        from tuning import split_train_test
+        df = read_table('processed_encoded')
+        return split_train_test(df[FEATURE_NAMES], df['winner_encoded'])
+    
+    @pytest.fixture
+    def hgb_models_dir(self, split, tmp_path):
+        """Directorio de modelos con un HistGradientBoosting entrenado y sin match_pipeline.pkl"""
+        import shutil
+        from artifacts import save_artifact
+        from model_backends import get_backend
+        X_train, _, y_train, _ = split
+        backend = get_backend('hist_gradient_boosting')
+        model = backend.build({'max_iter': 20}).fit(X_train, y_train)
+        save_artifact(model, backend.model_path(tmp_path))
+        for name in ['team_encoder.pkl', 'winner_encoder.pkl']:
+            shutil.copy(BASE_DIR / 'data' / 'models' / name, tmp_path / name)
+        joblib.dump({'backend': backend.name, 'model_file': backend.model_file}, tmp_path / 'model_metadata.pkl')
+        return tmp_path, model
+    
+    def test_unknown_backend_raises(self):
+        """Verifica que un nombre de backend desconocido dé un error claro"""
+        from model_backends import get_backend
+        with pytest.raises(ValueError, match='hist_gradient_boosting'):
+            get_backend('xgboost')
+    
+    def test_build_merges_params_and_n_jobs(self):
+        """Verifica que build combine parámetros y pase n_jobs solo si la clase lo acepta"""
+        from model_backends import BACKENDS
+        forest = BACKENDS['random_forest'].build({'n_estimators': 7}, n_jobs=2)
+        boosting = BACKENDS['hist_gradient_boosting'].build({'max_iter': 9})
+        
+        assert forest.n_estimators == 7 and forest.n_jobs == 2 and forest.max_depth == 15
+        assert boosting.max_iter == 9 and not hasattr(boosting, 'n_jobs')
+    
+    def test_evaluate_matches_sklearn_metrics(self, split):
+        """Verifica que la evaluación común coincida con accuracy y F1 macro de sklearn"""
+        from sklearn.metrics import accuracy_score, f1_score
+        from model_backends import BACKENDS, evaluate
+        X_train, X_test, y_train, y_test = split
+        
+        for backend in BACKENDS.values():
+            model = backend.build({'n_estimators': 10} if backend.is_forest else {'max_iter': 10})
+            y_pred = model.fit(X_train, y_train).predict(X_test)
+            metrics = evaluate(model, X_test, y_test)
+            assert metrics['accuracy'] == pytest.approx(accuracy_score(y_test, y_pred))
+            assert metrics['f1_macro'] == pytest.approx(f1_score(y_test, y_pred, average='macro'))
+            assert 'macro avg' in metrics['report']
+    
+    def test_trained_backend_defaults_to_random_forest(self, tmp_path):
+        """Verifica que sin backend en la metadata se asuma el bosque"""
+        from model_backends import trained_backend
+        assert trained_backend(tmp_path).name == 'random_forest'
+        
+        joblib.dump({'accuracy': 1.0}, tmp_path / 'model_metadata.pkl')
+        assert trained_backend(tmp_path).name == 'random_forest'
+    
+    def test_scoring_engine_loads_trained_backend(self, hgb_models_dir):
+        """Verifica que la puntuación batch use el modelo que indica la metadata"""
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        from scoring import ScoringEngine, model_fingerprint
+        from storage import read_table
+        models_dir, model = hgb_models_dir
+        df = read_table('processed_encoded')
+        
+        engine = ScoringEngine(models_dir)
+        result = engine.score(df.copy())
+        
+        assert isinstance(engine.model, HistGradientBoostingClassifier)
+        assert engine.pipeline.metadata['backend'] == 'hist_gradient_boosting'
+        expected = model.predict(df[engine.feature_names])
+        assert list(result['predicted_winner']) == \
+            [w.lower() for w in engine.winner_encoder.inverse_transform(expected)]
+        # La versión incremental sigue al archivo del backend entrenado
+        before = model_fingerprint(models_dir)
+        (models_dir / 'hist_gradient_boosting_model.pkl').write_bytes(b'otro modelo')
+        assert model_fingerprint(models_dir) != before
+    
+    def test_compress_skips_pruning_for_boosting(self, hgb_models_dir, split, monkeypatch):
+        """Verifica que la compresión de un modelo que no es bosque solo compare candidatos"""
+        import compress_model
+        from model_pipeline import pipeline_from_legacy
+        models_dir, _ = hgb_models_dir
+        X_train, X_test, y_train, y_test = split
+        monkeypatch.setattr(compress_model, 'LOAD_REPEATS', 1)
+        
+        _, table = compress_model.compress(pipeline_from_legacy(models_dir, mmap=False), X_train, y_train,
+                                           X_test, y_test, distill_kind='tree', verbose=False)
+        
+        assert list(table.index) == ['original', 'destilado_tree']
+        assert table.loc['original', 'arboles'] == 20 * 3
+        assert table['elegido'].sum() == 1
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
@@ -41,12 +41,28 @@ class TestCleaning:
         assert result['match_date'].dtype == 'datetime64[ns]'
     
     def test_clean_data_converts_string_types(self, sample_raw_data):
-        """Verifica que las columnas de texto sean strings"""
+        """Verifica que las columnas de texto queden como category"""
         result = clean_data(sample_raw_data.copy())
         
-        assert result['team_color'].dtype == 'object'
-        assert result['game_mode'].dtype == 'object'
-        assert result['winner'].dtype == 'object'
+        assert result['team_color'].dtype == 'category'
+        assert result['game_mode'].dtype == 'category'
+        assert result['winner'].dtype == 'category'
+        assert list(result['team_color']) == ['blue', 'orange', 'blue']
+    
+    def test_clean_data_uses_compact_numeric_types(self, sample_raw_data):
+        """Verifica los enteros chicos del esquema central"""
+        result = clean_data(sample_raw_data.copy())
+        
+        assert result['goal_difference'].dtype == 'int16'
+        assert result['match_duration'].dtype == 'int16'
+        assert result['overtime'].dtype == bool
+    
+    def test_clean_data_rejects_out_of_range_values(self, sample_raw_data):
+        """Verifica que un valor que no entra en int16 no se trunque en silencio"""
+        sample_raw_data.loc[0, 'match_duration'] = 100_000
+        
+        with pytest.raises(ValueError):
+            clean_data(sample_raw_data)
     
     def test_clean_data_preserves_data_integrity(self, sample_raw_data):
         """Verifica que no se pierdan datos durante la limpieza"""
@@ -131,7 +147,7 @@ class TestFeatures:
         result = create_features(sample_clean_data.copy())
         
         assert 'is_competitive' in result.columns
-        assert result['is_competitive'].dtype in [np.int64, np.int32, int]
+        assert result['is_competitive'].dtype == np.int8
     
     def test_create_features_is_competitive_correct(self, sample_clean_data):
         """Verifica que el indicador competitivo sea correcto"""
@@ -147,7 +163,17 @@ class TestFeatures:
         result = create_features(sample_clean_data.copy())
         
         assert 'team_mode' in result.columns
-        assert result['team_mode'].dtype == 'object'
+        assert result['team_mode'].dtype == 'category'
+    
+    def test_create_features_team_mode_missing_values(self, sample_clean_data):
+        """Verifica que team_mode quede faltante si falta el color o el modo"""
+        df = sample_clean_data.copy()
+        df.loc[1, 'team_color'] = None
+        
+        result = create_features(df)
+        
+        assert pd.isna(result['team_mode'].iloc[1])
+        assert result['team_mode'].iloc[0] == 'Blue_Duel'
     
     def test_create_features_team_mode_correct(self, sample_clean_data):
         """Verifica que team_mode tenga el formato correcto"""
@@ -242,5 +268,346 @@ class TestDataIntegration:
         assert final_df['team_mode'].notna().all()
 
 
+class TestVectorizedFeatures:
+    """Tests del cálculo vectorizado de las columnas derivadas"""
+    
+    @pytest.fixture
+    def matches(self):
+        rng = np.random.default_rng(0)
+        n = 2000
+        df = pd.DataFrame({
+            'team_color': rng.choice(['Blue', 'Orange'], n),
+            'game_mode': rng.choice(['Duel', 'Doubles', 'Standard'], n),
+            'goal_difference': rng.integers(-8, 9, n).astype(float),
+            'match_duration': rng.choice([-5, 0, 1, 299, 300, 301, 360, 420, 421, 900], n).astype(float),
+        })
+        df.loc[::97, 'goal_difference'] = np.nan
+        df.loc[::89, 'match_duration'] = np.nan
+        return df
+    
+    def test_bins_match_pd_cut(self, matches):
+        """Verifica que los códigos de np.digitize den las mismas categorías que pd.cut"""
+        from features import DURATION_BINS, GOAL_DIFF_BINS
+        
+        result = create_features(matches.copy())
+        
+        expected_goal = pd.cut(matches['goal_difference'], bins=GOAL_DIFF_BINS,
+                               labels=['large_loss', 'small_loss', 'close', 'small_win', 'large_win'])
+        expected_duration = pd.cut(matches['match_duration'], bins=DURATION_BINS,
+                                   labels=['short', 'normal', 'long', 'very_long'])
+        pd.testing.assert_series_equal(result['goal_diff_category'], expected_goal, check_names=False)
+        pd.testing.assert_series_equal(result['duration_bucket'], expected_duration, check_names=False)
+        assert (result['is_competitive'] == (matches['goal_difference'].abs() <= 2)).all()
+    
+    def test_create_features_does_not_copy(self, matches):
+        """Verifica que las columnas se agreguen al mismo DataFrame"""
+        result = create_features(matches)
+        
+        assert result is matches
+        assert 'team_mode' in matches.columns
+    
+    def test_team_mode_matches_string_concatenation(self, matches):
+        """Verifica que los códigos combinados den lo mismo que concatenar los textos"""
+        from features import team_mode
+        matches.loc[::50, 'game_mode'] = np.nan
+        
+        result = pd.Series(team_mode(matches['team_color'], matches['game_mode']))
+        
+        expected = matches['team_color'] + '_' + matches['game_mode']
+        assert result.astype(object).where(result.notna()).equals(expected.where(expected.notna()))
+        assert list(result.cat.categories) == [f'{t}_{m}' for t in ['Blue', 'Orange']
+                                               for m in ['Doubles', 'Duel', 'Standard']]
+
+
+class TestDecodeGameMode:
+    """Tests para la reconstrucción vectorizada de game_mode"""
+    
+    def test_decodes_each_mode(self):
+        """Verifica que cada columna one-hot se traduzca a su modo"""
+        from features import decode_game_mode
+        df = pd.DataFrame({
+            'mode_Duel': [1, 0, 0, 0],
+            'mode_Doubles': [0, 1, 0, 0],
+            'mode_Standard': [0, 0, 1, 0]
+        })
+        
+        result = decode_game_mode(df)
+        
+        assert isinstance(result, pd.Categorical)
+        assert list(result) == ['Duel', 'Doubles', 'Standard', 'Unknown']
+    
+    def test_accepts_boolean_columns(self):
+        """Verifica que funcione con las columnas booleanas de get_dummies"""
+        from features import decode_game_mode
+        df = pd.get_dummies(pd.DataFrame({'game_mode': ['Standard', 'Duel', 'Doubles']}),
+                            columns=['game_mode'], prefix='mode')
+        
+        assert list(decode_game_mode(df)) == ['Standard', 'Duel', 'Doubles']
+    
+    def test_matches_row_wise_priority_and_missing_columns(self):
+        """Verifica la prioridad ante varias activas y las columnas faltantes"""
+        from features import decode_game_mode
+        df = pd.DataFrame({
+            'mode_Doubles': [1, 1, 0, np.nan],
+            'mode_Standard': [1, 0, 0, 1]
+        })
+        
+        assert list(decode_game_mode(df)) == ['Doubles', 'Doubles', 'Unknown', 'Standard']
+        assert list(decode_game_mode(pd.DataFrame(index=range(2)))) == ['Unknown', 'Unknown']
+
+
+class TestStorage:
+    """Tests para la capa de almacenamiento columnar de las tablas del pipeline"""
+    
+    @pytest.fixture
+    def features_df(self):
+        """Tabla con el esquema de processed_features"""
+        raw_data = pd.DataFrame({
+            'match_id': range(6),
+            'match_date': ['2024-01-0%d' % d for d in range(1, 7)],
+            'team_color': ['Blue', 'Orange'] * 3,
+            'game_mode': ['Duel', 'Doubles', 'Standard'] * 2,
+            'winner': ['Blue', 'Orange', 'Draw'] * 2,
+            'goal_difference': [-4, -2, 0, 1, 2, 5],
+            'match_duration': [250, 310, 380, 450, 290, 600],
+            'overtime': [False, True, False, False, True, False]
+        })
+        return create_features(clean_data(raw_data))
+    
+    @pytest.mark.parametrize('fmt', ['parquet', 'feather'])
+    def test_columnar_roundtrip_keeps_dtypes(self, features_df, tmp_path, fmt):
+        """Verifica que Parquet/Feather conserven fechas, booleanos y categorías"""
+        pytest.importorskip('pyarrow')
+        from storage import write_table, read_table
+        
+        path = write_table(features_df, 'processed_features', fmt=fmt, directory=tmp_path)
+        loaded = read_table('processed_features', directory=tmp_path)
+        
+        assert path.suffix == f'.{fmt}'
+        assert loaded['duration_bucket'].cat.ordered
+        assert list(loaded['goal_diff_category'].cat.categories) == \
+            ['large_loss', 'small_loss', 'close', 'small_win', 'large_win']
+        assert pd.api.types.is_datetime64_any_dtype(loaded['match_date'])
+        assert loaded['overtime'].dtype == bool
+        pd.testing.assert_frame_equal(loaded, features_df, check_dtype=False, check_categorical=False)
+    
+    def test_column_projection(self, features_df, tmp_path):
+        """Verifica que se puedan leer solo algunas columnas"""
+        pytest.importorskip('pyarrow')
+        from storage import write_table, read_table
+        
+        write_table(features_df, 'processed_features', fmt='parquet', directory=tmp_path)
+        loaded = read_table('processed_features', columns=['goal_difference', 'duration_bucket'],
+                            directory=tmp_path)
+        
+        assert list(loaded.columns) == ['goal_difference', 'duration_bucket']
+        assert isinstance(loaded['duration_bucket'].dtype, pd.CategoricalDtype)
+    
+    def test_csv_restores_schema(self, features_df, tmp_path):
+        """Verifica que al leer un CSV se restauren los tipos del esquema"""
+        from storage import write_table, read_table
+        
+        write_table(features_df, 'processed_features', fmt='csv', directory=tmp_path)
+        loaded = read_table('processed_features', directory=tmp_path)
+        
+        assert pd.api.types.is_datetime64_any_dtype(loaded['match_date'])
+        assert loaded['duration_bucket'].cat.ordered
+    
+    def test_csv_export_and_newest_table_wins(self, features_df, tmp_path):
+        """Verifica la exportación opcional a CSV y que se lea la versión columnar"""
+        pytest.importorskip('pyarrow')
+        from storage import write_table, find_table
+        
+        path = write_table(features_df, 'processed_features', fmt='parquet',
+                           csv_export=True, directory=tmp_path)
+        
+        assert (tmp_path / 'processed_features.csv').exists()
+        assert find_table('processed_features', directory=tmp_path) == path
+    
+    @pytest.mark.parametrize('has_pyarrow', [True, False])
+    def test_count_rows_csv_without_trailing_newline(self, tmp_path, monkeypatch, has_pyarrow):
+        """Verifica el conteo de filas de un CSV cuya última línea no termina en salto de línea"""
+        import storage
+        if has_pyarrow:
+            pytest.importorskip('pyarrow')
+        monkeypatch.setattr(storage, 'HAS_PYARROW', has_pyarrow)
+        path = tmp_path / 'table.csv'
+        path.write_text('a,b\n1,x\n2,y\n3,z')
+        
+        assert storage.count_rows(path) == 3
+        path.write_text('a,b\n')
+        assert storage.count_rows(path) == 0
+    
+    def test_count_rows_csv_quoted_newlines(self, tmp_path):
+        """Verifica que un salto de línea entre comillas no cuente como fila nueva"""
+        pytest.importorskip('pyarrow')
+        from storage import count_rows
+        path = tmp_path / 'table.csv'
+        pd.DataFrame({'id': [1, 2, 3], 'note': ['uno', 'dos\nlíneas', 'tres']}).to_csv(path, index=False)
+        
+        assert count_rows(path) == 3
+    
+    def test_missing_table_raises(self, tmp_path):
+        """Verifica el error al leer una tabla inexistente"""
+        from storage import read_table
+        
+        with pytest.raises(FileNotFoundError):
+            read_table('processed_features', directory=tmp_path)
+    
+    def test_invalid_format_raises(self, features_df, tmp_path):
+        """Verifica que un formato desconocido sea rechazado"""
+        from storage import write_table
+        
+        with pytest.raises(ValueError):
+            write_table(features_df, 'processed_features', fmt='xlsx', directory=tmp_path)
+
+
+class TestIngest:
+    """Tests de la copia columnar del Excel crudo (src/ingest.py)"""
+    
+    @pytest.fixture
+    def xlsx_path(self, tmp_path):
+        pytest.importorskip('openpyxl')
+        df = pd.DataFrame({
+            'match_id': [1, 2, 3],
+            'match_date': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03']),
+            'team_color': ['Blue', 'Orange', 'Blue'],
+            'game_mode': ['Duel', 'Doubles', 'Standard'],
+            'goal_difference': [2, -1, 0],
+            'match_duration': [300, 420, 360],
+            'overtime': [False, True, False],
+            'winner': ['Blue', 'Blue', 'Draw'],
+        })
+        path = tmp_path / 'matches.xlsx'
+        df.to_excel(path, index=False)
+        return path
+    
+    def test_converts_once(self, xlsx_path):
+        """Verifica que el Excel se convierta una vez y luego se use la copia"""
+        from ingest import ingest_raw, load_raw_matches
+        
+        cached_path, converted = ingest_raw(xlsx_path)
+        assert converted and cached_path.exists()
+        assert ingest_raw(xlsx_path) == (cached_path, False)
+        
+        pd.testing.assert_frame_equal(load_raw_matches(xlsx_path), pd.read_excel(xlsx_path),
+                                      check_dtype=False)
+    
+    def test_same_content_is_not_reconverted(self, xlsx_path):
+        """Verifica que cambiar solo la fecha de modificación no repita la conversión"""
+        from ingest import ingest_raw
+        ingest_raw(xlsx_path)
+        
+        os.utime(xlsx_path, ns=(0, 0))
+        
+        assert ingest_raw(xlsx_path)[1] is False
+    
+    def test_changed_workbook_is_reconverted(self, xlsx_path):
+        """Verifica que un Excel modificado se vuelva a convertir"""
+        from ingest import ingest_raw, load_raw_matches
+        ingest_raw(xlsx_path)
+        
+        df = pd.read_excel(xlsx_path)
+        df.loc[0, 'goal_difference'] = 5
+        df.to_excel(xlsx_path, index=False)
+        
+        assert ingest_raw(xlsx_path)[1] is True
+        assert load_raw_matches(xlsx_path)['goal_difference'].iloc[0] == 5
+    
+    def test_cleaning_accepts_cached_copy(self, xlsx_path):
+        """Verifica que la limpieza funcione sobre la copia columnar"""
+        from ingest import load_raw_matches
+        
+        df = clean_data(load_raw_matches(xlsx_path))
+        
+        assert pd.api.types.is_datetime64_any_dtype(df['match_date'])
+        assert df['winner'].dtype == 'category'
+
+
+class TestPipelineCache:
+    """Tests de la caché por contenido del pipeline (src/pipeline.py)"""
+    
+    # Etapa de juguete: copia la entrada en mayúsculas y deja registro de cada ejecución
+    SCRIPT = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "source, target = Path(sys.argv[0]).with_suffix('.in'), Path(sys.argv[0]).with_suffix('.out')\n"
+        "target.write_text(Path(source.read_text().strip()).read_text().upper())\n"
+        "with open('runs.log', 'a') as f:\n"
+        "    f.write(Path(sys.argv[0]).stem + '\\n')\n"
+    )
+    
+    @pytest.fixture
+    def stages(self, tmp_path):
+        from pipeline import Stage
+        stages = []
+        source = tmp_path / 'raw.txt'
+        source.write_text('azul')
+        for name in ['first', 'second']:
+            script = tmp_path / f'{name}.py'
+            script.write_text(self.SCRIPT)
+            script.with_suffix('.in').write_text(str(source))
+            stages.append(Stage(name, script, inputs=[source], outputs=[script.with_suffix('.out')]))
+            source = script.with_suffix('.out')
+        return stages
+    
+    def run(self, stages, tmp_path, **kwargs):
+        from pipeline import run_pipeline
+        report = run_pipeline(stages, cache_dir=tmp_path / 'cache', cwd=tmp_path, verbose=False, **kwargs)
+        return [status for _, status, _ in report]
+    
+    def runs(self, tmp_path):
+        return (tmp_path / 'runs.log').read_text().split()
+    
+    def test_unchanged_inputs_are_skipped(self, stages, tmp_path):
+        """Verifica que la segunda corrida no ejecute ninguna etapa"""
+        assert self.run(stages, tmp_path) == ['ejecutada', 'ejecutada']
+        assert self.run(stages, tmp_path) == ['sin cambios', 'sin cambios']
+        assert self.runs(tmp_path) == ['first', 'second']
+    
+    def test_changed_input_reruns_downstream(self, stages, tmp_path):
+        """Verifica que un cambio de entrada vuelva a correr las etapas afectadas"""
+        self.run(stages, tmp_path)
+        (tmp_path / 'raw.txt').write_text('naranja')
+        
+        assert self.run(stages, tmp_path) == ['ejecutada', 'ejecutada']
+        assert (tmp_path / 'second.out').read_text() == 'NARANJA'
+    
+    def test_same_output_stops_propagation(self, stages, tmp_path):
+        """Verifica que si una etapa produce lo mismo, las siguientes no se ejecuten"""
+        self.run(stages, tmp_path)
+        (tmp_path / 'raw.txt').write_text('AZUL')
+        
+        assert self.run(stages, tmp_path) == ['ejecutada', 'sin cambios']
+    
+    def test_outputs_restored_from_cache(self, stages, tmp_path):
+        """Verifica que volver a una entrada anterior restaure las salidas sin ejecutar"""
+        self.run(stages, tmp_path)
+        (tmp_path / 'raw.txt').write_text('naranja')
+        self.run(stages, tmp_path)
+        (tmp_path / 'raw.txt').write_text('azul')
+        
+        assert self.run(stages, tmp_path) == ['restaurada', 'restaurada']
+        assert (tmp_path / 'second.out').read_text() == 'AZUL'
+        assert len(self.runs(tmp_path)) == 4
+    
+    def test_code_change_and_force(self, stages, tmp_path):
+        """Verifica que cambiar el código o usar force vuelva a ejecutar"""
+        self.run(stages, tmp_path)
+        with open(stages[1].script, 'a') as f:
+            f.write('# cambio\n')
+        
+        assert self.run(stages, tmp_path) == ['sin cambios', 'ejecutada']
+        assert self.run(stages, tmp_path, force=True) == ['ejecutada', 'ejecutada']
+    
+    def test_failed_stage_is_not_cached(self, stages, tmp_path):
+        """Verifica que una etapa fallida no deje entrada en la caché"""
+        stages[0].script.write_text('raise SystemExit(3)\n')
+        
+        with pytest.raises(RuntimeError):
+            self.run(stages, tmp_path)
+        assert not (tmp_path / 'cache' / 'first').exists()
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file